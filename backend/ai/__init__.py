@@ -1,12 +1,15 @@
 # AI engine package for Dynamic Staffing & Scheduling Agent
 
-from backend.ai.analyze_and_match import analyze_and_match
+from backend.ai.analyze_and_match import analyze_and_match, analyze_and_match_async, analyze_and_match_batch_async
 from backend.ai.gemini_task_complexity import analyze_task_complexity
-from backend.ai.gemini_tradeoff_analysis import analyze_tradeoffs
+from backend.ai.gemini_tradeoff_analysis import analyze_findings, analyze_tradeoffs
 
 __all__ = [
     "analyze_and_match",
+    "analyze_and_match_async",
+    "analyze_and_match_batch_async",
     "analyze_task_complexity",
+    "analyze_findings",
     "analyze_tradeoffs"
 ]
 
@@ -9,75 +9,350 @@ task-employee matches.
 import os
 import sys
 import json
+import asyncio
+import functools
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Any, Optional
-from qdrant_client import QdrantClient
-from sentence_transformers import SentenceTransformer
 
 # Add project root to path for imports
 project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
-from backend.ai.gemini_task_complexity import analyze_task_complexity
+from backend.ai.gemini_task_complexity import (
+    analyze_task_complexity,
+    analyze_task_complexity_batch,
+    complexity_batches,
+    heuristic_task_complexity
+)
+from backend.ai.embeddings import encode_skills_query, query_embedding_cache, skills_query_text
+from backend.ai.vector_store import FieldMatchAny, FieldRange, get_vector_store
+from backend.ai.skill_matrix import get_skill_matrix
+from backend.ai.rerank import normalize_weights, rerank
+from backend.ai.duration_estimator import estimate_durations
+from backend.ai.track_record import get_track_record
 
+COMPLEXITY_TIMEOUT_SECONDS = float(os.environ.get("COMPLEXITY_TIMEOUT_SECONDS", "20"))
+SEARCH_TIMEOUT_SECONDS = float(os.environ.get("SEARCH_TIMEOUT_SECONDS", "10"))
+BATCH_COMPLEXITY_CONCURRENCY = int(os.environ.get("BATCH_COMPLEXITY_CONCURRENCY", "8"))
+DURATION_TIMEOUT_SECONDS = float(os.environ.get("DURATION_TIMEOUT_SECONDS", "2"))
+# Extra wait for a batched complexity worker to return after its own deadline
+BATCH_DEADLINE_GRACE_SECONDS = float(os.environ.get("BATCH_DEADLINE_GRACE_SECONDS", "1"))
 
-def search_employees(required_skills: Dict[str, int], limit: int = 10) -> List[Dict[str, Any]]:
+# semantic: vector similarity only; structured: skill-matrix score only, no
+# embedding; hybrid: a wider set of vector candidates re-ranked on similarity,
+# skill fit, cost, performance, remaining hours and availability
+RANKING_MODES = ("semantic", "structured", "hybrid")
+HYBRID_CANDIDATES = int(os.environ.get("HYBRID_CANDIDATES", "50"))
+
+# Stages are mostly network-bound (Gemini, Qdrant), so they get their own pool
+# instead of the small default executor, which would make concurrent requests queue
+_stage_executor = ThreadPoolExecutor(
+    max_workers=int(os.environ.get("AI_WORKER_THREADS", "32")),
+    thread_name_prefix="ai-stage"
+)
+
+
+def employee_filter(
+    required_skills: Dict[str, int],
+    certifications: Optional[List[str]] = None,
+    max_hourly_rate: Optional[float] = None,
+    min_weekly_hours: Optional[int] = None
+) -> List[Any]:
     """
-    Search Qdrant for top matching employees based on required skills.
+    Build the hard-constraint filter for an employee search.
+    
+    Args:
+        required_skills: Minimum level per skill; every one must be met
+        certifications: If given, the employee must hold at least one of them
+        max_hourly_rate: If given, upper bound on hourly_rate
+        min_weekly_hours: If given, lower bound on max_hours per week
+    
+    Returns:
+        List of vector-store filter conditions
+    """
+    conditions = [
+        FieldRange(f"skills.{skill}", gte=level)
+        for skill, level in sorted(required_skills.items())
+    ]
+    if certifications:
+        conditions.append(FieldMatchAny("certifications", tuple(certifications)))
+    if max_hourly_rate is not None:
+        conditions.append(FieldRange("hourly_rate", lte=max_hourly_rate))
+    if min_weekly_hours is not None:
+        conditions.append(FieldRange("max_hours", gte=min_weekly_hours))
+    return conditions
+
+
+def search_employees(
+    required_skills: Dict[str, int],
+    limit: int = 10,
+    certifications: Optional[List[str]] = None,
+    max_hourly_rate: Optional[float] = None,
+    min_weekly_hours: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """
+    Search the vector store (Qdrant or the local index) for top matching employees
+    based on required skills.
+    
+    Hard constraints are applied inside the vector query, so only employees who
+    meet every required skill level (and the optional certification, rate and
+    hours limits) are ranked by similarity.
     
     Args:
         required_skills: Dictionary mapping skill names to required levels (1-10)
         limit: Maximum number of employees to return (default: 10)
+        certifications: Optional certifications, at least one of which is required
+        max_hourly_rate: Optional upper bound on hourly_rate
+        min_weekly_hours: Optional lower bound on the employee's weekly max hours
     
     Returns:
         List of dictionaries with 'employee_name' and 'score' keys, sorted by score descending
     
     Raises:
-        ValueError: If Qdrant environment variables are not set
-        RuntimeError: If Qdrant search fails
+        ValueError: If the Qdrant backend is selected but its environment variables are not set
+        RuntimeError: If the vector search fails
     """
-    qdrant_url = os.environ.get("QDRANT_URL")
-    qdrant_api_key = os.environ.get("QDRANT_API_KEY")
-    
-    if not qdrant_url or not qdrant_api_key:
-        raise ValueError("QDRANT_URL and QDRANT_API_KEY must be set in environment variables")
+    store = get_vector_store()
     
     try:
-        # Initialize Qdrant client
-        client = QdrantClient(url=qdrant_url, api_key=qdrant_api_key)
+        # Canonical query text ("Task requiring skills communication:7, customer_service:5"),
+        # served from the query embedding cache when it has been seen before
+        embedding = encode_skills_query(required_skills).tolist()
         
-        # Initialize embedding model
-        model = SentenceTransformer('sentence-transformers/all-MiniLM-L6-v2')
-        
-        # Convert required skills dict to text format for embedding
-        # Format: "communication:7, customer_service:5"
-        skills_text = ", ".join([f"{k}:{v}" for k, v in required_skills.items()])
+        hits = store.query(
+            "employees",
+            embedding,
+            limit=limit,
+            filter=employee_filter(required_skills, certifications, max_hourly_rate, min_weekly_hours)
+        )
         
-        # Generate embedding
-        query_text = f"Task requiring skills {skills_text}"
-        embedding = model.encode(query_text).tolist()
+        return _format_hits(hits)
         
-        # Query Qdrant using the new query_points method
-        query_response = client.query_points(
-            collection_name="employees",
-            query=embedding,
-            limit=limit
+    except Exception as e:
+        raise RuntimeError(f"Vector employee search failed: {e}")
+
+
+def search_employees_batch(
+    required_skills_list: List[Dict[str, int]],
+    limit: int = 10
+) -> List[List[Dict[str, Any]]]:
+    """
+    Search for matching employees for many skill requirements at once.
+    
+    All query texts are encoded in one forward pass (cache hits are skipped)
+    and the top-k lookups, each filtered to employees meeting its required
+    skill levels, are sent to the vector store as a single batch query.
+    
+    Args:
+        required_skills_list: One required-skills dictionary per task
+        limit: Maximum number of employees to return per task (default: 10)
+    
+    Returns:
+        One ranked employee list per input, in input order
+    
+    Raises:
+        ValueError: If the Qdrant backend is selected but its environment variables are not set
+        RuntimeError: If the vector search fails
+    """
+    store = get_vector_store()
+    
+    try:
+        embeddings = query_embedding_cache.encode_many(
+            [skills_query_text(required_skills) for required_skills in required_skills_list]
         )
+        filters = [employee_filter(required_skills) for required_skills in required_skills_list]
         
-        # Format results
-        ranked_employees = []
-        for point in query_response.points:
-            employee_name = point.payload.get("name", "Unknown")
-            score = float(point.score)
-            ranked_employees.append({
-                "employee_name": employee_name,
-                "score": score
-            })
-        
-        return ranked_employees
+        return [
+            _format_hits(hits)
+            for hits in store.query_batch("employees", embeddings, limit=limit, filters=filters)
+        ]
         
     except Exception as e:
-        raise RuntimeError(f"Qdrant employee search failed: {e}")
+        raise RuntimeError(f"Vector employee search failed: {e}")
+
+
+def structured_search(required_skills: Dict[str, int], limit: int = 10) -> List[Dict[str, Any]]:
+    """
+    Rank employees by the structured skill-match score, without embeddings.
+    
+    Every employee in the roster is scored against the required levels in one
+    vectorized pass over the skill matrix (see ``backend.ai.skill_matrix``).
+    Partial matches are ranked too, below employees covering every skill.
+    
+    Args:
+        required_skills: Dictionary mapping skill names to required levels (1-10)
+        limit: Maximum number of employees to return (default: 10)
+    
+    Returns:
+        List of dictionaries with 'employee_name' and 'score' keys, sorted by score descending
+    
+    Raises:
+        ValueError: If the Qdrant backend is selected but its environment variables are not set
+    """
+    return [
+        {"employee_name": employee.get("name", "Unknown"), "score": score}
+        for employee, score in get_skill_matrix().top_k(required_skills, limit=limit)
+    ]
+
+
+def rank_employees(
+    required_skills: Dict[str, int],
+    limit: int = 10,
+    ranking: str = "semantic",
+    window: Optional[tuple] = None,
+    weights: Optional[Dict[str, float]] = None,
+    task_type: Optional[str] = None,
+    booked_hours: Optional[Dict[Any, float]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Rank employees for a task with the selected ranking mode.
+    
+    Args:
+        required_skills: Dictionary mapping skill names to required levels (1-10)
+        limit: Maximum number of employees to return (default: 10)
+        ranking: "semantic", "structured" or "hybrid" (see RANKING_MODES)
+        window: Optional (start_datetime, end_datetime) of the task, used by
+            the hybrid availability factor
+        weights: Optional re-ranking weights for hybrid mode (see backend.ai.rerank)
+        task_type: Optional task type, used by the hybrid track-record factor
+        booked_hours: Optional hours per employee_id already booked in the
+            task window's week, used by the hybrid remaining-hours factor
+    
+    Returns:
+        List of dictionaries with 'employee_name' and 'score' keys, sorted by
+        score descending. Hybrid results also carry 'employee_id' and a
+        per-factor 'breakdown'.
+    
+    Raises:
+        ValueError: If ``ranking`` is unknown or the Qdrant backend is not configured
+        RuntimeError: If the vector search fails
+    """
+    if ranking == "structured":
+        return structured_search(required_skills, limit=limit)
+    if ranking == "semantic":
+        return search_employees(required_skills, limit=limit)
+    if ranking != "hybrid":
+        raise ValueError(f"ranking must be one of {', '.join(RANKING_MODES)}")
+    
+    store = get_vector_store()
+    try:
+        embedding = encode_skills_query(required_skills).tolist()
+        hits = store.query(
+            "employees",
+            embedding,
+            limit=max(limit, HYBRID_CANDIDATES),
+            filter=employee_filter(required_skills)
+        )
+    except Exception as e:
+        raise RuntimeError(f"Vector employee search failed: {e}")
+    return rerank(
+        get_skill_matrix(),
+        hits,
+        required_skills,
+        limit=limit,
+        weights=weights,
+        window=window,
+        booked_hours=booked_hours,
+        task_type=task_type,
+        track_record=get_track_record()
+    )
+
+
+def rank_employees_batch(
+    required_skills_list: List[Dict[str, int]],
+    rankings: List[str],
+    limit: int = 10,
+    windows: Optional[List[Optional[tuple]]] = None,
+    weights_list: Optional[List[Optional[Dict[str, float]]]] = None,
+    task_types: Optional[List[Optional[str]]] = None,
+    booked_hours_list: Optional[List[Optional[Dict[Any, float]]]] = None
+) -> List[List[Dict[str, Any]]]:
+    """
+    Batched ``rank_employees``: semantic and hybrid items share one encode pass
+    and one batch vector query; structured items never touch the model.
+    
+    Args:
+        required_skills_list: One required-skills dictionary per task
+        rankings: Ranking mode per task
+        limit: Maximum number of employees to return per task (default: 10)
+        windows: Optional task window per task (hybrid mode)
+        weights_list: Optional re-ranking weights per task (hybrid mode)
+        task_types: Optional task type per task (hybrid mode)
+        booked_hours_list: Optional booked hours per employee_id per task (hybrid mode)
+    
+    Returns:
+        One ranked employee list per input, in input order
+    
+    Raises:
+        ValueError: If the Qdrant backend is selected but its environment variables are not set
+        RuntimeError: If the vector search fails
+    """
+    windows = windows or [None] * len(required_skills_list)
+    weights_list = weights_list or [None] * len(required_skills_list)
+    task_types = task_types or [None] * len(required_skills_list)
+    booked_hours_list = booked_hours_list or [None] * len(required_skills_list)
+    results: List[Optional[List[Dict[str, Any]]]] = [None] * len(required_skills_list)
+    vector_items = []
+    for index, (required_skills, ranking) in enumerate(zip(required_skills_list, rankings)):
+        if ranking == "structured":
+            results[index] = structured_search(required_skills, limit=limit)
+        else:
+            vector_items.append(index)
+    
+    if vector_items:
+        store = get_vector_store()
+        wide = any(rankings[index] == "hybrid" for index in vector_items)
+        try:
+            embeddings = query_embedding_cache.encode_many(
+                [skills_query_text(required_skills_list[index]) for index in vector_items]
+            )
+            # The top-k of a wider query starts with the narrower top-k, so one
+            # query serves both modes
+            batch_hits = store.query_batch(
+                "employees",
+                embeddings,
+                limit=max(limit, HYBRID_CANDIDATES) if wide else limit,
+                filters=[employee_filter(required_skills_list[index]) for index in vector_items]
+            )
+        except Exception as e:
+            raise RuntimeError(f"Vector employee search failed: {e}")
+        
+        matrix = get_skill_matrix() if wide else None
+        track_record = get_track_record() if wide else None
+        for index, hits in zip(vector_items, batch_hits):
+            if rankings[index] == "hybrid":
+                results[index] = rerank(
+                    matrix,
+                    hits,
+                    required_skills_list[index],
+                    limit=limit,
+                    weights=weights_list[index],
+                    window=windows[index],
+                    booked_hours=booked_hours_list[index],
+                    task_type=task_types[index],
+                    track_record=track_record
+                )
+            else:
+                results[index] = _format_hits(hits[:limit])
+    
+    return results
+
+
+def _format_hits(hits) -> List[Dict[str, Any]]:
+    """Convert vector-store hits into the employee ranking returned by the API."""
+    ranked_employees = []
+    for hit in hits:
+        employee_name = hit.payload.get("name", "Unknown")
+        score = float(hit.score)
+        ranked_employees.append({
+            "employee_name": employee_name,
+            "score": score
+        })
+    
+    return ranked_employees
 
 
 def generate_recommendation_summary(
@@ -115,6 +390,14 @@ def generate_recommendation_summary(
     else:
         summary_parts.append(f"This is a moderate-complexity task (score: {complexity_score}/10).")
     
+    # Duration from similar past tasks
+    history = complexity_analysis.get("historical_duration")
+    if history:
+        summary_parts.append(
+            f"Similar past tasks took {history['optimistic']}-{history['pessimistic']} minutes"
+            f" (typically {history['likely']}, from {history['samples']} tasks)."
+        )
+    
     # Match quality assessment
     if top_score < 0.60:
         summary_parts.append("No strong employee matches found (top match score < 0.60).")
@@ -133,15 +416,96 @@ def generate_recommendation_summary(
                 f"Top recommendation: {top_employee_name} (match score: {top_score:.2f})."
             )
     
+    # Re-ranked results explain which factors carried the top candidate
+    breakdown = top_employees[0].get("breakdown")
+    if breakdown:
+        strongest = sorted(breakdown, key=breakdown.get, reverse=True)[:2]
+        weakest = min(breakdown, key=breakdown.get)
+        summary_parts.append(
+            f"{top_employee_name} is strongest on {' and '.join(f.replace('_', ' ') for f in strongest)}"
+            f" and weakest on {weakest.replace('_', ' ')} ({breakdown[weakest]:.2f})."
+        )
+    
     return " ".join(summary_parts)
 
 
+def historical_durations(tasks: List[tuple]) -> List[Optional[Dict[str, Any]]]:
+    """
+    kNN duration estimates from the "tasks" collection, one per (task_type, required_skills).
+
+    The estimate is optional input, so a missing collection or unconfigured
+    store yields None for every task instead of failing the request.
+    """
+    try:
+        return estimate_durations(tasks)
+    except Exception as e:
+        logging.warning(f"Historical duration estimate unavailable: {e}")
+        return [None] * len(tasks)
+
+
+def _avg_duration(estimate: Optional[Dict[str, Any]]) -> Optional[int]:
+    return estimate["mean"] if estimate else None
+
+
+def _with_history(complexity: Dict[str, Any], estimate: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Attach the historical estimate to a (possibly cached, so copied) Gemini result."""
+    if estimate is None:
+        return complexity
+    return {**complexity, "historical_duration": estimate}
+
+
+def _extract_task_fields(task_payload: Dict[str, Any]):
+    """
+    Validate a task payload and return (task_type, description, required_skills, priority, options).
+    
+    ``options`` holds the ranking mode, the task window, the re-ranking weights,
+    the task type and the booked hours (the ``rank_employees`` keyword arguments).
+    """
+    # Validate required fields
+    if "task_type" not in task_payload:
+        raise ValueError("task_payload must contain 'task_type' field")
+    
+    if "required_skills" not in task_payload:
+        raise ValueError("task_payload must contain 'required_skills' field")
+    
+    if not isinstance(task_payload["required_skills"], dict):
+        raise ValueError("required_skills must be a dictionary")
+    
+    # Extract task information
+    task_type = task_payload["task_type"]
+    description = task_payload.get("description", "")
+    required_skills = task_payload["required_skills"]
+    priority = task_payload.get("priority", 3)
+    ranking = task_payload.get("ranking") or "semantic"
+    
+    if ranking not in RANKING_MODES:
+        raise ValueError(f"ranking must be one of {', '.join(RANKING_MODES)}")
+    
+    window = None
+    if task_payload.get("start_datetime") and task_payload.get("end_datetime"):
+        window = (task_payload["start_datetime"], task_payload["end_datetime"])
+    
+    weights = task_payload.get("rerank_weights")
+    if weights:
+        normalize_weights(weights)
+    
+    options = {
+        "ranking": ranking,
+        "window": window,
+        "weights": weights,
+        "task_type": task_type,
+        "booked_hours": task_payload.get("booked_hours")
+    }
+    return task_type, description, required_skills, priority, options
+
+
 def analyze_and_match(task_payload: Dict[str, Any]) -> Dict[str, Any]:
     """
     Main AI engine function that analyzes task complexity and matches with employees.
     
     This function performs three steps:
-    1. Analyzes task complexity using Gemini AI
+    1. Estimates the duration from similar historical tasks and analyzes task
+       complexity using Gemini AI (falling back to a local heuristic if Gemini fails)
     2. Searches Qdrant for top matching employees
     3. Combines results into a recommendation summary
     
@@ -151,48 +515,45 @@ def analyze_and_match(task_payload: Dict[str, Any]) -> Dict[str, Any]:
             - description: str - Task description
             - required_skills: dict - Dictionary mapping skill names to levels (1-10)
             - priority: int - Priority level (optional, defaults to 3)
+            - ranking: str - "semantic" (default), "structured" or "hybrid"
+            - start_datetime, end_datetime: Task window (optional, used by hybrid ranking)
+            - rerank_weights: dict - Per-factor hybrid re-ranking weights (optional)
+            - booked_hours: dict - Hours per employee_id already booked in the
+              task window's week (optional, used by hybrid ranking)
     
     Returns:
         Dictionary containing:
-            - complexity_analysis: dict - Full complexity analysis from Gemini
+            - complexity_analysis: dict - Full complexity analysis from Gemini,
+              plus ``historical_duration`` when similar past tasks exist
             - top_employees: list - List of top matching employees with scores
             - recommendation_summary: str - Text summary with recommendations
     
     Raises:
         ValueError: If required fields are missing or invalid
-        RuntimeError: If AI analysis or search fails
+        RuntimeError: If the employee search fails
     """
-    # Validate required fields
-    if "task_type" not in task_payload:
-        raise ValueError("task_payload must contain 'task_type' field")
-    
-    if "required_skills" not in task_payload:
-        raise ValueError("task_payload must contain 'required_skills' field")
+    task_type, description, required_skills, priority, options = _extract_task_fields(task_payload)
     
-    if not isinstance(task_payload["required_skills"], dict):
-        raise ValueError("required_skills must be a dictionary")
-    
-    # Extract task information
-    task_type = task_payload["task_type"]
-    description = task_payload.get("description", "")
-    required_skills = task_payload["required_skills"]
-    priority = task_payload.get("priority", 3)
-    
-    # STEP 1: Call Gemini Complexity Module
+    # STEP 1: Estimate the duration from similar historical tasks, then call
+    # the Gemini Complexity Module with it (local heuristic if Gemini fails)
+    estimate = historical_durations([(task_type, required_skills)])[0]
     try:
         complexity = analyze_task_complexity(
             task_type=task_type,
             description=description,
-            avg_duration=None,  # Leave as None for now
+            avg_duration=_avg_duration(estimate),
             skills=required_skills,
             priority=priority
         )
     except Exception as e:
-        raise RuntimeError(f"Gemini complexity analysis failed: {e}")
+        logging.warning(f"Gemini complexity analysis failed, using heuristic: {e}")
+        complexity = heuristic_task_complexity(task_type, required_skills, priority, estimate, error=e)
+    else:
+        complexity = _with_history(complexity, estimate)
     
     # STEP 2: Search Qdrant for Top Employees
     try:
-        ranked_employees = search_employees(required_skills=required_skills, limit=10)
+        ranked_employees = rank_employees(required_skills=required_skills, limit=10, **options)
     except Exception as e:
         raise RuntimeError(f"Employee search failed: {e}")
     
@@ -209,6 +570,226 @@ def analyze_and_match(task_payload: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
+async def _run_stage(stage: str, func, timeout: float, **kwargs) -> Any:
+    """
+    Run a blocking stage in a worker thread with a deadline.
+
+    Raises:
+        RuntimeError: If the stage fails or does not finish within ``timeout`` seconds
+    """
+    try:
+        loop = asyncio.get_running_loop()
+        call = loop.run_in_executor(_stage_executor, functools.partial(func, **kwargs))
+        return await asyncio.wait_for(call, timeout=timeout)
+    except asyncio.TimeoutError:
+        raise RuntimeError(f"{stage} timed out after {timeout:g}s")
+    except Exception as e:
+        raise RuntimeError(f"{stage} failed: {e}")
+
+
+async def _complexity_with_history(fields, estimate, timeout: float) -> Dict[str, Any]:
+    """
+    Gemini complexity stage fed with the historical estimate; a local
+    heuristic (with the estimate) replaces it when Gemini fails or exceeds
+    ``timeout``.
+    """
+    task_type, description, required_skills, priority, _ = fields
+    try:
+        complexity = await _run_stage(
+            "Gemini complexity analysis",
+            analyze_task_complexity,
+            timeout,
+            task_type=task_type,
+            description=description,
+            avg_duration=_avg_duration(estimate),
+            skills=required_skills,
+            priority=priority
+        )
+    except RuntimeError as e:
+        logging.warning(f"{e}; using heuristic")
+        return heuristic_task_complexity(task_type, required_skills, priority, estimate, error=e)
+    return _with_history(complexity, estimate)
+
+
+async def _historical_durations_async(tasks: List[tuple]) -> List[Optional[Dict[str, Any]]]:
+    try:
+        return await _run_stage("Duration estimate", historical_durations, DURATION_TIMEOUT_SECONDS, tasks=tasks)
+    except RuntimeError as e:
+        logging.warning(str(e))
+        return [None] * len(tasks)
+
+
+async def analyze_and_match_async(
+    task_payload: Dict[str, Any],
+    complexity_timeout: float = COMPLEXITY_TIMEOUT_SECONDS,
+    search_timeout: float = SEARCH_TIMEOUT_SECONDS
+) -> Dict[str, Any]:
+    """
+    Async variant of ``analyze_and_match`` for use inside the event loop.
+    
+    The Gemini complexity analysis (preceded by the few-millisecond historical
+    duration estimate) and the employee search are independent, so both run
+    concurrently in worker threads (the encode step never touches the event
+    loop) and the total latency is close to the slower of the two.
+    
+    Args:
+        task_payload: Same structure as for ``analyze_and_match``
+        complexity_timeout: Deadline in seconds for the Gemini call
+        search_timeout: Deadline in seconds for the encode + vector search
+    
+    Returns:
+        Same structure as ``analyze_and_match``
+    
+    Raises:
+        ValueError: If required fields are missing or invalid
+        RuntimeError: If the employee search fails or exceeds its timeout
+    """
+    fields = _extract_task_fields(task_payload)
+    task_type, description, required_skills, priority, options = fields
+    
+    async def _complexity():
+        estimates = await _historical_durations_async([(task_type, required_skills)])
+        return await _complexity_with_history(fields, estimates[0], complexity_timeout)
+    
+    complexity, ranked_employees = await asyncio.gather(
+        _complexity(),
+        _run_stage(
+            "Employee search",
+            rank_employees,
+            search_timeout,
+            required_skills=required_skills,
+            limit=10,
+            **options
+        )
+    )
+    
+    recommendation_summary = generate_recommendation_summary(
+        complexity_analysis=complexity,
+        top_employees=ranked_employees
+    )
+    
+    return {
+        "complexity_analysis": complexity,
+        "top_employees": ranked_employees,
+        "recommendation_summary": recommendation_summary
+    }
+
+
+async def analyze_and_match_batch_async(
+    task_payloads: List[Dict[str, Any]],
+    concurrency: int = BATCH_COMPLEXITY_CONCURRENCY,
+    complexity_timeout: float = COMPLEXITY_TIMEOUT_SECONDS,
+    search_timeout: float = SEARCH_TIMEOUT_SECONDS
+) -> List[Dict[str, Any]]:
+    """
+    Analyze and match many tasks in one call.
+    
+    The employee search for all valid tasks runs as one batched encode + vector
+    query. Meanwhile the tasks are packed into multi-task Gemini complexity
+    prompts (see ``analyze_task_complexity_batch``), with at most
+    ``concurrency`` prompts in flight; tasks Gemini could not assess get the
+    local heuristic.
+    
+    Args:
+        task_payloads: List of task payloads (same structure as ``analyze_and_match``)
+        concurrency: Maximum number of concurrent Gemini calls
+        complexity_timeout: Deadline in seconds for each group of batched
+            Gemini prompts, including its re-queries; no prompt is sent after it
+        search_timeout: Deadline in seconds for the batched search
+    
+    Returns:
+        One dictionary per input, in input order: either the same structure as
+        ``analyze_and_match`` or {"error": "<message>"} for items that failed
+    """
+    results: List[Optional[Dict[str, Any]]] = [None] * len(task_payloads)
+    valid = []
+    for index, task_payload in enumerate(task_payloads):
+        try:
+            valid.append((index, _extract_task_fields(task_payload)))
+        except ValueError as e:
+            results[index] = {"error": f"Invalid request: {e}"}
+    
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    
+    async def _complexities():
+        # One batched kNN lookup for every task, then the tasks are packed into
+        # multi-task Gemini prompts sized to the token budget
+        estimates = await _historical_durations_async([(fields[0], fields[2]) for _, fields in valid])
+        requests = [
+            {
+                "task_type": fields[0],
+                "description": fields[1],
+                "avg_duration": _avg_duration(estimate),
+                "skills": fields[2],
+                "priority": fields[3]
+            }
+            for (_, fields), estimate in zip(valid, estimates)
+        ]
+        
+        async def _batch(positions):
+            async with semaphore:
+                try:
+                    # The worker stops sending prompts at the deadline; the
+                    # grace period lets it return what it has by then
+                    return await _run_stage(
+                        "Gemini batch complexity analysis",
+                        analyze_task_complexity_batch,
+                        complexity_timeout + BATCH_DEADLINE_GRACE_SECONDS,
+                        tasks=[requests[position] for position in positions],
+                        deadline=time.monotonic() + complexity_timeout
+                    )
+                except RuntimeError as e:
+                    return [e] * len(positions)
+        
+        batches = complexity_batches(requests)
+        answers = await asyncio.gather(*[_batch(positions) for positions in batches])
+        
+        complexities = [None] * len(valid)
+        for positions, answer in zip(batches, answers):
+            for position, complexity in zip(positions, answer):
+                fields, estimate = valid[position][1], estimates[position]
+                if isinstance(complexity, Exception):
+                    complexities[position] = heuristic_task_complexity(
+                        fields[0], fields[2], fields[3], estimate, error=complexity
+                    )
+                else:
+                    complexities[position] = _with_history(complexity, estimate)
+        return complexities
+    
+    search = _run_stage(
+        "Employee search",
+        rank_employees_batch,
+        search_timeout,
+        required_skills_list=[fields[2] for _, fields in valid],
+        rankings=[fields[4]["ranking"] for _, fields in valid],
+        limit=10,
+        windows=[fields[4]["window"] for _, fields in valid],
+        weights_list=[fields[4]["weights"] for _, fields in valid],
+        task_types=[fields[0] for _, fields in valid],
+        booked_hours_list=[fields[4]["booked_hours"] for _, fields in valid]
+    )
+    rankings, complexities = await asyncio.gather(search, _complexities(), return_exceptions=True)
+    if isinstance(complexities, BaseException):
+        complexities = [complexities] * len(valid)
+    
+    for position, ((index, _), complexity) in enumerate(zip(valid, complexities)):
+        if isinstance(rankings, BaseException):
+            results[index] = {"error": str(rankings)}
+        elif isinstance(complexity, BaseException):
+            results[index] = {"error": str(complexity)}
+        else:
+            results[index] = {
+                "complexity_analysis": complexity,
+                "top_employees": rankings[position],
+                "recommendation_summary": generate_recommendation_summary(
+                    complexity_analysis=complexity,
+                    top_employees=rankings[position]
+                )
+            }
+    
+    return results
+
+
 if __name__ == "__main__":
     # Simple test with a fake task
     print("Testing analyze_and_match with sample task...")
@@ -0,0 +1,232 @@
+"""
+Content-addressed cache for Gemini task-complexity results.
+
+Requests repeat the same (task_type, skills, priority, description)
+combinations constantly, so results are cached under a hash of the
+normalized prompt inputs. Lookups go through an in-memory LRU tier with TTL,
+then a SQLite tier that survives restarts, enabled by setting
+COMPLEXITY_CACHE_DB to a file path. Identical requests that
+arrive while a Gemini call is already in flight wait for that call instead of
+issuing their own.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional
+
+DEFAULT_CACHE_SIZE = int(os.environ.get("COMPLEXITY_CACHE_SIZE", "1024"))
+DEFAULT_TTL_SECONDS = float(os.environ.get("COMPLEXITY_CACHE_TTL_SECONDS", "86400"))
+# The persistent tier is off unless a path is given
+DEFAULT_DB_PATH = os.environ.get("COMPLEXITY_CACHE_DB") or None
+
+
+def _normalize_text(value: Any) -> str:
+    return " ".join(str(value or "").split()).lower()
+
+
+def _normalize_skills(skills: Any) -> Any:
+    if isinstance(skills, dict):
+        return sorted((_normalize_text(k), v) for k, v in skills.items())
+    if isinstance(skills, (list, tuple)):
+        return sorted(_normalize_text(s) for s in skills)
+    return _normalize_text(skills)
+
+
+def make_key(task_type, description, avg_duration, skills, priority) -> str:
+    """
+    Build the cache key for a complexity request.
+
+    Case, surrounding/duplicate whitespace and skill ordering do not change the key.
+    """
+    normalized = {
+        "task_type": _normalize_text(task_type),
+        "description": _normalize_text(description),
+        "avg_duration": None if avg_duration is None else round(float(avg_duration)),
+        "skills": _normalize_skills(skills),
+        "priority": None if priority is None else int(priority)
+    }
+    encoded = json.dumps(normalized, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class ComplexityCache:
+    """
+    Two-tier (memory + optional SQLite) TTL/LRU cache with in-flight request coalescing.
+
+    Only successful results are stored; an exception raised by ``compute`` is
+    propagated to the caller and to every request coalesced onto it.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_CACHE_SIZE,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        db_path: Optional[str] = DEFAULT_DB_PATH
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.db_path = db_path or None
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._in_flight: Dict[str, Future] = {}
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        self._stats = {
+            "memory_hits": 0,
+            "persistent_hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "evictions": 0,
+            "expirations": 0
+        }
+
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        if not self.db_path:
+            return None
+        if self._db is None:
+            directory = os.path.dirname(self.db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS complexity_cache "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._db.commit()
+        return self._db
+
+    def _persistent_get(self, key: str, now: float) -> Optional[Any]:
+        try:
+            with self._db_lock:
+                db = self._connection()
+                if db is None:
+                    return None
+                row = db.execute(
+                    "SELECT value, expires_at FROM complexity_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    return None
+                if row[1] <= now:
+                    db.execute("DELETE FROM complexity_cache WHERE key = ?", (key,))
+                    db.commit()
+                    return None
+                return json.loads(row[0]), row[1]
+        except sqlite3.Error:
+            return None
+
+    def _persistent_put(self, key: str, value: Any, expires_at: float) -> None:
+        try:
+            with self._db_lock:
+                db = self._connection()
+                if db is None:
+                    return
+                db.execute(
+                    "INSERT OR REPLACE INTO complexity_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                    (key, json.dumps(value), expires_at)
+                )
+                db.commit()
+        except sqlite3.Error:
+            pass
+
+    def _memory_put(self, key: str, value: Any, expires_at: float) -> None:
+        # Caller holds self._lock
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value for ``key``, or None if missing or expired."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self._stats["memory_hits"] += 1
+                    return entry[1]
+                del self._entries[key]
+                self._stats["expirations"] += 1
+
+        persisted = self._persistent_get(key, now)
+        if persisted is None:
+            return None
+
+        value, expires_at = persisted
+        with self._lock:
+            self._memory_put(key, value, expires_at)
+            self._stats["persistent_hits"] += 1
+        return value
+
+    def put(self, key: str, value: Any) -> None:
+        expires_at = time.time() + self.ttl_seconds
+        with self._lock:
+            self._memory_put(key, value, expires_at)
+        self._persistent_put(key, value, expires_at)
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any]) -> Any:
+        """
+        Return the cached value for ``key`` or compute, store and return it.
+
+        If another thread is already computing the same key, wait for its result.
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        with self._lock:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = self._in_flight[key] = Future()
+                self._stats["misses"] += 1
+            else:
+                self._stats["coalesced"] += 1
+
+        if not leader:
+            return future.result()
+
+        try:
+            value = compute()
+            self.put(key, value)
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+        try:
+            with self._db_lock:
+                db = self._connection()
+                if db is not None:
+                    db.execute("DELETE FROM complexity_cache")
+                    db.commit()
+        except sqlite3.Error:
+            pass
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and the overall hit rate."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+        hits = stats["memory_hits"] + stats["persistent_hits"] + stats["coalesced"]
+        lookups = hits + stats["misses"]
+        stats["hit_rate"] = round(hits / lookups, 4) if lookups else 0.0
+        stats["persistent"] = self.db_path is not None
+        return stats
+
+
+complexity_cache = ComplexityCache()
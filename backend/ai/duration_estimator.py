@@ -0,0 +1,111 @@
+"""
+Duration estimates from similar historical tasks.
+
+``embed_tasks`` stores every historical task with its ``duration_minutes``
+and ``task_type`` in the "tasks" collection. A new task is embedded like
+those rows (minus the duration), its k nearest neighbours of the same task
+type are retrieved through a keyword-indexed payload filter, and their
+durations give optimistic / likely / pessimistic quantiles. That takes a few
+milliseconds, so the estimate can feed ``avg_duration`` into the Gemini
+prompt and stand in for Gemini's ``duration_estimate`` when the model is
+unavailable.
+"""
+
+import json
+import os
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from backend.ai.embeddings import query_embedding_cache
+from backend.ai.vector_store import FieldMatchAny, get_vector_store
+
+DURATION_NEIGHBOURS = int(os.environ.get("DURATION_NEIGHBOURS", "25"))
+DURATION_MIN_SAMPLES = int(os.environ.get("DURATION_MIN_SAMPLES", "3"))
+
+# Percentiles reported as the optimistic, likely and pessimistic durations
+QUANTILES = (10, 50, 90)
+
+
+def task_query_text(task_type: str, required_skills: Dict[str, int]) -> str:
+    """Text in the same form as the ``embed_tasks`` rows, without the unknown duration."""
+    return f"Task of type {task_type} requiring skills {json.dumps(required_skills)}"
+
+
+def summarize_durations(durations: Sequence[float], similarities: Sequence[float], k: int) -> Dict[str, Any]:
+    """
+    Turn neighbour durations into a ``duration_estimate``-shaped dict.
+
+    Confidence grows with the share of the k neighbours found and with their
+    mean similarity to the query.
+    """
+    values = np.asarray(durations, dtype=np.float64)
+    optimistic, likely, pessimistic = np.percentile(values, QUANTILES)
+    similarity = float(np.clip(np.mean(similarities), 0.0, 1.0)) if len(similarities) else 0.0
+    return {
+        "optimistic": int(round(optimistic)),
+        "likely": int(round(likely)),
+        "pessimistic": int(round(pessimistic)),
+        "confidence": round(min(1.0, len(values) / max(1, k)) * similarity, 2),
+        "mean": int(round(float(values.mean()))),
+        "samples": int(len(values)),
+        "source": "historical_tasks"
+    }
+
+
+def estimate_durations(
+    tasks: Sequence[Tuple[str, Dict[str, int]]],
+    k: int = DURATION_NEIGHBOURS
+) -> List[Optional[Dict[str, Any]]]:
+    """
+    Estimate durations for many tasks with one batched encode and vector query.
+
+    Args:
+        tasks: (task_type, required_skills) pairs
+        k: Number of historical neighbours per task
+
+    Returns:
+        One estimate per task (see ``summarize_durations``), or None where
+        fewer than DURATION_MIN_SAMPLES neighbours of that task type exist
+
+    Raises:
+        ValueError: If the Qdrant backend is selected but not configured
+    """
+    if not tasks:
+        return []
+
+    vectors = query_embedding_cache.encode_many([task_query_text(t, skills) for t, skills in tasks])
+    filters = [[FieldMatchAny("task_type", (task_type,))] for task_type, _ in tasks]
+    results = get_vector_store().query_batch("tasks", vectors, limit=k, filters=filters)
+
+    estimates = []
+    for hits in results:
+        durations, similarities = [], []
+        for hit in hits:
+            duration = hit.payload.get("duration_minutes")
+            if duration is not None:
+                durations.append(float(duration))
+                similarities.append(hit.score)
+        if len(durations) < DURATION_MIN_SAMPLES:
+            estimates.append(None)
+        else:
+            estimates.append(summarize_durations(durations, similarities, k))
+    return estimates
+
+
+def estimate_duration(
+    task_type: str,
+    required_skills: Dict[str, int],
+    k: int = DURATION_NEIGHBOURS
+) -> Optional[Dict[str, Any]]:
+    """
+    Estimate one task's duration from its k nearest historical tasks of the same type.
+
+    Returns:
+        Dictionary with optimistic, likely, pessimistic, confidence, mean,
+        samples and source, or None without enough history
+
+    Raises:
+        ValueError: If the Qdrant backend is selected but not configured
+    """
+    return estimate_durations([(task_type, required_skills)], k=k)[0]
@@ -0,0 +1,181 @@
+"""
+Text encoding helpers built on the shared embedding model.
+
+Encoding one string per ``model.encode()`` call leaves most of the
+transformer's throughput unused, so ingestion builds all embedding texts up
+front and encodes them in fixed-size batches, either into one float32 matrix
+or as a stream of per-batch matrices.
+
+Query embeddings go through a bounded LRU cache instead: the space of
+skill-requirement queries is small and heavily repeated, so repeated searches
+skip the transformer entirely.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+import numpy as np
+
+from backend.registry import get_embedding_model
+
+DEFAULT_BATCH_SIZE = int(os.environ.get("EMBED_BATCH_SIZE", "128"))
+DEFAULT_CHUNK_ROWS = int(os.environ.get("INGEST_CHUNK_ROWS", "5000"))
+QUERY_CACHE_SIZE = int(os.environ.get("QUERY_EMBEDDING_CACHE_SIZE", "4096"))
+
+
+def _encode(model, texts: Sequence[str], batch_size: int) -> np.ndarray:
+    vectors = model.encode(
+        list(texts),
+        batch_size=batch_size,
+        convert_to_numpy=True,
+        show_progress_bar=False
+    )
+    return np.asarray(vectors, dtype=np.float32)
+
+
+def encode_texts(texts: Sequence[str], batch_size: int = DEFAULT_BATCH_SIZE, model=None) -> np.ndarray:
+    """
+    Encode all texts into a single matrix.
+
+    Args:
+        texts: Strings to embed
+        batch_size: Number of texts per forward pass
+        model: Optional SentenceTransformer; defaults to the shared model
+
+    Returns:
+        float32 array of shape (len(texts), embedding_dim)
+    """
+    model = model or get_embedding_model()
+
+    if len(texts) == 0:
+        return np.empty((0, model.get_sentence_embedding_dimension()), dtype=np.float32)
+
+    return _encode(model, texts, batch_size)
+
+
+def iter_encoded_batches(
+    texts: Sequence[str],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    model=None
+) -> Iterator[Tuple[int, np.ndarray]]:
+    """
+    Encode texts batch by batch so callers can consume vectors as they are produced.
+
+    Args:
+        texts: Strings to embed
+        batch_size: Number of texts per forward pass
+        model: Optional SentenceTransformer; defaults to the shared model
+
+    Yields:
+        Tuples of (offset of the batch in ``texts``, float32 matrix for the batch)
+    """
+    model = model or get_embedding_model()
+
+    for start in range(0, len(texts), batch_size):
+        yield start, _encode(model, texts[start:start + batch_size], batch_size)
+
+
+class QueryEmbeddingCache:
+    """
+    Thread-safe LRU cache from query text to its float32 embedding.
+
+    Cached arrays are marked read-only because they are shared between callers.
+    """
+
+    def __init__(self, max_entries: int = QUERY_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+
+    def _lookup(self, text: str):
+        # Caller holds self._lock
+        vector = self._entries.get(text)
+        if vector is not None:
+            self._entries.move_to_end(text)
+            self._hits += 1
+        return vector
+
+    def _store(self, text: str, vector: np.ndarray) -> np.ndarray:
+        # Caller holds self._lock
+        vector = np.array(vector, dtype=np.float32)
+        vector.setflags(write=False)
+        self._entries[text] = vector
+        self._entries.move_to_end(text)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return vector
+
+    def encode(self, text: str, model=None) -> np.ndarray:
+        """Return the embedding for ``text``, encoding it only on a cache miss."""
+        return self.encode_many([text], model=model)[0]
+
+    def encode_many(self, texts: Sequence[str], model=None) -> np.ndarray:
+        """
+        Return embeddings for all texts, encoding the cache misses in one batch.
+
+        Returns:
+            float32 array of shape (len(texts), embedding_dim)
+        """
+        found: Dict[str, np.ndarray] = {}
+        missing: List[str] = []
+        with self._lock:
+            for text in texts:
+                if text in found:
+                    continue
+                vector = self._lookup(text)
+                if vector is not None:
+                    found[text] = vector
+                elif text not in missing:
+                    missing.append(text)
+            self._misses += len(missing)
+
+        if missing:
+            vectors = encode_texts(missing, model=model)
+            with self._lock:
+                for text, vector in zip(missing, vectors):
+                    found[text] = self._store(text, vector)
+
+        if not texts:
+            return encode_texts([], model=model)
+        return np.stack([found[text] for text in texts])
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0
+            }
+
+
+query_embedding_cache = QueryEmbeddingCache()
+
+
+def skills_query_text(required_skills: Dict[str, int]) -> str:
+    """
+    Build the canonical query text for a skill-requirement dict.
+
+    Skills are sorted by name so equivalent requirements share one cache entry.
+    """
+    skills_text = ", ".join(f"{k}:{required_skills[k]}" for k in sorted(required_skills))
+    return f"Task requiring skills {skills_text}"
+
+
+def encode_query(text: str) -> np.ndarray:
+    """Encode a free-text query through the query embedding cache."""
+    return query_embedding_cache.encode(text)
+
+
+def encode_skills_query(required_skills: Dict[str, int]) -> np.ndarray:
+    """Encode the canonical query for ``required_skills`` through the query embedding cache."""
+    return query_embedding_cache.encode(skills_query_text(required_skills))
@@ -1,20 +1,46 @@
+import logging
 import os
-import json
-import google.generativeai as genai
+import time
 
-def analyze_task_complexity(task_type, description, avg_duration, skills, priority):
-    api_key = os.environ.get("GEMINI_API_KEY")
-    if not api_key:
-        raise ValueError("GEMINI_API_KEY must be set in environment variables")
-    
-    genai.configure(api_key=api_key)
-    
+from backend.ai.complexity_cache import complexity_cache, make_key
+from backend.ai.llm_client import GEMINI_TIMEOUT_SECONDS, LLMResponseError, LLMUnavailable, generate_json
+
+# Prompt + expected answer size allowed per batched call, in estimated tokens
+COMPLEXITY_BATCH_TOKEN_BUDGET = int(os.environ.get("COMPLEXITY_BATCH_TOKEN_BUDGET", "8000"))
+COMPLEXITY_BATCH_MAX_TASKS = int(os.environ.get("COMPLEXITY_BATCH_MAX_TASKS", "25"))
+# Extra rounds that re-query only the items whose answers were missing or invalid
+COMPLEXITY_BATCH_REQUERY_ROUNDS = int(os.environ.get("COMPLEXITY_BATCH_REQUERY_ROUNDS", "2"))
+# Rough size of one assessment in the answer
+_ANSWER_TOKENS_PER_TASK = 160
+
+def analyze_task_complexity(task_type, description, avg_duration, skills, priority, use_cache=True):
+    """
+    Ask Gemini for a complexity assessment of a task.
+
+    Results are cached by a normalized hash of the inputs (see complexity_cache),
+    and identical concurrent requests share one Gemini call. Pass use_cache=False
+    to always query the model.
+    """
+    if not use_cache:
+        return _request_task_complexity(task_type, description, avg_duration, skills, priority)
+
+    key = make_key(task_type, description, avg_duration, skills, priority)
+    return complexity_cache.get_or_compute(
+        key,
+        lambda: _request_task_complexity(task_type, description, avg_duration, skills, priority)
+    )
+
+def _skills_text(skills):
     if isinstance(skills, dict):
         skills_str = ", ".join([f"{k}: {v}" for k, v in skills.items()])
     elif isinstance(skills, list):
         skills_str = ", ".join(skills)
     else:
         skills_str = str(skills)
+    return skills_str
+
+def _request_task_complexity(task_type, description, avg_duration, skills, priority):
+    skills_str = _skills_text(skills)
     
     prompt = f"""You are a workforce planning AI assistant. Analyze the following task and provide a detailed assessment.
 
@@ -48,29 +74,257 @@ Provide your analysis in the following JSON format:
 
 Your response must be ONLY valid JSON. Do not include any text before or after the JSON object."""
     
+    # Deadline, retries, rate limiting and circuit breaking live in llm_client
+    return generate_json(prompt)
+
+def heuristic_task_complexity(task_type, skills, priority, duration_estimate=None, error=None):
+    """
+    Local stand-in for the Gemini assessment when the model is unavailable.
+
+    The score grows with the number of required skills, their mean level
+    (on the 1-10 scale) and the priority (5 is the most urgent). The duration
+    comes from ``duration_estimate`` (the historical kNN estimate) when given.
+    Results are marked with ``source: "heuristic"`` and never cached.
+    """
+    levels = [float(level) for level in (skills or {}).values()] if isinstance(skills, dict) else []
+    mean_level = sum(levels) / len(levels) if levels else 5.0
+    score = 1.0 + 0.6 * mean_level + 0.5 * min(len(levels), 4) + 0.25 * (min(max(int(priority or 3), 1), 5) - 1)
+    result = {
+        "complexity_score": int(round(min(max(score, 1.0), 10.0))),
+        "recommended_skills": dict(skills) if isinstance(skills, dict) else {},
+        "challenges": [],
+        "source": "heuristic"
+    }
+    if duration_estimate:
+        result["duration_estimate"] = {
+            key: duration_estimate[key] for key in ("optimistic", "likely", "pessimistic", "confidence")
+        }
+        result["historical_duration"] = duration_estimate
+    if error is not None:
+        result["error"] = str(error)
+    return result
+
+_BATCH_PROMPT_HEADER = """You are a workforce planning AI assistant. Analyze each of the following tasks and provide a detailed assessment of each.
+
+Tasks:
+"""
+
+_BATCH_PROMPT_FOOTER = """
+Provide your analysis as a JSON array with exactly one object per task, in the following format:
+
+[
+  {
+    "index": <task number from the list above>,
+    "complexity_score": <1-10>,
+    "recommended_skills": {
+      "skill_name": <required_level_1-10>
+    },
+    "challenges": ["challenge1", "challenge2"],
+    "duration_estimate": {
+      "optimistic": <minutes>,
+      "likely": <minutes>,
+      "pessimistic": <minutes>,
+      "confidence": <0.0-1.0>
+    }
+  }
+]
+
+Your response must be ONLY a valid JSON array. Do not include any text before or after it."""
+
+def _estimate_tokens(text):
+    # About four characters per token for English prompts; only used for packing
+    return len(text) // 4 + 1
+
+def _batch_task_line(index, task):
+    return (
+        f"[{index}] Task Type: {task['task_type']} | Description: {task.get('description', '')} | "
+        f"Historical Average Duration: {task.get('avg_duration')} minutes | "
+        f"Required Skills: {_skills_text(task.get('skills'))} | Priority Level: {task.get('priority')}"
+    )
+
+def complexity_batches(tasks, token_budget=COMPLEXITY_BATCH_TOKEN_BUDGET, max_tasks=COMPLEXITY_BATCH_MAX_TASKS):
+    """
+    Split tasks into groups that each fit one batched complexity prompt.
+
+    A group is closed when adding the next task would take the estimated prompt
+    plus answer size over ``token_budget`` tokens, or when it holds
+    ``max_tasks`` tasks. A task that alone exceeds the budget gets its own group.
+
+    Args:
+        tasks: Task dicts as for ``analyze_task_complexity_batch``
+        token_budget: Estimated tokens allowed per call, prompt and answer
+        max_tasks: Maximum tasks per call
+
+    Returns:
+        Lists of indexes into ``tasks``, in input order
+    """
+    fixed = _estimate_tokens(_BATCH_PROMPT_HEADER + _BATCH_PROMPT_FOOTER)
+    batches, current, used = [], [], fixed
+    for index, task in enumerate(tasks):
+        cost = _estimate_tokens(_batch_task_line(len(current), task)) + _ANSWER_TOKENS_PER_TASK
+        if current and (used + cost > token_budget or len(current) >= max_tasks):
+            batches.append(current)
+            current, used = [], fixed
+        current.append(index)
+        used += cost
+    if current:
+        batches.append(current)
+    return batches
+
+def validate_complexity(result):
+    """
+    Check one assessment from a batched answer and return it without the index.
+
+    Raises:
+        ValueError: If a field is missing or has the wrong type or range
+    """
+    if not isinstance(result, dict):
+        raise ValueError("assessment is not an object")
+    score = result.get("complexity_score")
+    if isinstance(score, bool) or not isinstance(score, (int, float)) or not 1 <= score <= 10:
+        raise ValueError(f"complexity_score must be a number from 1 to 10, got {score!r}")
+    if not isinstance(result.get("recommended_skills", {}), dict):
+        raise ValueError("recommended_skills must be an object")
+    if not isinstance(result.get("challenges", []), list):
+        raise ValueError("challenges must be a list")
+    duration = result.get("duration_estimate")
+    if not isinstance(duration, dict):
+        raise ValueError("duration_estimate must be an object")
+    for key in ("optimistic", "likely", "pessimistic"):
+        value = duration.get(key)
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or value < 0:
+            raise ValueError(f"duration_estimate.{key} must be a non-negative number, got {value!r}")
+    return {key: value for key, value in result.items() if key != "index"}
+
+def _request_task_complexity_batch(tasks, timeout):
+    """
+    Ask for the assessments of ``tasks`` in one prompt, within ``timeout`` seconds.
+
+    Returns:
+        (assessments by position in ``tasks``, {position: ValueError} for
+        answers that were missing or invalid)
+
+    Raises:
+        LLMUnavailable, RuntimeError: As ``generate_json`` does
+    """
+    lines = "\n".join(_batch_task_line(position, task) for position, task in enumerate(tasks))
     try:
-        model = genai.GenerativeModel('gemini-2.0-flash-exp')
-        response = model.generate_content(prompt)
-        
-        if not hasattr(response, 'text') or not response.text:
-            raise RuntimeError("Gemini API returned empty or invalid response")
-        
-        response_text = response.text.strip()
-        
-        if response_text.startswith("```json"):
-            response_text = response_text[7:]
-        if response_text.startswith("```"):
-            response_text = response_text[3:]
-        if response_text.endswith("```"):
-            response_text = response_text[:-3]
-        response_text = response_text.strip()
-        
-        result = json.loads(response_text)
-        return result
-        
-    except json.JSONDecodeError as e:
-        response_preview = response_text[:200] if 'response_text' in locals() else "N/A"
-        raise ValueError(f"Failed to parse JSON response from Gemini: {e}. Response: {response_preview}")
-    except Exception as e:
-        raise RuntimeError(f"Gemini API call failed: {e}")
+        answer = generate_json(_BATCH_PROMPT_HEADER + lines + "\n" + _BATCH_PROMPT_FOOTER, timeout=timeout)
+    except LLMResponseError as e:
+        # Unparseable answer: every item is re-queried
+        return {}, {position: e for position in range(len(tasks))}
+    if isinstance(answer, dict):
+        answer = answer.get("results", answer.get("tasks"))
+    if not isinstance(answer, list):
+        error = ValueError("Gemini batch answer is not a JSON array")
+        return {}, {position: error for position in range(len(tasks))}
+
+    assessments, errors = {}, {}
+    for item in answer:
+        position = item.get("index") if isinstance(item, dict) else None
+        if isinstance(position, bool) or not isinstance(position, int) or not 0 <= position < len(tasks):
+            continue
+        try:
+            assessments[position] = validate_complexity(item)
+        except ValueError as e:
+            errors[position] = e
+    for position in range(len(tasks)):
+        if position not in assessments:
+            errors.setdefault(position, ValueError("No assessment for this task in the Gemini batch answer"))
+    return assessments, errors
+
+def analyze_task_complexity_batch(
+    tasks,
+    use_cache=True,
+    token_budget=COMPLEXITY_BATCH_TOKEN_BUDGET,
+    max_tasks=COMPLEXITY_BATCH_MAX_TASKS,
+    requery_rounds=COMPLEXITY_BATCH_REQUERY_ROUNDS,
+    deadline=None
+):
+    """
+    Assess many tasks with as few Gemini calls as possible.
+
+    Cached tasks are answered from complexity_cache and identical tasks are
+    asked once. The rest are packed into prompts sized by ``complexity_batches``
+    (the instruction preamble is sent once per prompt instead of once per
+    task), each answer is a JSON array keyed by task index, and every element
+    is checked with ``validate_complexity``. Only the tasks whose elements were
+    missing or invalid are asked again, in smaller groups, for up to
+    ``requery_rounds`` rounds. Valid results are cached like single requests.
+
+    With a ``deadline``, every prompt is sent with the time left as its
+    timeout, and no prompt is sent once it has passed, so a caller that stops
+    waiting at the deadline does not leave prompts running behind it.
+
+    Args:
+        tasks: Dicts with task_type, description, avg_duration, skills and
+            priority (the ``analyze_task_complexity`` arguments)
+        use_cache: Read and write complexity_cache
+        token_budget: Estimated prompt + answer tokens per call
+        max_tasks: Maximum tasks per call
+        requery_rounds: Extra rounds for tasks whose answers failed validation
+        deadline: Optional ``time.monotonic()`` value by which the last prompt
+            must be answered; without it each prompt gets llm_client's default
+
+    Returns:
+        One entry per task, in input order: the assessment dict, or the
+        exception that prevented it (as ``asyncio.gather(return_exceptions=True)``
+        would), so callers can fall back per task
+    """
+    results = [None] * len(tasks)
+    keys = [
+        make_key(t["task_type"], t.get("description"), t.get("avg_duration"), t.get("skills"), t.get("priority"))
+        for t in tasks
+    ]
+
+    # Unique uncached keys -> positions in ``tasks`` waiting for them
+    pending = {}
+    for index, key in enumerate(keys):
+        cached = complexity_cache.get(key) if use_cache else None
+        if cached is not None:
+            results[index] = cached
+        else:
+            pending.setdefault(key, []).append(index)
+
+    queue = list(pending)
+    errors = {}
+    for _ in range(max(0, requery_rounds) + 1):
+        if not queue:
+            break
+        retry = []
+        for batch in complexity_batches([tasks[pending[key][0]] for key in queue], token_budget, max_tasks):
+            batch_keys = [queue[position] for position in batch]
+            timeout = GEMINI_TIMEOUT_SECONDS if deadline is None else deadline - time.monotonic()
+            if timeout <= 0:
+                for key in batch_keys:
+                    errors[key] = LLMUnavailable("Gemini batch complexity deadline passed")
+                continue
+            try:
+                assessments, failures = _request_task_complexity_batch(
+                    [tasks[pending[key][0]] for key in batch_keys], timeout
+                )
+            except (LLMUnavailable, RuntimeError) as e:
+                # Upstream failure rather than a bad answer: asking again would only add load
+                for key in batch_keys:
+                    errors[key] = e
+                continue
+            for position, assessment in assessments.items():
+                key = batch_keys[position]
+                errors.pop(key, None)
+                if use_cache:
+                    complexity_cache.put(key, assessment)
+                for index in pending[key]:
+                    results[index] = assessment
+            for position, error in failures.items():
+                errors[batch_keys[position]] = error
+                retry.append(batch_keys[position])
+        queue = retry
+        # Smaller groups on re-query, so one malformed element costs less
+        max_tasks = max(1, max_tasks // 2)
 
+    if errors:
+        logging.warning(f"Gemini batch complexity failed for {len(errors)} of {len(pending)} task(s)")
+    for key, error in errors.items():
+        for index in pending[key]:
+            results[index] = error if isinstance(error, RuntimeError) else RuntimeError(f"Gemini answer invalid: {error}")
+    return results
@@ -1,49 +1,22 @@
-import os
 import json
-import google.generativeai as genai
-
-def analyze_tradeoffs(schedule_json, budget, coverage_percentage, availability_constraints, detected_issues):
-    api_key = os.environ.get("GEMINI_API_KEY")
-    if not api_key:
-        raise ValueError("GEMINI_API_KEY must be set in environment variables")
-    
-    genai.configure(api_key=api_key)
-    
-    # Format inputs for the prompt
-    if isinstance(schedule_json, dict):
-        schedule_str = json.dumps(schedule_json, indent=2)
-    else:
-        schedule_str = str(schedule_json)
-    
-    if isinstance(availability_constraints, dict):
-        availability_str = json.dumps(availability_constraints, indent=2)
-    else:
-        availability_str = str(availability_constraints)
-    
-    if isinstance(detected_issues, list):
-        issues_str = json.dumps(detected_issues, indent=2)
-    elif isinstance(detected_issues, dict):
-        issues_str = json.dumps(detected_issues, indent=2)
-    else:
-        issues_str = str(detected_issues)
+from backend.ai.llm_client import generate_json
+from backend.schedule_issues import detect_issues
+
+def tradeoff_prompt(findings):
+    """
+    Build the trade-off prompt from ``schedule_issues.detect_issues`` findings.
+
+    Only the findings (totals plus the few worst slots and employees) are
+    sent, as compact JSON, so the prompt size does not depend on how many
+    tasks the schedule holds.
+    """
+    findings_str = json.dumps(findings, separators=(",", ":"), default=str)
     
-    prompt = f"""You are an operations optimization AI. Review the current schedule and constraints, then provide recommendations with trade-off analysis.
+    prompt = f"""You are an operations optimization AI. Review the schedule findings below, computed from the current schedule and employee roster, then provide recommendations with trade-off analysis.
 
-Current Schedule:
+Findings (understaffed_slots: unassigned work per time slot, peak_utilization = demand / available roster hours; overtime_risk: weekly hours near or over max_hours; coverage: share of tasks and task minutes assigned, against required_pct; budget: assigned and projected cost against the budget):
 
-{schedule_str}
-
-Constraints:
-
-- Cost Budget: ${budget}
-
-- Required Coverage: {coverage_percentage}%
-
-- Employee Availability: {availability_str}
-
-Issues Detected:
-
-{issues_str}
+{findings_str}
 
 Provide your analysis in the following JSON format:
 
@@ -68,74 +41,97 @@ Provide your analysis in the following JSON format:
 }}
 
 Your response must be ONLY valid JSON."""
-    
-    try:
-        model = genai.GenerativeModel('gemini-2.0-flash-exp')
-        response = model.generate_content(prompt)
-        
-        if not hasattr(response, 'text') or not response.text:
-            raise RuntimeError("Gemini API returned empty or invalid response")
-        
-        response_text = response.text.strip()
-        
-        # Remove markdown code block wrappers
-        if response_text.startswith("```json"):
-            response_text = response_text[7:]
-        if response_text.startswith("```"):
-            response_text = response_text[3:]
-        if response_text.endswith("```"):
-            response_text = response_text[:-3]
-        response_text = response_text.strip()
-        
-        result = json.loads(response_text)
-        return result
-        
-    except json.JSONDecodeError as e:
-        response_preview = response_text[:200] if 'response_text' in locals() else "N/A"
-        raise ValueError(f"Failed to parse JSON response from Gemini: {e}. Response: {response_preview}")
-    except Exception as e:
-        raise RuntimeError(f"Gemini API call failed: {e}")
+    return prompt
+
+def analyze_findings(findings):
+    """
+    Ask Gemini for recommendations on ``schedule_issues.detect_issues`` findings.
+
+    Raises:
+        LLMUnavailable, RuntimeError, LLMResponseError: As ``llm_client.generate_json`` does
+    """
+    # Deadline, retries, rate limiting and circuit breaking live in llm_client
+    return generate_json(tradeoff_prompt(findings))
+
+
+def analyze_tradeoffs(schedule_json, budget, coverage_percentage, availability_constraints, detected_issues, tasks=None):
+    """
+    Trade-off recommendations for a schedule, with the original signature.
+
+    Runs ``schedule_issues.detect_issues`` on the schedule and passes the
+    findings to ``analyze_findings``, so the prompt holds the findings rather
+    than the schedule.
+
+    Args:
+        schedule_json: ``scheduler.assign`` result, as a dict or JSON string. A
+            ``/get-schedule`` response also works; its ``schedule`` list is used
+            as the tasks when ``tasks`` is not given. Any other shape is sent
+            to the model as-is, as before.
+        budget: Cost budget
+        coverage_percentage: Required percentage of tasks assigned
+        availability_constraints: Employee payloads (a list, or a dict of
+            payloads) to compute the findings against; other values are sent
+            to the model as-is
+        detected_issues: Issues found by the caller, sent with the findings
+        tasks: The scheduled tasks, if ``schedule_json`` does not include them
+
+    Raises:
+        LLMUnavailable, RuntimeError, LLMResponseError: As ``llm_client.generate_json`` does
+    """
+    schedule = json.loads(schedule_json) if isinstance(schedule_json, str) else schedule_json
+    employees = availability_constraints
+    if isinstance(employees, dict):
+        employees = list(employees.values())
+    if not isinstance(employees, list) or not all(isinstance(e, dict) for e in employees):
+        employees = None
+
+    if isinstance(schedule, dict) and "assignments" in schedule:
+        if tasks is None:
+            tasks = schedule.get("schedule") or []
+        findings = detect_issues(schedule, tasks, employees or [], budget, coverage_percentage)
+    else:
+        findings = {"schedule": schedule, "budget": budget, "required_coverage_pct": coverage_percentage}
+    if employees is None and availability_constraints:
+        findings["availability_constraints"] = availability_constraints
+    if detected_issues:
+        findings["detected_issues"] = detected_issues
+    return analyze_findings(findings)
 
 
 def run_tradeoff_test():
-    """Simple test function that prints the model output using mock input."""
+    """Simple test function that prints the findings and model output for a mock schedule."""
+
+    mock_employees = [
+        {"employee_id": 1, "name": "John Doe", "hourly_rate": 20.0, "max_hours": 40,
+         "availability": {day: {"start": 9, "end": 17} for day in ["Mon", "Tue", "Wed"]}},
+        {"employee_id": 2, "name": "Jane Smith", "hourly_rate": 18.0, "max_hours": 20,
+         "availability": {day: {"start": 10, "end": 18} for day in ["Mon", "Fri"]}}
+    ]
+    mock_tasks = [
+        {"task_id": "t1", "duration_minutes": 480, "start_datetime": "2025-01-06T09:00", "end_datetime": "2025-01-06T17:00"},
+        {"task_id": "t2", "duration_minutes": 480, "start_datetime": "2025-01-06T10:00", "end_datetime": "2025-01-06T18:00"},
+        {"task_id": "t3", "duration_minutes": 120, "start_datetime": "2025-01-07T14:00", "end_datetime": "2025-01-07T16:00"},
+        {"task_id": "t4", "duration_minutes": 120, "start_datetime": "2025-01-07T14:00", "end_datetime": "2025-01-07T16:00"}
+    ]
     mock_schedule = {
-        "monday": [
-            {"time": "09:00-17:00", "employee": "John Doe", "task": "Customer Service"},
-            {"time": "10:00-18:00", "employee": "Jane Smith", "task": "Sales"}
+        "assignments": [
+            {"task_id": "t1", "employee_id": 1, "employee_name": "John Doe",
+             "start_datetime": "2025-01-06T09:00", "end_datetime": "2025-01-06T17:00", "cost": 160.0},
+            {"task_id": "t2", "employee_id": 2, "employee_name": "Jane Smith",
+             "start_datetime": "2025-01-06T10:00", "end_datetime": "2025-01-06T18:00", "cost": 144.0},
+            {"task_id": "t3", "employee_id": 1, "employee_name": "John Doe",
+             "start_datetime": "2025-01-07T14:00", "end_datetime": "2025-01-07T16:00", "cost": 40.0}
         ],
-        "tuesday": [
-            {"time": "09:00-17:00", "employee": "John Doe", "task": "Customer Service"}
-        ]
+        "unassigned": [{"task_id": "t4", "reason": "no employee is available for the task duration within its time window"}],
+        "total_cost": 344.0
     }
     
-    mock_budget = 5000.0
-    mock_coverage = 85
-    mock_availability = {
-        "John Doe": ["monday", "tuesday", "wednesday"],
-        "Jane Smith": ["monday", "friday"]
-    }
-    mock_issues = [
-        {
-            "type": "understaffed",
-            "time_slot": "tuesday 14:00-16:00",
-            "severity": "medium"
-        },
-        {
-            "type": "overtime_risk",
-            "employee": "John Doe",
-            "hours": 42
-        }
-    ]
-    
     try:
-        result = analyze_tradeoffs(
-            schedule_json=mock_schedule,
-            budget=mock_budget,
-            coverage_percentage=mock_coverage,
-            availability_constraints=mock_availability,
-            detected_issues=mock_issues
-        )
+        findings = detect_issues(mock_schedule, mock_tasks, mock_employees, budget=500.0, required_coverage=85)
+        print("Detected Issues:")
+        print(json.dumps(findings, indent=2))
+        
+        result = analyze_findings(findings)
         
         print("Trade-off Analysis Result:")
         print(json.dumps(result, indent=2))
@@ -0,0 +1,288 @@
+"""
+Shared, rate-limited Gemini client.
+
+Every Gemini prompt goes through ``generate`` / ``generate_json``, which wrap
+the one process-wide model instance (see ``backend.registry``) with:
+
+- a per-call deadline covering queueing, every attempt and the backoff sleeps
+- retries with full-jitter exponential backoff for transient errors
+  (timeouts, 429 and 5xx responses)
+- a token-bucket rate limiter sized to the API quota, shared by all callers
+- a circuit breaker that opens after consecutive failures and fails fast
+  until a cool-down has passed, then lets one trial call through
+
+When Gemini is degraded, callers get an ``LLMUnavailable`` error within the
+deadline (immediately while the breaker is open) instead of queueing on a slow
+upstream, and can fall back to local heuristics.
+"""
+
+import json
+import os
+import random
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from backend.registry import get_gemini_model
+
+GEMINI_TIMEOUT_SECONDS = float(os.environ.get("GEMINI_TIMEOUT_SECONDS", "15"))
+GEMINI_MAX_RETRIES = int(os.environ.get("GEMINI_MAX_RETRIES", "2"))
+GEMINI_BACKOFF_BASE_SECONDS = float(os.environ.get("GEMINI_BACKOFF_BASE_SECONDS", "0.5"))
+GEMINI_BACKOFF_MAX_SECONDS = float(os.environ.get("GEMINI_BACKOFF_MAX_SECONDS", "8"))
+# Requests per minute allowed by the API quota, and how many may go out back to back
+GEMINI_RATE_PER_MINUTE = float(os.environ.get("GEMINI_RATE_PER_MINUTE", "60"))
+GEMINI_BURST = int(os.environ.get("GEMINI_BURST", "5"))
+GEMINI_BREAKER_FAILURES = int(os.environ.get("GEMINI_BREAKER_FAILURES", "5"))
+GEMINI_BREAKER_RESET_SECONDS = float(os.environ.get("GEMINI_BREAKER_RESET_SECONDS", "30"))
+
+
+class LLMUnavailable(RuntimeError):
+    """Gemini is not configured, could not answer within the deadline, or the circuit breaker is open."""
+
+
+class LLMResponseError(ValueError):
+    """Gemini answered, but the answer is not valid JSON."""
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: ``rate`` tokens per second, at most ``capacity`` stored.
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        # Caller holds self._lock
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """
+        Take one token, waiting at most ``timeout`` seconds for it.
+
+        Returns:
+            True if a token was taken, False if none became available in time
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate if self.rate > 0 else float("inf")
+            if deadline is not None and now + wait > deadline:
+                return False
+            time.sleep(wait)
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    closed: calls go through; ``failure_threshold`` failures in a row open it.
+    open: calls are rejected until ``reset_seconds`` have passed.
+    half_open: one trial call goes through; success closes the breaker,
+        failure opens it again.
+    """
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_seconds = reset_seconds
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state(time.monotonic())
+
+    def _state(self, now: float) -> str:
+        # Caller holds self._lock
+        if self._opened_at is None:
+            return "closed"
+        if now - self._opened_at >= self.reset_seconds:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> Tuple[bool, bool]:
+        """
+        Decide whether a call may go out now.
+
+        Returns:
+            (admitted, trial): ``trial`` is True for the single half-open trial
+            call, whose caller must pass it back to ``record_success``,
+            ``record_failure`` or ``release``
+        """
+        with self._lock:
+            state = self._state(time.monotonic())
+            if state == "closed":
+                return True, False
+            if state == "half_open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True, True
+            return False, False
+
+    def record_success(self, trial: bool = False) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            if trial:
+                self._trial_in_flight = False
+
+    def record_failure(self, trial: bool = False) -> None:
+        with self._lock:
+            self._failures += 1
+            if trial or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            if trial:
+                self._trial_in_flight = False
+
+    def release(self, trial: bool = False) -> None:
+        """End a call that neither succeeded nor failed upstream (e.g. a bad request)."""
+        if not trial:
+            return
+        with self._lock:
+            self._trial_in_flight = False
+
+
+def _is_transient(error: Exception) -> bool:
+    """Timeouts, throttling and server-side errors are worth retrying."""
+    try:
+        from google.api_core import exceptions
+    except ImportError:
+        return isinstance(error, TimeoutError)
+    return isinstance(error, (
+        TimeoutError,
+        exceptions.DeadlineExceeded,
+        exceptions.ResourceExhausted,
+        exceptions.TooManyRequests,
+        exceptions.ServiceUnavailable,
+        exceptions.InternalServerError,
+        exceptions.GatewayTimeout,
+        exceptions.Aborted
+    ))
+
+
+rate_limiter = TokenBucket(GEMINI_RATE_PER_MINUTE / 60.0, GEMINI_BURST)
+breaker = CircuitBreaker(GEMINI_BREAKER_FAILURES, GEMINI_BREAKER_RESET_SECONDS)
+
+_stats_lock = threading.Lock()
+_stats = {"calls": 0, "successes": 0, "retries": 0, "failures": 0, "rejected": 0, "throttled": 0}
+
+
+def _count(key: str) -> None:
+    with _stats_lock:
+        _stats[key] += 1
+
+
+def generate(prompt: str, timeout: float = GEMINI_TIMEOUT_SECONDS, max_retries: int = GEMINI_MAX_RETRIES) -> str:
+    """
+    Send ``prompt`` to the shared Gemini model and return the response text.
+
+    Args:
+        prompt: Prompt text
+        timeout: Deadline in seconds for the whole call, including waiting
+            for the rate limiter, retries and backoff
+        max_retries: Retries after the first attempt for transient errors
+
+    Returns:
+        The stripped response text
+
+    Raises:
+        LLMUnavailable: If GEMINI_API_KEY is not set, the breaker is open, the
+            rate limit or the deadline leaves no time, or every attempt failed
+            with a transient error
+        RuntimeError: If Gemini rejects the request or returns an empty response
+    """
+    try:
+        model = get_gemini_model()
+    except ValueError as e:
+        # Configuration, not a bad answer: callers fall back instead of retrying
+        raise LLMUnavailable(f"Gemini is not configured: {e}")
+    deadline = time.monotonic() + timeout
+    _count("calls")
+
+    attempt = 0
+    while True:
+        admitted, trial = breaker.allow()
+        if not admitted:
+            _count("rejected")
+            raise LLMUnavailable("Gemini circuit breaker is open")
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0 or not rate_limiter.acquire(timeout=remaining):
+            breaker.release(trial)
+            _count("throttled")
+            raise LLMUnavailable(f"Gemini rate limit leaves no time within the {timeout:g}s deadline")
+
+        try:
+            response = model.generate_content(
+                prompt,
+                request_options={"timeout": max(0.1, deadline - time.monotonic())}
+            )
+        except Exception as e:
+            if not _is_transient(e):
+                breaker.release(trial)
+                _count("failures")
+                raise RuntimeError(f"Gemini API call failed: {e}")
+
+            breaker.record_failure(trial)
+            # Full jitter keeps retries from many callers from arriving in waves
+            delay = random.uniform(0, min(GEMINI_BACKOFF_MAX_SECONDS, GEMINI_BACKOFF_BASE_SECONDS * 2 ** attempt))
+            if attempt >= max_retries or time.monotonic() + delay >= deadline:
+                _count("failures")
+                raise LLMUnavailable(f"Gemini unavailable after {attempt + 1} attempt(s): {e}")
+            attempt += 1
+            _count("retries")
+            time.sleep(delay)
+            continue
+
+        breaker.record_success(trial)
+        text = getattr(response, "text", None)
+        if not text:
+            _count("failures")
+            raise RuntimeError("Gemini API returned empty or invalid response")
+        _count("successes")
+        return text.strip()
+
+
+def parse_json_response(response_text: str) -> Any:
+    """
+    Parse a JSON answer, tolerating a surrounding markdown code fence.
+
+    Raises:
+        LLMResponseError: If the text is not valid JSON
+    """
+    if response_text.startswith("```json"):
+        response_text = response_text[7:]
+    if response_text.startswith("```"):
+        response_text = response_text[3:]
+    if response_text.endswith("```"):
+        response_text = response_text[:-3]
+    response_text = response_text.strip()
+
+    try:
+        return json.loads(response_text)
+    except json.JSONDecodeError as e:
+        raise LLMResponseError(f"Failed to parse JSON response from Gemini: {e}. Response: {response_text[:200]}")
+
+
+def generate_json(prompt: str, timeout: float = GEMINI_TIMEOUT_SECONDS) -> Any:
+    """``generate`` followed by ``parse_json_response``; raises as both do."""
+    return parse_json_response(generate(prompt, timeout=timeout))
+
+
+def stats() -> Dict[str, Any]:
+    """Call counters and the breaker state, for /metrics."""
+    with _stats_lock:
+        counters = dict(_stats)
+    return {**counters, "breaker": breaker.state}
@@ -0,0 +1,178 @@
+"""
+Re-ranking stage for employee candidates.
+
+The vector store returns a wide candidate set ranked by cosine similarity
+alone. This stage re-scores those candidates in one vectorized pass over the
+roster's skill matrix, combining similarity with skill fit, hourly cost,
+performance rating, remaining weekly hours, availability in the task window
+and the employee's historical success rate on the task type, and returns the
+final top-k with the value of every factor so callers can explain the ranking.
+
+Weights are configured per factor through RERANK_WEIGHT_<FACTOR> environment
+variables (e.g. RERANK_WEIGHT_COST=0.3) or per call; they are normalized to
+sum to 1, so the final score stays in [0, 1].
+"""
+
+import os
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from backend.availability import availability_windows, MINUTES_PER_WEEK, to_minutes
+from backend.ai.skill_matrix import SkillMatrix
+from backend.ai.track_record import OUTCOMES, OutcomeMatrix
+
+FACTORS = ("similarity", "skill_fit", "cost", "performance", "remaining_hours", "availability", "track_record")
+
+_DEFAULT_WEIGHTS = {
+    "similarity": 0.25,
+    "skill_fit": 0.35,
+    "cost": 0.15,
+    "performance": 0.15,
+    "remaining_hours": 0.05,
+    "availability": 0.05,
+    "track_record": 0.10
+}
+
+DEFAULT_WEIGHTS = {
+    factor: float(os.environ.get(f"RERANK_WEIGHT_{factor.upper()}", default))
+    for factor, default in _DEFAULT_WEIGHTS.items()
+}
+
+
+def normalize_weights(weights: Optional[Dict[str, float]] = None) -> Dict[str, float]:
+    """
+    Merge ``weights`` over the defaults and scale them to sum to 1.
+
+    Raises:
+        ValueError: If a factor is unknown, a weight is negative, or all weights are zero
+    """
+    merged = dict(DEFAULT_WEIGHTS)
+    for factor, weight in (weights or {}).items():
+        if factor not in FACTORS:
+            raise ValueError(f"Unknown re-ranking factor '{factor}'; expected one of {', '.join(FACTORS)}")
+        merged[factor] = float(weight)
+
+    if any(weight < 0 for weight in merged.values()):
+        raise ValueError("Re-ranking weights must be non-negative")
+    total = sum(merged.values())
+    if total <= 0:
+        raise ValueError("At least one re-ranking weight must be positive")
+    return {factor: weight / total for factor, weight in merged.items()}
+
+
+def _availability_overlap(
+    matrix: SkillMatrix,
+    rows: np.ndarray,
+    window: Optional[Tuple[Any, Any]]
+) -> np.ndarray:
+    """Share of the task window (at most one week of it) each candidate is available."""
+    if window is None:
+        return np.ones(len(rows), dtype=np.float32)
+
+    window_start = to_minutes(window[0], round_up=True)
+    window_end = min(to_minutes(window[1]), window_start + MINUTES_PER_WEEK)
+    if window_end <= window_start:
+        return np.zeros(len(rows), dtype=np.float32)
+
+    overlap = np.array([
+        sum(end - start for start, end in availability_windows(
+            matrix.employees[row].get("availability"), window_start, window_end
+        ))
+        for row in rows
+    ], dtype=np.float32)
+    return overlap / (window_end - window_start)
+
+
+def rerank(
+    matrix: SkillMatrix,
+    hits: Sequence[Any],
+    required_skills: Dict[str, int],
+    limit: int = 10,
+    weights: Optional[Dict[str, float]] = None,
+    window: Optional[Tuple[Any, Any]] = None,
+    booked_hours: Optional[Dict[Any, float]] = None,
+    task_type: Optional[str] = None,
+    track_record: Optional[OutcomeMatrix] = None
+) -> List[Dict[str, Any]]:
+    """
+    Re-score vector-store candidates and return the final top-k.
+
+    Every factor is scaled to [0, 1] (higher is better):
+        similarity: cosine score from the vector store, clipped at 0
+        skill_fit: structured skill-match score (see ``SkillMatrix``)
+        cost: hourly_rate relative to the roster range, cheapest = 1
+        performance: performance_rating
+        remaining_hours: max_hours minus ``booked_hours``, relative to the
+            roster's largest max_hours
+        availability: share of the task window covered by the employee's
+            weekly availability (1 for every candidate when no window is given)
+        track_record: smoothed historical success rate on ``task_type``
+            (1 for every candidate when no outcome matrix is given)
+
+    Args:
+        matrix: Skill matrix of the current roster
+        hits: VectorHit candidates (payloads must carry employee_id)
+        required_skills: Dictionary mapping skill names to required levels
+        limit: Number of employees to return
+        weights: Optional per-factor weights overriding DEFAULT_WEIGHTS
+        window: Optional (start_datetime, end_datetime) of the task
+        booked_hours: Optional hours per employee_id already booked in the
+            week of the task window (e.g. from the session's persisted schedule)
+        task_type: Optional task type the track record is looked up for
+        track_record: Optional outcome matrix (see backend.ai.track_record)
+
+    Returns:
+        List of {employee_id, employee_name, score, breakdown} sorted by score
+        descending, where breakdown maps each factor to its [0, 1] value
+
+    Raises:
+        ValueError: If the weights are invalid
+    """
+    weights = normalize_weights(weights)
+
+    # Candidates missing from the roster cannot be scored on its columns
+    candidates = [
+        (hit, matrix.rows[hit.payload.get("employee_id")])
+        for hit in hits
+        if hit.payload.get("employee_id") in matrix.rows
+    ]
+    if not candidates:
+        return []
+
+    rows = np.array([row for _, row in candidates], dtype=np.intp)
+    rates = matrix.rates[rows]
+    rate_low, rate_high = float(matrix.rates.min()), float(matrix.rates.max())
+    booked = np.array([
+        float((booked_hours or {}).get(matrix.employee_ids[row], 0.0)) for row in rows
+    ], dtype=np.float32)
+    hours_scale = max(float(matrix.max_hours.max()), 1.0)
+
+    factors = {
+        "similarity": np.clip([hit.score for hit, _ in candidates], 0.0, 1.0),
+        "skill_fit": matrix.factors(required_skills, rows)["score"],
+        "cost": (
+            (rate_high - rates) / (rate_high - rate_low)
+            if rate_high > rate_low else np.ones(len(rows), dtype=np.float32)
+        ),
+        "performance": np.clip(matrix.performance[rows], 0.0, 1.0),
+        "remaining_hours": np.clip(matrix.max_hours[rows] - booked, 0.0, None) / hours_scale,
+        "availability": _availability_overlap(matrix, rows, window),
+        "track_record": (
+            track_record.rates([matrix.employee_ids[row] for row in rows], task_type)[:, OUTCOMES.index("success")]
+            if track_record is not None else np.ones(len(rows), dtype=np.float32)
+        )
+    }
+
+    scores = sum(weights[factor] * np.asarray(values, dtype=np.float64) for factor, values in factors.items())
+    order = np.argsort(-scores, kind="stable")[:limit]
+
+    return [
+        {
+            "employee_id": matrix.employee_ids[rows[i]],
+            "employee_name": candidates[i][0].payload.get("name", "Unknown"),
+            "score": float(scores[i]),
+            "breakdown": {factor: round(float(values[i]), 4) for factor, values in factors.items()}
+        }
+        for i in order
+    ]
@@ -0,0 +1,152 @@
+"""
+Structured skill-match scoring over a dense employees x skills matrix.
+
+Skill levels and per-skill success rates already sit in the employee
+payloads, so comparing them numerically is both exact and far cheaper than
+embedding a "Task requiring skills ..." string. The roster is laid out once
+as float32 matrices over a fixed skill vocabulary (``SKILLS_POOL`` plus any
+extra skill seen in the roster), and every request is scored against all
+employees with a few vectorized numpy operations.
+"""
+
+import os
+import sys
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Add project root to path for imports
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from backend import roster
+from scripts.generate_employees import SKILLS_POOL
+
+# Share of the score that depends on past success with the required skills
+PERFORMANCE_WEIGHT = float(os.environ.get("STRUCTURED_PERFORMANCE_WEIGHT", "0.5"))
+
+
+class SkillMatrix:
+    """
+    Employees x skills level and success-rate matrices for one roster.
+
+    For a requirement vector r (required level per required skill), each employee gets:
+        coverage: share of required skills met at or above the required level
+        shortfall: total missing levels divided by the total required levels
+        performance: success rate on the required skills, weighted by r
+    and the score
+        coverage * (1 - shortfall) * (1 - PERFORMANCE_WEIGHT + PERFORMANCE_WEIGHT * performance)
+    which lies in [0, 1].
+    """
+
+    def __init__(self, employees: Sequence[Dict[str, Any]], vocabulary: Sequence[str] = SKILLS_POOL):
+        index = {skill: i for i, skill in enumerate(vocabulary)}
+        for employee in employees:
+            for skill in (employee.get("skills") or {}):
+                index.setdefault(skill, len(index))
+
+        self.vocabulary = index
+        self.employees = list(employees)
+        self.employee_ids = [employee.get("employee_id") for employee in self.employees]
+        self.rows = {employee_id: row for row, employee_id in enumerate(self.employee_ids)}
+        self.levels = np.zeros((len(self.employees), max(1, len(index))), dtype=np.float32)
+        self.success = np.zeros_like(self.levels)
+        # Per-employee columns used by the re-ranking stage
+        self.rates = np.array([float(e.get("hourly_rate") or 0.0) for e in self.employees], dtype=np.float32)
+        self.performance = np.array([float(e.get("performance_rating") or 0.0) for e in self.employees], dtype=np.float32)
+        self.max_hours = np.array([float(e.get("max_hours") or 0.0) for e in self.employees], dtype=np.float32)
+
+        for row, employee in enumerate(self.employees):
+            history = employee.get("past_task_success") or {}
+            overall = float(employee.get("performance_rating") or 0.0)
+            for skill, level in (employee.get("skills") or {}).items():
+                column = index[skill]
+                self.levels[row, column] = float(level)
+                self.success[row, column] = float(history.get(skill, overall))
+
+    def __len__(self) -> int:
+        return len(self.employees)
+
+    def requirement(self, required_skills: Dict[str, int]) -> Tuple[np.ndarray, np.ndarray, int, float]:
+        """
+        Return (columns, levels, unknown_count, unknown_levels) for ``required_skills``.
+
+        Only the required columns are touched when scoring. Skills outside the
+        vocabulary cannot be met by anyone; they are counted separately so they
+        still lower coverage and raise shortfall.
+        """
+        columns = []
+        levels = []
+        unknown_count = 0
+        unknown_levels = 0.0
+        for skill, level in required_skills.items():
+            column = self.vocabulary.get(skill)
+            if column is None:
+                unknown_count += 1
+                unknown_levels += float(level)
+            elif float(level) > 0:
+                columns.append(column)
+                levels.append(float(level))
+        return np.array(columns, dtype=np.intp), np.array(levels, dtype=np.float32), unknown_count, unknown_levels
+
+    def factors(self, required_skills: Dict[str, int], rows: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+        """
+        Compute coverage, shortfall, performance and score for every employee
+        (or only ``rows``).
+        """
+        columns, r, unknown_count, unknown_levels = self.requirement(required_skills)
+        count = len(self) if rows is None else len(rows)
+        required_count = len(columns) + unknown_count
+        required_total = float(r.sum()) + unknown_levels
+
+        if required_count == 0 or required_total <= 0:
+            ones = np.ones(count, dtype=np.float32)
+            return {"coverage": ones, "shortfall": 1 - ones, "performance": ones, "score": ones}
+
+        levels = self.levels[:, columns] if rows is None else self.levels[np.ix_(rows, columns)]
+        success = self.success[:, columns] if rows is None else self.success[np.ix_(rows, columns)]
+
+        coverage = (levels >= r).sum(axis=1) / required_count
+        shortfall = (np.maximum(r - levels, 0).sum(axis=1) + unknown_levels) / required_total
+        performance = (success @ r) / required_total
+        score = coverage * (1 - shortfall) * (1 - PERFORMANCE_WEIGHT + PERFORMANCE_WEIGHT * performance)
+        return {"coverage": coverage, "shortfall": shortfall, "performance": performance, "score": score}
+
+    def top_k(self, required_skills: Dict[str, int], limit: int = 10) -> List[Tuple[Dict[str, Any], float]]:
+        """
+        Return the ``limit`` best-scoring employees as (payload, score), best first.
+        """
+        if not self.employees:
+            return []
+        scores = self.factors(required_skills)["score"]
+        if limit >= len(scores):
+            order = np.argsort(-scores, kind="stable")
+        else:
+            candidates = np.argpartition(-scores, limit - 1)[:limit]
+            order = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [(self.employees[row], float(scores[row])) for row in order]
+
+
+_matrix: Optional[SkillMatrix] = None
+_matrix_fingerprint: Optional[str] = None
+_lock = threading.Lock()
+
+
+def get_skill_matrix() -> SkillMatrix:
+    """
+    Return the skill matrix for the current roster, rebuilding it when the roster changes.
+
+    Raises:
+        ValueError: If the Qdrant backend is selected but not configured
+    """
+    global _matrix, _matrix_fingerprint
+
+    with _lock:
+        employees = roster.load_employees()
+        fingerprint = roster.fingerprint()
+        if _matrix is None or fingerprint != _matrix_fingerprint:
+            _matrix = SkillMatrix(employees)
+            _matrix_fingerprint = fingerprint
+        return _matrix
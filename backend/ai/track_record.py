@@ -0,0 +1,186 @@
+"""
+Per-employee, per-task-type outcome rates from historical tasks.
+
+Historical tasks carry ``employee_assigned`` and ``outcome`` (success,
+delayed or escalated). They are aggregated at ``embed_tasks`` ingest time
+into an employees x task types x outcomes count matrix held in memory, so the
+ranking stage can read an employee's track record for a task type with a
+constant-time lookup instead of querying the "tasks" collection per request.
+
+Rates are smoothed towards the task type's overall outcome mix (itself
+smoothed towards the global mix), so employees with only a handful of past
+tasks are not ranked on one lucky or unlucky outcome.
+"""
+
+import logging
+import os
+import threading
+from typing import Any, Dict, Iterable, Optional, Sequence
+
+import numpy as np
+
+from backend.ai.vector_store import get_vector_store
+
+OUTCOMES = ("success", "delayed", "escalated")
+
+# Pseudo-count of prior outcomes mixed into every employee's record
+SMOOTHING = float(os.environ.get("TRACK_RECORD_SMOOTHING", "5"))
+
+
+class OutcomeMatrix:
+    """
+    Outcome counts indexed by (employee row, task type column, outcome).
+
+    Updates are incremental and idempotent per historical ``task_id``:
+    re-ingesting a task replaces its previous outcome instead of counting it twice.
+    """
+
+    def __init__(self, smoothing: float = SMOOTHING):
+        self.smoothing = smoothing
+        self._lock = threading.Lock()
+        self.employees: Dict[Any, int] = {}
+        self.task_types: Dict[str, int] = {}
+        self.counts = np.zeros((8, 8, len(OUTCOMES)), dtype=np.float32)
+        self.type_counts = np.zeros((8, len(OUTCOMES)), dtype=np.float32)
+        self.total_counts = np.zeros(len(OUTCOMES), dtype=np.float32)
+        self._seen: Dict[Any, tuple] = {}
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._seen)
+
+    def _index(self, employee_id, task_type):
+        # Caller holds self._lock; grows the arrays by doubling
+        row = self.employees.setdefault(employee_id, len(self.employees))
+        column = self.task_types.setdefault(task_type, len(self.task_types))
+        rows, columns, _ = self.counts.shape
+        if row >= rows or column >= columns:
+            grown = np.zeros(
+                (max(rows, 2 * row + 1), max(columns, 2 * column + 1), len(OUTCOMES)), dtype=np.float32
+            )
+            grown[:rows, :columns] = self.counts
+            self.counts = grown
+        if column >= len(self.type_counts):
+            grown = np.zeros((self.counts.shape[1], len(OUTCOMES)), dtype=np.float32)
+            grown[:len(self.type_counts)] = self.type_counts
+            self.type_counts = grown
+        return row, column
+
+    def _count(self, cell, delta):
+        row, column, outcome = cell
+        self.counts[row, column, outcome] += delta
+        self.type_counts[column, outcome] += delta
+        self.total_counts[outcome] += delta
+
+    def add(self, payloads: Iterable[Dict[str, Any]]) -> int:
+        """
+        Fold historical task payloads (as written by ``embed_tasks``) into the counts.
+
+        Payloads without an assigned employee or with an unknown outcome are skipped.
+
+        Returns:
+            Number of payloads counted
+        """
+        added = 0
+        with self._lock:
+            for payload in payloads:
+                employee_id = payload.get("employee_assigned")
+                outcome = str(payload.get("outcome", "")).lower()
+                if employee_id is None or outcome not in OUTCOMES:
+                    continue
+                row, column = self._index(employee_id, str(payload.get("task_type")))
+                cell = (row, column, OUTCOMES.index(outcome))
+
+                task_id = payload.get("task_id")
+                previous = self._seen.get(task_id) if task_id is not None else None
+                if previous is not None:
+                    self._count(previous, -1)
+                if task_id is not None:
+                    self._seen[task_id] = cell
+                self._count(cell, 1)
+                added += 1
+        return added
+
+    def _prior(self, column: Optional[int]) -> np.ndarray:
+        # Caller holds self._lock
+        uniform = np.full(len(OUTCOMES), 1.0 / len(OUTCOMES), dtype=np.float64)
+        total = float(self.total_counts.sum())
+        overall = (self.total_counts + self.smoothing * uniform) / (total + self.smoothing)
+        if column is None:
+            return overall
+        counts = self.type_counts[column]
+        return (counts + self.smoothing * overall) / (float(counts.sum()) + self.smoothing)
+
+    def rates(self, employee_ids: Sequence[Any], task_type: Optional[str]) -> np.ndarray:
+        """
+        Smoothed outcome rates for each employee on ``task_type``.
+
+        Employees or task types without history get the prior. Without a
+        ``task_type`` the employee's record across all task types is used.
+
+        Returns:
+            float64 array of shape (len(employee_ids), 3), columns in OUTCOMES order
+        """
+        with self._lock:
+            column = self.task_types.get(task_type) if task_type is not None else None
+            prior = self._prior(column)
+            result = np.tile(prior, (len(employee_ids), 1))
+            if task_type is not None and column is None:
+                return result
+
+            rows = np.array([self.employees.get(employee_id, -1) for employee_id in employee_ids], dtype=np.intp)
+            known = rows >= 0
+            if not known.any():
+                return result
+            counts = self.counts[rows[known], column] if column is not None else self.counts[rows[known]].sum(axis=1)
+            counts = counts.astype(np.float64)
+            result[known] = (counts + self.smoothing * prior) / (counts.sum(axis=1, keepdims=True) + self.smoothing)
+            return result
+
+    def record(self, employee_id: Any, task_type: Optional[str] = None) -> Dict[str, float]:
+        """Smoothed rates and the number of past tasks for one employee."""
+        rates = self.rates([employee_id], task_type)[0]
+        with self._lock:
+            row = self.employees.get(employee_id)
+            column = self.task_types.get(task_type) if task_type is not None else None
+            if row is None or (task_type is not None and column is None):
+                tasks = 0
+            elif column is None:
+                tasks = int(self.counts[row].sum())
+            else:
+                tasks = int(self.counts[row, column].sum())
+        return {**{outcome: round(float(rate), 4) for outcome, rate in zip(OUTCOMES, rates)}, "tasks": tasks}
+
+
+_track_record: Optional[OutcomeMatrix] = None
+_lock = threading.Lock()
+
+
+def get_track_record() -> OutcomeMatrix:
+    """
+    Return the process-wide outcome matrix, building it from the "tasks"
+    collection on first use.
+
+    If the collection cannot be read the matrix starts empty (every rate is
+    the prior) and fills up as ``embed_tasks`` ingests history.
+    """
+    global _track_record
+
+    with _lock:
+        if _track_record is None:
+            matrix = OutcomeMatrix()
+            try:
+                matrix.add(payload for _, payload in get_vector_store().scroll("tasks"))
+            except Exception as e:
+                logging.warning(f"Historical outcomes unavailable: {e}")
+            _track_record = matrix
+        return _track_record
+
+
+def refresh() -> OutcomeMatrix:
+    """Drop the in-memory matrix and rebuild it from the "tasks" collection."""
+    global _track_record
+
+    with _lock:
+        _track_record = None
+    return get_track_record()
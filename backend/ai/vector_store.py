@@ -0,0 +1,447 @@
+"""
+Pluggable vector-store backends for employee and task embeddings.
+
+``QdrantVectorStore`` wraps the shared Qdrant client. ``LocalVectorStore`` is
+an in-process index: a numpy matrix of L2-normalized vectors per collection,
+searched by brute-force cosine similarity and persisted as a snapshot on disk.
+The employee roster is small enough to keep in RAM, so the local backend gives
+searches without a network hop and doubles as the stand-in for tests and
+benchmarks when no Qdrant instance is available.
+
+Queries accept an optional filter: a sequence of ``FieldRange`` /
+``FieldMatchAny`` conditions that must all hold. Qdrant evaluates them against
+its payload indexes; the local index applies the same semantics (dotted keys
+reach into nested payloads, a missing or non-numeric value fails a range, an
+array matches if any element is wanted) before scoring.
+
+The backend is chosen by the VECTOR_STORE environment variable:
+"qdrant", "local", or "auto" (default: Qdrant when QDRANT_URL/QDRANT_API_KEY
+are set, the local index otherwise).
+"""
+
+import json
+import os
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from backend.registry import get_qdrant_client, registry
+
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Snapshot directory of the local index, next to the CSVs it is built from
+# rather than relative to the working directory; an empty value keeps it in memory
+DEFAULT_LOCAL_PATH = os.environ.get("VECTOR_STORE_PATH", os.path.join(project_root, "data", "vector_store"))
+
+
+class VectorHit(NamedTuple):
+    id: Any
+    score: float
+    payload: Dict[str, Any]
+
+
+class FieldRange(NamedTuple):
+    """Numeric payload value within [gte, lte]; either bound may be omitted."""
+    key: str
+    gte: Optional[float] = None
+    lte: Optional[float] = None
+
+
+class FieldMatchAny(NamedTuple):
+    """Payload value (or any element of an array value) is one of ``any``."""
+    key: str
+    any: Tuple[Any, ...]
+
+
+# Payload index types, named as in Qdrant's PayloadSchemaType
+INTEGER = "integer"
+FLOAT = "float"
+KEYWORD = "keyword"
+
+Filter = Sequence[Any]
+
+
+class VectorStore(ABC):
+    """Interface shared by all vector-store backends."""
+
+    @abstractmethod
+    def upsert(self, collection: str, ids: Sequence[Any], vectors: np.ndarray, payloads: Sequence[Dict[str, Any]]) -> None:
+        """Insert or replace points by id."""
+
+    @abstractmethod
+    def query(self, collection: str, vector: Sequence[float], limit: int = 10, filter: Optional[Filter] = None) -> List[VectorHit]:
+        """Return the ``limit`` points most similar to ``vector`` that pass ``filter``."""
+
+    def query_batch(
+        self,
+        collection: str,
+        vectors: np.ndarray,
+        limit: int = 10,
+        filters: Optional[Sequence[Optional[Filter]]] = None
+    ) -> List[List[VectorHit]]:
+        """Run one query per vector; ``filters`` holds an optional filter per vector."""
+        filters = filters if filters is not None else [None] * len(vectors)
+        return [self.query(collection, vector, limit=limit, filter=f) for vector, f in zip(vectors, filters)]
+
+    def create_payload_indexes(self, collection: str, schema: Dict[str, str]) -> None:
+        """Index payload fields used in filters ({field: INTEGER|FLOAT|KEYWORD}); no-op by default."""
+
+    @abstractmethod
+    def scroll(self, collection: str) -> List[Tuple[Any, Dict[str, Any]]]:
+        """Return (id, payload) for every point in the collection."""
+
+    @abstractmethod
+    def count(self, collection: str) -> int:
+        """Return the number of points in the collection."""
+
+    def flush(self) -> None:
+        """Persist pending writes (no-op for remote backends)."""
+
+    def close(self) -> None:
+        self.flush()
+
+
+def _qdrant_filter(conditions: Optional[Filter]):
+    if not conditions:
+        return None
+
+    from qdrant_client.models import FieldCondition, Filter as QdrantFilter, MatchAny, Range
+
+    must = []
+    for condition in conditions:
+        if isinstance(condition, FieldRange):
+            must.append(FieldCondition(key=condition.key, range=Range(gte=condition.gte, lte=condition.lte)))
+        elif isinstance(condition, FieldMatchAny):
+            must.append(FieldCondition(key=condition.key, match=MatchAny(any=list(condition.any))))
+        else:
+            raise ValueError(f"Unsupported filter condition: {condition!r}")
+    return QdrantFilter(must=must)
+
+
+class QdrantVectorStore(VectorStore):
+    """Vector store backed by a Qdrant collection per data type."""
+
+    def __init__(self, client):
+        self.client = client
+
+    def upsert(self, collection, ids, vectors, payloads):
+        from qdrant_client.models import Batch
+
+        self.client.upsert(
+            collection_name=collection,
+            points=Batch(ids=list(ids), vectors=np.asarray(vectors).tolist(), payloads=list(payloads))
+        )
+
+    def query(self, collection, vector, limit=10, filter=None):
+        response = self.client.query_points(
+            collection_name=collection,
+            query=np.asarray(vector).tolist(),
+            query_filter=_qdrant_filter(filter),
+            limit=limit,
+            with_payload=True
+        )
+        return [VectorHit(point.id, float(point.score), point.payload or {}) for point in response.points]
+
+    def query_batch(self, collection, vectors, limit=10, filters=None):
+        from qdrant_client.models import QueryRequest
+
+        if len(vectors) == 0:
+            return []
+
+        filters = filters if filters is not None else [None] * len(vectors)
+        responses = self.client.query_batch_points(
+            collection_name=collection,
+            requests=[
+                QueryRequest(
+                    query=np.asarray(vector).tolist(),
+                    filter=_qdrant_filter(f),
+                    limit=limit,
+                    with_payload=True
+                )
+                for vector, f in zip(vectors, filters)
+            ]
+        )
+        return [
+            [VectorHit(point.id, float(point.score), point.payload or {}) for point in response.points]
+            for response in responses
+        ]
+
+    def scroll(self, collection):
+        points = []
+        offset = None
+        while True:
+            records, offset = self.client.scroll(
+                collection_name=collection,
+                limit=256,
+                offset=offset,
+                with_payload=True,
+                with_vectors=False
+            )
+            points.extend((record.id, record.payload or {}) for record in records)
+            if offset is None:
+                return points
+
+    def count(self, collection):
+        return self.client.count(collection_name=collection).count
+
+    def create_payload_indexes(self, collection, schema):
+        # Creating an index that already exists is a no-op in Qdrant
+        for field, field_type in schema.items():
+            self.client.create_payload_index(
+                collection_name=collection,
+                field_name=field,
+                field_schema=field_type
+            )
+
+
+class _LocalCollection:
+    def __init__(self, dim: int):
+        self.matrix = np.empty((0, dim), dtype=np.float32)
+        self.size = 0
+        self.ids: List[Any] = []
+        self.payloads: List[Dict[str, Any]] = []
+        self.rows: Dict[Any, int] = {}
+        # Per-key payload columns for filtering, rebuilt after writes
+        self._columns: Dict[Tuple[str, bool], Any] = {}
+
+    @property
+    def vectors(self) -> np.ndarray:
+        return self.matrix[:self.size]
+
+    def _reserve(self, extra: int) -> None:
+        needed = self.size + extra
+        if needed <= len(self.matrix):
+            return
+        capacity = max(needed, 2 * len(self.matrix), 64)
+        grown = np.empty((capacity, self.matrix.shape[1]), dtype=np.float32)
+        grown[:self.size] = self.matrix[:self.size]
+        self.matrix = grown
+
+    def upsert(self, ids, vectors, payloads) -> None:
+        self._reserve(len(ids))
+        for point_id, vector, payload in zip(ids, vectors, payloads):
+            row = self.rows.get(point_id)
+            if row is None:
+                row = self.rows[point_id] = self.size
+                self.size += 1
+                self.ids.append(point_id)
+                self.payloads.append(payload)
+            else:
+                self.payloads[row] = payload
+            self.matrix[row] = vector
+        self._columns.clear()
+
+    def _column(self, key: str, numeric: bool):
+        column = self._columns.get((key, numeric))
+        if column is None:
+            values = [_payload_value(payload, key) for payload in self.payloads]
+            if numeric:
+                column = np.array([_as_number(value) for value in values], dtype=np.float64)
+            else:
+                column = values
+            self._columns[(key, numeric)] = column
+        return column
+
+    def mask(self, conditions: Filter) -> np.ndarray:
+        """Boolean mask of the rows whose payload satisfies every condition."""
+        mask = np.ones(self.size, dtype=bool)
+        for condition in conditions:
+            if isinstance(condition, FieldRange):
+                # NaN (missing or non-numeric) compares False, so it never matches
+                column = self._column(condition.key, numeric=True)
+                if condition.gte is not None:
+                    mask &= column >= condition.gte
+                if condition.lte is not None:
+                    mask &= column <= condition.lte
+            elif isinstance(condition, FieldMatchAny):
+                wanted = set(condition.any)
+                column = self._column(condition.key, numeric=False)
+                mask &= np.fromiter((_matches_any(value, wanted) for value in column), dtype=bool, count=self.size)
+            else:
+                raise ValueError(f"Unsupported filter condition: {condition!r}")
+        return mask
+
+
+def _payload_value(payload: Dict[str, Any], key: str) -> Any:
+    value = payload
+    for part in key.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def _as_number(value: Any) -> float:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return np.nan
+    return float(value)
+
+
+def _matches_any(value: Any, wanted: set) -> bool:
+    if isinstance(value, list):
+        return any(item in wanted for item in value if not isinstance(item, (dict, list)))
+    return not isinstance(value, dict) and value in wanted
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def _top_k(scores: np.ndarray, limit: int) -> np.ndarray:
+    if limit >= len(scores):
+        return np.argsort(-scores, kind="stable")
+    candidates = np.argpartition(-scores, limit - 1)[:limit]
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+
+class LocalVectorStore(VectorStore):
+    """
+    In-process cosine-similarity index with an on-disk snapshot.
+
+    Each collection is a float32 matrix of normalized vectors plus parallel id
+    and payload lists. Queries are one matrix-vector (or matrix-matrix for
+    batches) product followed by a partial sort. Filtered queries first select
+    the matching rows from cached payload columns and score only those.
+    """
+
+    def __init__(self, path: Optional[str] = DEFAULT_LOCAL_PATH):
+        self.path = path or None
+        self._lock = threading.RLock()
+        self._collections: Dict[str, _LocalCollection] = {}
+        self._dirty = set()
+        if self.path:
+            self._load()
+
+    def _snapshot_files(self, collection: str) -> Tuple[str, str]:
+        return (
+            os.path.join(self.path, f"{collection}.npy"),
+            os.path.join(self.path, f"{collection}.json")
+        )
+
+    def _load(self) -> None:
+        if not os.path.isdir(self.path):
+            return
+        for filename in os.listdir(self.path):
+            if not filename.endswith(".json"):
+                continue
+            collection = filename[:-len(".json")]
+            vectors_file, meta_file = self._snapshot_files(collection)
+            if not os.path.exists(vectors_file):
+                continue
+            with open(meta_file, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            vectors = np.load(vectors_file)
+            data = _LocalCollection(vectors.shape[1])
+            data.upsert(meta["ids"], vectors, meta["payloads"])
+            self._collections[collection] = data
+
+    def upsert(self, collection, ids, vectors, payloads):
+        vectors = _normalize(vectors)
+        with self._lock:
+            data = self._collections.get(collection)
+            if data is None:
+                data = self._collections[collection] = _LocalCollection(vectors.shape[1])
+            data.upsert(list(ids), vectors, list(payloads))
+            self._dirty.add(collection)
+
+    def query(self, collection, vector, limit=10, filter=None):
+        return self.query_batch(
+            collection, np.asarray(vector, dtype=np.float32)[None, :], limit=limit, filters=[filter]
+        )[0]
+
+    def query_batch(self, collection, vectors, limit=10, filters=None):
+        queries = _normalize(np.atleast_2d(vectors))
+        filters = filters if filters is not None else [None] * len(queries)
+        with self._lock:
+            data = self._collections.get(collection)
+            if data is None or data.size == 0:
+                return [[] for _ in range(len(queries))]
+            ids, payloads = data.ids, data.payloads
+            if not any(filters):
+                rows = [None] * len(queries)
+                scores = queries @ data.vectors.T
+            else:
+                # Each distinct filter is evaluated once; rows are scored only if they match
+                masks = {}
+                rows, scores = [], []
+                for query, f in zip(queries, filters):
+                    if f:
+                        key = tuple(f)
+                        if key not in masks:
+                            masks[key] = np.flatnonzero(data.mask(f))
+                        selected = masks[key]
+                        rows.append(selected)
+                        scores.append(data.vectors[selected] @ query)
+                    else:
+                        rows.append(None)
+                        scores.append(data.vectors @ query)
+
+        results = []
+        for selected, row in zip(rows, scores):
+            top = _top_k(row, limit)
+            if selected is not None:
+                top_rows = selected[top]
+                results.append([VectorHit(ids[i], float(row[j]), payloads[i]) for i, j in zip(top_rows, top)])
+            else:
+                results.append([VectorHit(ids[i], float(row[i]), payloads[i]) for i in top])
+        return results
+
+    def scroll(self, collection):
+        with self._lock:
+            data = self._collections.get(collection)
+            if data is None:
+                return []
+            return list(zip(data.ids, data.payloads))
+
+    def count(self, collection):
+        with self._lock:
+            data = self._collections.get(collection)
+            return 0 if data is None else data.size
+
+    def flush(self):
+        if not self.path:
+            return
+        with self._lock:
+            os.makedirs(self.path, exist_ok=True)
+            for collection in sorted(self._dirty):
+                data = self._collections[collection]
+                vectors_file, meta_file = self._snapshot_files(collection)
+                np.save(vectors_file + ".tmp.npy", data.vectors)
+                with open(meta_file + ".tmp", "w", encoding="utf-8") as f:
+                    json.dump({"ids": data.ids, "payloads": data.payloads}, f)
+                os.replace(vectors_file + ".tmp.npy", vectors_file)
+                os.replace(meta_file + ".tmp", meta_file)
+            self._dirty.clear()
+
+
+def vector_store_backend() -> str:
+    """Resolve the configured backend name ("qdrant" or "local")."""
+    backend = os.environ.get("VECTOR_STORE", "auto").strip().lower()
+    if backend == "auto":
+        configured = os.environ.get("QDRANT_URL") and os.environ.get("QDRANT_API_KEY")
+        return "qdrant" if configured else "local"
+    if backend not in ("qdrant", "local"):
+        raise ValueError("VECTOR_STORE must be 'qdrant', 'local' or 'auto'")
+    return backend
+
+
+def get_vector_store() -> VectorStore:
+    """
+    Return the shared vector store for the configured backend.
+
+    Raises:
+        ValueError: If the Qdrant backend is selected but not configured
+    """
+    if vector_store_backend() == "qdrant":
+        client = get_qdrant_client()
+        return registry.get_or_create("vector_store:qdrant", lambda: QdrantVectorStore(client))
+
+    return registry.get_or_create(
+        f"vector_store:local:{DEFAULT_LOCAL_PATH}",
+        lambda: LocalVectorStore(DEFAULT_LOCAL_PATH),
+        closer=lambda store: store.close()
+    )
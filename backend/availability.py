@@ -0,0 +1,315 @@
+"""
+Employee availability index.
+
+Employee ``availability`` is stored as per-weekday ``{"start": h, "end": h}``
+hours in the roster payloads. Instead of re-parsing that JSON for every
+(task, employee) pair, each employee's weekly windows are expanded once into
+minute-of-week intervals and kept in a centered interval tree over the fixed
+week domain [0, MINUTES_PER_WEEK). The tree has a fixed depth (~14 levels),
+so inserts, removals and "who is available for [start, end] for N minutes"
+queries take logarithmic time plus the number of matches, and re-uploading
+the roster only touches the employees whose availability changed.
+"""
+
+import bisect
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+WEEKDAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+
+# Times are handled as integer minutes since a Monday so that
+# minute // MINUTES_PER_WEEK is the week and (minute // MINUTES_PER_DAY) % 7 the weekday
+EPOCH = datetime(1969, 12, 29)
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+
+
+def _to_datetime(value):
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    # Availability is expressed in local wall-clock hours, so compare naive times
+    return value.replace(tzinfo=None)
+
+
+def to_minutes(value, round_up=False):
+    """Convert a datetime (or ISO string) to integer minutes since EPOCH."""
+    delta = _to_datetime(value) - EPOCH
+    minutes, remainder = divmod(delta, timedelta(minutes=1))
+    if round_up and remainder:
+        minutes += 1
+    return int(minutes)
+
+
+def from_minutes(minutes):
+    return EPOCH + timedelta(minutes=int(minutes))
+
+
+def weekly_intervals(availability) -> List[Tuple[int, int]]:
+    """
+    Expand per-weekday availability hours into minute-of-week intervals.
+
+    Args:
+        availability: Dict like {"Mon": {"start": 8, "end": 16}, ...} (hours)
+
+    Returns:
+        Sorted list of (start, end) minute-of-week pairs
+    """
+    intervals = []
+    for day, weekday in enumerate(WEEKDAYS):
+        hours = (availability or {}).get(weekday)
+        if not hours:
+            continue
+        start = day * MINUTES_PER_DAY + int(round(float(hours["start"]) * 60))
+        end = day * MINUTES_PER_DAY + int(round(float(hours["end"]) * 60))
+        if end > start:
+            intervals.append((start, end))
+    return intervals
+
+
+def availability_windows(availability, window_start, window_end):
+    """
+    Expand weekly availability into concrete windows clipped to [window_start, window_end].
+
+    Args:
+        availability: Dict like {"Mon": {"start": 8, "end": 16}, ...} (hours)
+        window_start: Window start in minutes since EPOCH
+        window_end: Window end in minutes since EPOCH
+
+    Returns:
+        List of (start, end) minute pairs in chronological order
+    """
+    windows = []
+    if not availability:
+        return windows
+
+    for day in range(window_start // MINUTES_PER_DAY, (window_end - 1) // MINUTES_PER_DAY + 1):
+        hours = availability.get(WEEKDAYS[day % 7])
+        if not hours:
+            continue
+        start = day * MINUTES_PER_DAY + int(round(float(hours["start"]) * 60))
+        end = day * MINUTES_PER_DAY + int(round(float(hours["end"]) * 60))
+        start, end = max(start, window_start), min(end, window_end)
+        if end > start:
+            windows.append((start, end))
+    return windows
+
+
+class _Node:
+    __slots__ = ("lo", "hi", "center", "left", "right", "by_start", "by_end")
+
+    def __init__(self, lo, hi):
+        self.lo = lo
+        self.hi = hi
+        self.center = (lo + hi) // 2
+        self.left = None
+        self.right = None
+        # (start, end, employee_id) sorted by start; (-end, start, employee_id) sorted by end descending
+        self.by_start = []
+        self.by_end = []
+
+
+class IntervalTree:
+    """
+    Centered interval tree over the fixed integer domain [lo, hi).
+
+    Each interval is stored at the highest node whose center it contains, in
+    two lists sorted by start and by end (descending). Nodes are created on
+    demand, and because the domain is fixed the depth is bounded by log2(hi - lo).
+    """
+
+    def __init__(self, lo: int = 0, hi: int = MINUTES_PER_WEEK):
+        self.root = _Node(lo, hi)
+
+    def _node_for(self, start, end, create):
+        node = self.root
+        while True:
+            if end < node.center:
+                child = "left"
+                bounds = (node.lo, node.center)
+            elif start > node.center:
+                child = "right"
+                bounds = (node.center + 1, node.hi)
+            else:
+                return node
+            nxt = getattr(node, child)
+            if nxt is None:
+                if not create:
+                    return None
+                nxt = _Node(*bounds)
+                setattr(node, child, nxt)
+            node = nxt
+
+    def insert(self, start: int, end: int, key: Any) -> None:
+        node = self._node_for(start, end, create=True)
+        bisect.insort(node.by_start, (start, end, key))
+        bisect.insort(node.by_end, (-end, start, key))
+
+    def remove(self, start: int, end: int, key: Any) -> None:
+        node = self._node_for(start, end, create=False)
+        if node is None:
+            return
+        i = bisect.bisect_left(node.by_start, (start, end, key))
+        if i < len(node.by_start) and node.by_start[i] == (start, end, key):
+            del node.by_start[i]
+        i = bisect.bisect_left(node.by_end, (-end, start, key))
+        if i < len(node.by_end) and node.by_end[i] == (-end, start, key):
+            del node.by_end[i]
+
+    def overlapping(self, a: int, b: int) -> List[Tuple[int, int, Any]]:
+        """Return every stored (start, end, key) with start <= b and end >= a."""
+        found = []
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            if node is None:
+                continue
+            if b < node.center:
+                # Intervals here contain center > b, so they overlap iff start <= b
+                for item in node.by_start:
+                    if item[0] > b:
+                        break
+                    found.append(item)
+                stack.append(node.left)
+            elif a > node.center:
+                # Intervals here contain center < a, so they overlap iff end >= a
+                for neg_end, start, key in node.by_end:
+                    if -neg_end < a:
+                        break
+                    found.append((start, -neg_end, key))
+                stack.append(node.right)
+            else:
+                found.extend(node.by_start)
+                stack.append(node.left)
+                stack.append(node.right)
+        return found
+
+
+class AvailabilityIndex:
+    """
+    Answers "which employees are available for N minutes inside [start, end]".
+
+    Availability here is the weekly working-hours pattern only; existing
+    bookings are tracked by the scheduler.
+    """
+
+    def __init__(self, employees: Iterable[Dict[str, Any]] = ()):
+        self._lock = threading.Lock()
+        self._tree = IntervalTree()
+        self._intervals: Dict[Any, List[Tuple[int, int]]] = {}
+        self.sync(employees)
+
+    def update_employee(self, employee_id: Any, availability) -> bool:
+        """
+        Replace one employee's availability.
+
+        Returns:
+            True if the index changed
+        """
+        intervals = weekly_intervals(availability)
+        with self._lock:
+            current = self._intervals.get(employee_id)
+            if current == intervals:
+                return False
+            for start, end in current or ():
+                self._tree.remove(start, end, employee_id)
+            for start, end in intervals:
+                self._tree.insert(start, end, employee_id)
+            self._intervals[employee_id] = intervals
+            return True
+
+    def remove_employee(self, employee_id: Any) -> None:
+        with self._lock:
+            for start, end in self._intervals.pop(employee_id, ()):
+                self._tree.remove(start, end, employee_id)
+
+    def sync(self, employees: Iterable[Dict[str, Any]]) -> int:
+        """
+        Bring the index in line with a (re-)uploaded roster.
+
+        Only employees whose availability changed, or who were added or
+        removed, touch the tree.
+
+        Returns:
+            Number of employees updated, added or removed
+        """
+        seen = set()
+        changed = 0
+        for employee in employees:
+            employee_id = employee.get("employee_id")
+            seen.add(employee_id)
+            changed += self.update_employee(employee_id, employee.get("availability"))
+
+        with self._lock:
+            stale = [employee_id for employee_id in self._intervals if employee_id not in seen]
+        for employee_id in stale:
+            self.remove_employee(employee_id)
+        return changed + len(stale)
+
+    def available_minutes(self, window_start: int, window_end: int, duration: int) -> Set[Any]:
+        """
+        Employee ids with a weekly window covering ``duration`` minutes inside
+        [window_start, window_end] (minutes since EPOCH).
+        """
+        if duration <= 0 or window_end - window_start < duration:
+            return set()
+
+        found = set()
+        first_day = window_start // MINUTES_PER_DAY
+        # Past eight days every weekday has already appeared as a full day
+        last_day = min((window_end - 1) // MINUTES_PER_DAY, first_day + 8)
+        with self._lock:
+            for day in range(first_day, last_day + 1):
+                day_start = day * MINUTES_PER_DAY
+                # Segment of the task window on this day, in minute-of-week coordinates
+                offset = day_start - (day % 7) * MINUTES_PER_DAY
+                seg_start = max(window_start, day_start) - offset
+                seg_end = min(window_end, day_start + MINUTES_PER_DAY) - offset
+                if seg_end - seg_start < duration:
+                    continue
+                # Fits iff max(start, seg_start) + duration <= min(end, seg_end), i.e.
+                # start <= seg_end - duration, end >= seg_start + duration and the
+                # stored interval itself is at least ``duration`` long
+                a, b = seg_start + duration, seg_end - duration
+                found.update(
+                    employee_id for start, end, employee_id in self._tree.overlapping(min(a, b), b)
+                    if end >= a and end - start >= duration
+                )
+        return found
+
+    def available_employees(self, start_datetime, end_datetime, duration_minutes: int) -> Set[Any]:
+        """
+        Employee ids whose weekly availability fits ``duration_minutes`` inside
+        [start_datetime, end_datetime].
+
+        Args:
+            start_datetime: Earliest start (datetime or ISO string)
+            end_datetime: Latest end (datetime or ISO string)
+            duration_minutes: Required contiguous duration
+
+        Returns:
+            Set of employee ids
+        """
+        return self.available_minutes(
+            to_minutes(start_datetime, round_up=True),
+            to_minutes(end_datetime),
+            int(duration_minutes)
+        )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._intervals)
+
+
+_shared_index: Optional[AvailabilityIndex] = None
+_shared_lock = threading.Lock()
+
+
+def get_availability_index() -> AvailabilityIndex:
+    """Return the process-wide availability index (kept in sync by backend.roster)."""
+    global _shared_index
+
+    with _shared_lock:
+        if _shared_index is None:
+            _shared_index = AvailabilityIndex()
+        return _shared_index
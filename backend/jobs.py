@@ -0,0 +1,225 @@
+"""
+Background ingestion jobs for CSV uploads.
+
+Encoding a large CSV is CPU-bound and would block the event loop if it ran
+inside the request handler, so /upload hands the spooled file to a worker
+pool and returns a job id immediately. Each job exposes thread-safe progress
+counters and a cooperative cancellation flag that the embed scripts check
+between batches.
+"""
+
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+MAX_FINISHED_JOBS = 100
+
+
+class IngestionCancelled(Exception):
+    """Raised inside an ingestion run when its job has been cancelled."""
+
+
+class IngestionProgress:
+    """
+    Thread-safe progress counters for one ingestion run.
+
+    The embed scripts accept any instance of this class; a fresh one is used
+    when they are called without a job (e.g. from the command line).
+    """
+
+    COUNTERS = ("rows_parsed", "rows_embedded", "rows_upserted")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._cancel_event = threading.Event()
+        self.rows_parsed = 0
+        self.rows_embedded = 0
+        self.rows_upserted = 0
+        self.errors: List[str] = []
+
+    def add(self, counter: str, n: int) -> None:
+        """Increment one of the COUNTERS by ``n``."""
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + n)
+
+    def add_error(self, message: str) -> None:
+        with self._lock:
+            self.errors.append(message)
+
+    def cancel(self) -> None:
+        self._cancel_event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel_event.is_set()
+
+    def check_cancelled(self) -> None:
+        """Raise IngestionCancelled if cancellation was requested."""
+        if self._cancel_event.is_set():
+            raise IngestionCancelled()
+
+
+class IngestionJob(IngestionProgress):
+    """An ingestion run submitted to the JobManager."""
+
+    def __init__(self, data_type: str, filename: str):
+        super().__init__()
+        self.job_id = str(uuid.uuid4())
+        self.data_type = data_type
+        self.filename = filename
+        self.status = "queued"
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.future: Optional[Future] = None
+
+    def skip(self, reason: str) -> None:
+        """Mark a running job as skipped (e.g. no vector store configured)."""
+        with self._lock:
+            self.errors.append(reason)
+            if self.status == "running":
+                self.status = "skipped"
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("completed", "failed", "cancelled", "skipped")
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "job_id": self.job_id,
+                "data_type": self.data_type,
+                "filename": self.filename,
+                "status": self.status,
+                "rows_parsed": self.rows_parsed,
+                "rows_embedded": self.rows_embedded,
+                "rows_upserted": self.rows_upserted,
+                "errors": list(self.errors),
+                "created_at": self.created_at,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at
+            }
+
+
+class JobManager:
+    """
+    Runs ingestion jobs on a bounded thread pool and keeps their state.
+
+    Finished jobs are retained (up to MAX_FINISHED_JOBS) so clients can still
+    read the final progress after completion.
+    """
+
+    def __init__(self, max_workers: int = 1):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ingest")
+        self._lock = threading.Lock()
+        self._jobs: "OrderedDict[str, IngestionJob]" = OrderedDict()
+
+    def submit(
+        self,
+        data_type: str,
+        filename: str,
+        runner: Callable[[IngestionJob], None],
+        cleanup: Optional[Callable[[], None]] = None
+    ) -> IngestionJob:
+        """
+        Queue ``runner(job)`` on the worker pool.
+
+        Args:
+            data_type: "employees_profiles" or "historical_tasks"
+            filename: Original upload filename (informational)
+            runner: Callable doing the ingestion; receives the job for progress
+                reporting and cancellation checks
+            cleanup: Optional callable run after the job finishes, whatever the
+                outcome, including when shutdown drops it from the queue
+
+        Returns:
+            The queued IngestionJob
+        """
+        job = IngestionJob(data_type=data_type, filename=filename)
+
+        def _run():
+            try:
+                with job._lock:
+                    if job.status == "cancelled":
+                        return
+                    job.status = "running"
+                    job.started_at = time.time()
+                try:
+                    runner(job)
+                    status = "cancelled" if job.cancelled else "completed"
+                except IngestionCancelled:
+                    status = "cancelled"
+                except Exception as e:
+                    job.add_error(str(e))
+                    status = "failed"
+                with job._lock:
+                    if job.status == "running":
+                        job.status = status
+                    job.finished_at = time.time()
+            finally:
+                if cleanup is not None:
+                    cleanup()
+
+        with self._lock:
+            self._jobs[job.job_id] = job
+            self._trim()
+        job.future = self._executor.submit(_run)
+        if cleanup is not None:
+            def _cleanup_if_dropped(future):
+                # shutdown(cancel_futures=True) drops queued jobs before _run starts
+                if future.cancelled():
+                    cleanup()
+            job.future.add_done_callback(_cleanup_if_dropped)
+        return job
+
+    def get(self, job_id: str) -> Optional[IngestionJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list(self) -> List[IngestionJob]:
+        with self._lock:
+            return list(self._jobs.values())
+
+    def cancel(self, job_id: str) -> Optional[IngestionJob]:
+        """
+        Request cancellation of a job.
+
+        Queued jobs are cancelled immediately; running jobs stop at the next
+        batch boundary.
+
+        Returns:
+            The job, or None if no job has this id
+        """
+        job = self.get(job_id)
+        if job is None:
+            return None
+
+        job.cancel()
+        with job._lock:
+            if job.status == "queued":
+                job.status = "cancelled"
+                job.finished_at = time.time()
+        return job
+
+    def shutdown(self) -> None:
+        """
+        Cancel all outstanding jobs and stop the worker pool.
+
+        Jobs still queued are dropped, and their ``cleanup`` runs as they are.
+        """
+        for job in self.list():
+            if not job.finished:
+                self.cancel(job.job_id)
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _trim(self) -> None:
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self._jobs[job_id]
+
+
+job_manager = JobManager(max_workers=int(os.environ.get("INGEST_WORKERS", "1")))
@@ -1,23 +1,54 @@
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Response, Depends, Cookie
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Response, Depends, Cookie, Query
+from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
-from typing import Literal, Dict
+from pydantic import BaseModel, Field, ValidationError
+from typing import Any, Literal, Dict, List, Optional
 from scripts.embed_tasks import embed_tasks
 from scripts.embed_employees import embed_employees
-from io import StringIO
 from datetime import datetime
 import uuid
 from dotenv import load_dotenv
-from sqlalchemy.orm import Session
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
 import json
-from backend.db import SessionLocal, Task
-from backend.ai.analyze_and_match import analyze_and_match
-from backend.scheduler import schedule
+from backend.db import AsyncSessionLocal, Task, close_db, init_db
+from backend.ai.analyze_and_match import analyze_and_match_async, analyze_and_match_batch_async
+from backend.ai.embeddings import DEFAULT_CHUNK_ROWS, query_embedding_cache
+from backend.ai.complexity_cache import complexity_cache
+from backend.ai import llm_client
+from backend.ai.gemini_tradeoff_analysis import analyze_findings
+from backend.scheduler import assign, insert_task, insertion_scope
+from backend.schedule_issues import detect_issues
+from backend.roster import load_employees, load_employees_with_fingerprint, fingerprint as roster_fingerprint
+from backend import schedule_store
+from backend.availability import MINUTES_PER_WEEK, from_minutes, get_availability_index, to_minutes
+from backend import registry
+from backend.jobs import IngestionJob, job_manager
+from contextlib import asynccontextmanager
+import asyncio
+import logging
 import os
+import shutil
+import tempfile
+import weakref
 
 load_dotenv()
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Create missing tables, then load the embedding model and Qdrant client
+    # once so the first request does not pay the cold-start cost
+    await init_db()
+    warmup_status = registry.warmup()
+    for resource, status in warmup_status.items():
+        if status != "ok":
+            logging.warning(f"Could not warm up {resource}: {status}")
+    yield
+    job_manager.shutdown()
+    registry.close()
+    await close_db()
+
+app = FastAPI(lifespan=lifespan)
 
 # Add CORS middleware
 cors_origins = os.getenv("CORS_ORIGINS", "http://localhost:3000,http://localhost:3001")
@@ -38,6 +69,8 @@ class UploadResponse(BaseModel):
     filename: str
     data_type: str
     size_in_bytes: int
+    job_id: str
+    status: str
 
 class TaskCreateRequest(BaseModel):
     task_type: str = Field(..., description="Type/category of the task, e.g., 'product_inquiry'")
@@ -59,23 +92,54 @@ class EmployeesSearchRequest(BaseModel):
     priority: int = Field(..., ge=1, le=5, description="Priority of task, 1 (low) to 5 (high)")
     start_datetime: datetime = Field(..., description="Earliest start for the task")
     end_datetime: datetime = Field(..., description="Latest end for the task")
+    ranking: Literal["semantic", "structured", "hybrid"] = Field(
+        "semantic",
+        description="semantic: vector similarity; structured: numeric skill-matrix score without embeddings; hybrid: both"
+    )
+    rerank_weights: Optional[Dict[str, float]] = Field(
+        None,
+        description="Hybrid re-ranking weights per factor: similarity, skill_fit, cost, performance, remaining_hours, availability, track_record"
+    )
+
+class EmployeesBatchSearchRequest(BaseModel):
+    tasks: List[EmployeesSearchRequest] = Field(
+        ..., min_length=1, max_length=1000, description="Tasks to match, answered in the same order"
+    )
     
 class TaskCreateResponse(BaseModel):
     task_id: str
     status: str = "created"
 
-def get_db():
+class TaskBulkCreateRequest(BaseModel):
+    # Items are validated one by one so a bad item, even a non-object one,
+    # does not reject the whole batch
+    tasks: List[Any] = Field(
+        ..., min_length=1, max_length=5000, description="TaskCreateRequest items to create"
+    )
 
-    db = SessionLocal()
-    try:
+class TaskBulkCreateResponse(BaseModel):
+    task_ids: List[Optional[str]]
+    created: int
+    errors: List[dict]
+
+async def get_db():
+
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 @app.get("/health")
 def health():
     return {"status": "ok"}
 
+@app.get("/metrics")
+def metrics():
+    return {
+        "registry": registry.stats(),
+        "complexity_cache": complexity_cache.stats(),
+        "query_embedding_cache": query_embedding_cache.stats(),
+        "gemini": llm_client.stats()
+    }
+
 @app.get("/init-session")
 async def init_session(response: Response):
 
@@ -91,6 +155,25 @@ async def init_session(response: Response):
 
     return {"session_token": session_token}
 
+def _ingest_upload(job: IngestionJob, path: str, data_type: str):
+    """Run the embedding pipeline for an uploaded CSV inside a background job."""
+    embed = embed_employees if data_type == "employees_profiles" else embed_tasks
+
+    try:
+        with open(path, "r", encoding="utf-8", newline="") as csv_stream:
+            embed(file_content=csv_stream, chunk_size=DEFAULT_CHUNK_ROWS, progress=job)
+    except UnicodeDecodeError:
+        raise ValueError("File must be UTF-8 encoded.")
+    except ValueError as ve:
+        # Handle missing environment variables gracefully
+        error_msg = str(ve)
+        if "QDRANT" in error_msg.upper() or "must be set" in error_msg.lower():
+            # For demo purposes, allow upload without Qdrant but warn
+            logging.warning(f"Qdrant not configured: {error_msg}. File uploaded but not embedded.")
+            job.skip(f"Qdrant not configured: {error_msg}. File uploaded but not embedded.")
+        else:
+            raise
+
 @app.post("/upload", response_model=UploadResponse)
 async def upload(
     file: UploadFile = File(...),
@@ -103,64 +186,41 @@ async def upload(
                 status_code=400,
                 detail="Only CSV files are allowed. File must have .csv extension."
             )
-        
-        content = await file.read()
-        content_str = content.decode('utf-8')
 
-        if len(content_str) == 0:
+        if data_type not in ("employees_profiles", "historical_tasks"):
+            raise HTTPException(
+                status_code=400,
+                detail="Unknown data_type. Must be 'employees_profiles' or 'historical_tasks'."
+            )
+
+        # UploadFile is already spooled to a temporary file once it grows past
+        # a small in-memory threshold. Copy it chunk by chunk to a file the
+        # background job owns, since the upload is closed when this request ends
+        with tempfile.NamedTemporaryFile(mode="wb", suffix=".csv", delete=False) as spooled:
+            await asyncio.to_thread(shutil.copyfileobj, file.file, spooled)
+            size_in_bytes = spooled.tell()
+
+        if size_in_bytes == 0:
+            os.remove(spooled.name)
             raise HTTPException(
                 status_code=400,
                 detail="No content found in file."
             )
 
-        # Process the file based on data type
-        try:
-            if data_type == "employees_profiles":
-                embed_employees(file_content=StringIO(content_str))
-            elif data_type == "historical_tasks":
-                embed_tasks(file_content=StringIO(content_str))
-            else:
-                raise HTTPException(
-                    status_code=400,
-                    detail="Unknown data_type. Must be 'employees_profiles' or 'historical_tasks'."
-                )
-        except ValueError as ve:
-            # Handle missing environment variables gracefully
-            error_msg = str(ve)
-            if "QDRANT" in error_msg.upper() or "must be set" in error_msg.lower():
-                # For demo purposes, allow upload without Qdrant but warn
-                import logging
-                logging.warning(f"Qdrant not configured: {error_msg}. File uploaded but not embedded.")
-                # Continue without embedding - file is still accepted
-            else:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Configuration error: {error_msg}"
-                )
-        except Exception as embed_error:
-            # Catch other errors from embedding functions
-            error_msg = str(embed_error)
-            if "connection" in error_msg.lower() or "timeout" in error_msg.lower():
-                raise HTTPException(
-                    status_code=503,
-                    detail=f"Service temporarily unavailable: {error_msg}. Please check Qdrant connection."
-                )
-            elif "GEMINI" in error_msg.upper() or "api" in error_msg.lower():
-                raise HTTPException(
-                    status_code=500,
-                    detail=f"API configuration error: {error_msg}. Please check your API keys."
-                )
-            else:
-                # For other errors, log but allow upload to proceed (demo mode)
-                import logging
-                logging.warning(f"Embedding error (continuing anyway): {error_msg}")
-                # Continue - file uploaded but embedding skipped
+        job = job_manager.submit(
+            data_type=data_type,
+            filename=file.filename,
+            runner=lambda job: _ingest_upload(job, spooled.name, data_type),
+            cleanup=lambda: os.remove(spooled.name)
+        )
 
         return {
-            "message": "CSV uploaded successfully.",
+            "message": "CSV uploaded successfully. Ingestion is running in the background.",
             "filename": file.filename,
             "data_type": data_type,
-            "size_in_bytes": len(content_str)
+            "size_in_bytes": size_in_bytes,
+            "job_id": job.job_id,
+            "status": job.status
         }
     
     except HTTPException:
@@ -173,80 +233,422 @@ async def upload(
             detail=f"Unexpected error during upload: {str(e)}"
         )
 
+@app.get("/upload-jobs")
+async def list_upload_jobs():
+    return {"jobs": [job.to_dict() for job in job_manager.list()]}
+
+@app.get("/upload-jobs/{job_id}")
+async def get_upload_job(job_id: str):
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Upload job not found.")
+    return job.to_dict()
+
+@app.post("/upload-jobs/{job_id}/cancel")
+async def cancel_upload_job(job_id: str):
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Upload job not found.")
+    if job.finished:
+        raise HTTPException(status_code=409, detail=f"Upload job already {job.status}.")
+    job_manager.cancel(job_id)
+    return job.to_dict()
+
 @app.post("/create-task", response_model=TaskCreateResponse)
-async def create_task(payload: TaskCreateRequest, db: Session = Depends(get_db), session_token: str = Cookie(None)):
+async def create_task(payload: TaskCreateRequest, db: AsyncSession = Depends(get_db), session_token: str = Cookie(None)):
 
     if not session_token:
         raise HTTPException(status_code=400, detail="Session token missing. Please generate a session first.")
     
-    if payload.priority not in range(1, 6):
-        raise HTTPException(status_code=400, detail="priority must be between 1 and 5")
+    error = _task_request_error(payload)
+    if error:
+        raise HTTPException(status_code=400, detail=error)
 
-    if payload.end_datetime <= payload.start_datetime:
-        raise HTTPException(status_code=400, detail="end_datetime must be after start_datetime")
-
-    task = Task(
-        task_id=str(uuid.uuid4()),
-        session_token=session_token,
-        task_type=payload.task_type,
-        duration_minutes=payload.duration_minutes,
-        required_skills=json.dumps(payload.required_skills),
-        priority=payload.priority,
-        start_datetime=payload.start_datetime,
-        end_datetime=payload.end_datetime
-    )
+    task = Task(**_task_row(payload, session_token))
 
     db.add(task)
-    db.commit()
-    db.refresh(task)
+    await db.commit()
+
+    # Extend an existing persisted schedule in place; sessions that were never
+    # scheduled are solved on their first /get-schedule
+    async with _schedule_lock(session_token):
+        state = await schedule_store.get_state(db, session_token)
+        if state is not None:
+            try:
+                await _insert_into_schedule(db, state, _task_dict(task))
+            except ValueError as e:
+                logging.warning(f"Employee roster unavailable: {e}. Task {task.task_id} left unscheduled.")
 
     return TaskCreateResponse(
         task_id=task.task_id
     )
 
+@app.post("/create-tasks/bulk", response_model=TaskBulkCreateResponse)
+async def create_tasks_bulk(
+    payload: TaskBulkCreateRequest,
+    db: AsyncSession = Depends(get_db),
+    session_token: str = Cookie(None)
+):
+    """
+    Create many tasks in one request.
+
+    Each item is validated like a /create-task body. Valid items are inserted
+    with a single executemany INSERT in one transaction; invalid ones are
+    reported in ``errors`` by index and get ``null`` in ``task_ids``. The
+    session's persisted schedule is dropped in the same transaction, so the
+    next /get-schedule solves the whole batch at once.
+    """
+    if not session_token:
+        raise HTTPException(status_code=400, detail="Session token missing. Please generate a session first.")
+
+    task_ids: List[Optional[str]] = [None] * len(payload.tasks)
+    rows = []
+    errors = []
+    for index, item in enumerate(payload.tasks):
+        try:
+            request = TaskCreateRequest.model_validate(item)
+        except ValidationError as e:
+            errors.append({
+                "index": index,
+                "errors": [
+                    {"loc": list(error["loc"]), "msg": error["msg"]}
+                    for error in e.errors(include_url=False)
+                ]
+            })
+            continue
+
+        error = _task_request_error(request)
+        if error:
+            errors.append({"index": index, "errors": [{"loc": [], "msg": error}]})
+            continue
+
+        row = _task_row(request, session_token)
+        task_ids[index] = row["task_id"]
+        rows.append(row)
+
+    if rows:
+        async with _schedule_lock(session_token):
+            await db.execute(insert(Task), rows)
+            await schedule_store.invalidate(db, session_token)
+            await db.commit()
+
+    return TaskBulkCreateResponse(task_ids=task_ids, created=len(rows), errors=errors)
+
+def _task_request_error(payload: TaskCreateRequest) -> Optional[str]:
+    """Checks beyond the field constraints; returns the error message or None."""
+    if payload.priority not in range(1, 6):
+        return "priority must be between 1 and 5"
+    if payload.end_datetime <= payload.start_datetime:
+        return "end_datetime must be after start_datetime"
+    return None
+
+def _task_row(payload: TaskCreateRequest, session_token: str) -> dict:
+    return {
+        "task_id": str(uuid.uuid4()),
+        "session_token": session_token,
+        "task_type": payload.task_type,
+        "duration_minutes": payload.duration_minutes,
+        "required_skills": payload.required_skills,
+        "priority": payload.priority,
+        "start_datetime": payload.start_datetime,
+        "end_datetime": payload.end_datetime
+    }
+
+_schedule_locks = weakref.WeakValueDictionary()
+
+def _schedule_lock(session_token: str) -> asyncio.Lock:
+    """Per-session lock so concurrent requests never book the same slot twice."""
+    lock = _schedule_locks.get(session_token)
+    if lock is None:
+        lock = _schedule_locks[session_token] = asyncio.Lock()
+    return lock
+
+def _task_dict(task: Task) -> dict:
+    return {
+        "task_id": task.task_id,
+        "task_type": task.task_type,
+        "duration_minutes": task.duration_minutes,
+        "priority": task.priority,
+        "required_skills": task.required_skills or {},
+        "start_datetime": task.start_datetime,
+        "end_datetime": task.end_datetime
+    }
+
+async def _session_tasks(db: AsyncSession, session_token: str) -> List[dict]:
+    # Already in scheduling order (priority, then deadline) from the database
+    return await schedule_store.load_tasks(db, session_token)
+
+async def _solve_schedule(db: AsyncSession, session_token: str, tasks: List[dict], mode: str) -> dict:
+    """Run a full assignment over ``tasks`` and persist it as the session's schedule."""
+    employees, fingerprint = await asyncio.to_thread(load_employees_with_fingerprint)
+    assignment = await asyncio.to_thread(
+        assign, tasks, employees, mode, availability_index=get_availability_index()
+    )
+    await schedule_store.save_schedule(db, session_token, mode, fingerprint, assignment)
+    return assignment
+
+async def _insert_into_schedule(db: AsyncSession, state, task: dict) -> None:
+    """
+    Place a new task into the persisted schedule, touching only the qualified
+    employees' slots. Falls back to a full re-solve when the roster changed
+    since the last solve, or when the task does not fit but could displace a
+    lower-priority booking.
+    """
+    employees, fingerprint = await asyncio.to_thread(load_employees_with_fingerprint)
+    if state.roster_fingerprint != fingerprint:
+        tasks = await _session_tasks(db, state.session_token)
+        await _solve_schedule(db, state.session_token, tasks, state.mode)
+        return
+
+    index = get_availability_index()
+    scope = await asyncio.to_thread(insertion_scope, task, employees, availability_index=index)
+    bookings = await schedule_store.load_bookings(db, state.session_token, scope)
+    result = await asyncio.to_thread(insert_task, task, employees, bookings, availability_index=index)
+    if result["assignment"] is None and result["displaceable"]:
+        tasks = await _session_tasks(db, state.session_token)
+        await _solve_schedule(db, state.session_token, tasks, state.mode)
+        return
+
+    await schedule_store.record_insertion(db, state, task["task_id"], result)
+
+async def _ensure_schedule(db: AsyncSession, session_token: str, mode: str, tasks: Optional[List[dict]] = None):
+    """
+    Return the session's schedule state, solving and persisting it first
+    unless the persisted one matches ``mode`` and the roster and covers every
+    task. Callers hold the session's schedule lock.
+
+    Args:
+        tasks: The session's tasks if already loaded; otherwise they are only
+            read when a solve is needed
+
+    Raises:
+        ValueError: If the employee roster is unavailable
+    """
+    fingerprint = await asyncio.to_thread(roster_fingerprint)
+    state = await schedule_store.get_state(db, session_token)
+    if schedule_store.is_current(state, mode, fingerprint):
+        # Tasks created while the roster was unavailable are missing from it
+        task_count = len(tasks) if tasks is not None else await schedule_store.count_tasks(db, session_token)
+        if await schedule_store.count_assignments(db, session_token) == task_count:
+            return state
+
+    if tasks is None:
+        tasks = await _session_tasks(db, session_token)
+    await _solve_schedule(db, session_token, tasks, mode)
+    return await schedule_store.get_state(db, session_token)
+
+ROSTER_UNAVAILABLE = "employee roster unavailable"
+
+# Page size bounds for /get-schedule?limit=
+SCHEDULE_PAGE_DEFAULT = 100
+SCHEDULE_PAGE_MAX = int(os.environ.get("SCHEDULE_PAGE_MAX", "1000"))
+
 @app.get("/get-schedule")
 async def get_schedule(
-    db: Session = Depends(get_db),
+    mode: Literal["greedy", "optimize"] = "optimize",
+    limit: Optional[int] = Query(None, ge=1, description="Page size; enables keyset pagination"),
+    after: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    format: Literal["json", "ndjson"] = "json",
+    db: AsyncSession = Depends(get_db),
     session_token: str = Cookie(None)
 ):
+    """
+    Return the session's tasks in schedule order with their assignments.
 
+    Without ``limit``/``after`` the whole session is returned in one body.
+    With them, one page is returned plus a ``next_cursor`` for the next one.
+    ``format=ndjson`` streams one line per task straight from the database
+    cursor. Pages and streams read the persisted schedule, solving it first
+    only if it is not current.
+    """
     if not session_token:
 
         raise HTTPException(status_code=400, detail="Session token missing. Please generate a session first.")
-    
-    unassigned_tasks = db.query(Task).filter(
-        Task.session_token == session_token
-    ).all()
 
-    if not unassigned_tasks:
+    if format == "ndjson":
+        return StreamingResponse(_stream_schedule(session_token, mode), media_type="application/x-ndjson")
+
+    if limit is not None or after is not None:
+        return await _schedule_page(db, session_token, mode, min(limit or SCHEDULE_PAGE_DEFAULT, SCHEDULE_PAGE_MAX), after)
+
+    sorted_tasks = await _session_tasks(db, session_token)
+
+    if not sorted_tasks:
         return {"message": "No tasks to schedule."}
-    
-    schedule_list = []
-    for task in unassigned_tasks:
-        # Parse required_skills from JSON string to dict
+
+    # Assign employees from the roster (skills, availability, weekly hours, cost).
+    # The persisted schedule is reused while it matches the mode and roster;
+    # otherwise the session is solved from scratch and persisted
+    try:
+        async with _schedule_lock(session_token):
+            state = await _ensure_schedule(db, session_token, mode, sorted_tasks)
+            assignment = await schedule_store.load_schedule(db, session_token, state)
+    except ValueError as e:
+        logging.warning(f"Employee roster unavailable: {e}. Returning unassigned schedule.")
+        assignment = {
+            "assignments": [],
+            "unassigned": [
+                {"task_id": task["task_id"], "reason": ROSTER_UNAVAILABLE}
+                for task in sorted_tasks
+            ],
+            "total_cost": 0.0
+        }
+
+    # Report assignments in schedule order however they were produced
+    position = {task["task_id"]: i for i, task in enumerate(sorted_tasks)}
+    assignment["assignments"].sort(key=lambda item: position.get(item["task_id"], len(position)))
+    assignment["unassigned"].sort(key=lambda item: position.get(item["task_id"], len(position)))
+
+    return {"schedule": sorted_tasks, **assignment}
+
+async def _schedule_page(db: AsyncSession, session_token: str, mode: str, limit: int, after: Optional[str]) -> dict:
+    """One keyset page of /get-schedule in the same shape as the full response."""
+    try:
+        async with _schedule_lock(session_token):
+            state = await _ensure_schedule(db, session_token, mode)
+        include_assignments = True
+    except ValueError as e:
+        logging.warning(f"Employee roster unavailable: {e}. Returning unassigned schedule.")
+        state = None
+        include_assignments = False
+
+    try:
+        rows, next_cursor = await schedule_store.load_page(db, session_token, limit, after, include_assignments)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if not rows and after is None:
+        return {"message": "No tasks to schedule."}
+
+    return {
+        "schedule": [row["task"] for row in rows],
+        "assignments": [row["assignment"] for row in rows if row["assignment"] is not None],
+        "unassigned": [
+            {"task_id": row["task"]["task_id"], "reason": row["reason"] or ROSTER_UNAVAILABLE}
+            for row in rows if row["assignment"] is None
+        ],
+        "total_cost": round(state.total_cost or 0.0, 2) if state is not None else 0.0,
+        "next_cursor": next_cursor
+    }
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+async def _stream_schedule(session_token: str, mode: str):
+    """
+    Yield the schedule as NDJSON, one ``{"task", "assignment", "reason"}``
+    object per line, in schedule order.
+
+    The generator runs after the endpoint has returned, so it opens its own
+    database session for the lifetime of the stream.
+    """
+    async with AsyncSessionLocal() as db:
         try:
-            required_skills = json.loads(task.required_skills) if task.required_skills else {}
-        except (json.JSONDecodeError, TypeError):
-            # Fallback if JSON is corrupted or None
-            required_skills = {}
-        
-        schedule_list.append({
-            "task_id": task.task_id,
-            "task_type": task.task_type,
-            "duration_minutes": task.duration_minutes,
-            "priority": task.priority,
-            "required_skills": required_skills,
-            "start_datetime": task.start_datetime,
-            "end_datetime": task.end_datetime
-        })
+            async with _schedule_lock(session_token):
+                await _ensure_schedule(db, session_token, mode)
+            include_assignments = True
+        except ValueError as e:
+            logging.warning(f"Employee roster unavailable: {e}. Streaming unassigned schedule.")
+            include_assignments = False
+
+        async for row in schedule_store.stream_rows(db, session_token, include_assignments):
+            if row["assignment"] is None and row["reason"] is None:
+                row["reason"] = ROSTER_UNAVAILABLE
+            yield json.dumps(row, default=_json_default) + "\n"
+
+@app.get("/schedule-issues")
+async def schedule_issues(
+    mode: Literal["greedy", "optimize"] = "optimize",
+    budget: Optional[float] = Query(None, ge=0, description="Cost budget for the schedule"),
+    coverage: Optional[float] = Query(None, ge=0, le=100, description="Required percentage of tasks assigned"),
+    recommend: bool = Query(False, description="Also ask Gemini for trade-off recommendations"),
+    db: AsyncSession = Depends(get_db),
+    session_token: str = Cookie(None)
+):
+    """
+    Report the session schedule's understaffed slots, overtime risk, coverage
+    and budget burn, computed locally from the schedule and the roster.
 
-    # Sort tasks by priority and deadline using scheduler
-    sorted_tasks = schedule(schedule_list)
+    With ``recommend=true`` the findings (not the schedule) are sent to Gemini
+    for trade-off recommendations; if Gemini fails the findings are still
+    returned, with ``tradeoff_error`` set.
+    """
+    if not session_token:
+        raise HTTPException(status_code=400, detail="Session token missing. Please generate a session first.")
 
-    return {"schedule": sorted_tasks}
+    tasks = await _session_tasks(db, session_token)
+    if not tasks:
+        return {"message": "No tasks to schedule."}
+
+    try:
+        async with _schedule_lock(session_token):
+            state = await _ensure_schedule(db, session_token, mode, tasks)
+            schedule = await schedule_store.load_schedule(db, session_token, state)
+        employees = await asyncio.to_thread(load_employees)
+    except ValueError as e:
+        raise HTTPException(status_code=503, detail=f"Employee roster unavailable: {str(e)}")
+
+    findings = await asyncio.to_thread(detect_issues, schedule, tasks, employees, budget, coverage)
+    response = {"issues": findings}
+    if recommend:
+        try:
+            response["tradeoffs"] = await asyncio.to_thread(analyze_findings, findings)
+        except (RuntimeError, ValueError) as e:
+            logging.warning(f"Trade-off analysis failed: {e}")
+            response["tradeoff_error"] = str(e)
+    return response
+
+async def _booked_hours(
+    db: AsyncSession,
+    session_token: Optional[str],
+    tasks: List[EmployeesSearchRequest]
+) -> List[Optional[dict]]:
+    """
+    Hours each employee is already booked in the session's schedule during the
+    ISO week of each hybrid-ranked task's start, for the remaining-hours factor.
+
+    Tasks in the same week share one query. Without a session, or for other
+    ranking modes, the entry is None.
+    """
+    by_week: Dict[int, dict] = {}
+    booked: List[Optional[dict]] = []
+    for task in tasks:
+        if not session_token or task.ranking != "hybrid":
+            booked.append(None)
+            continue
+        week = to_minutes(task.start_datetime) // MINUTES_PER_WEEK
+        if week not in by_week:
+            by_week[week] = await schedule_store.booked_hours(
+                db,
+                session_token,
+                from_minutes(week * MINUTES_PER_WEEK),
+                from_minutes((week + 1) * MINUTES_PER_WEEK)
+            )
+        booked.append(by_week[week])
+    return booked
+
+def _search_task_payload(payload: EmployeesSearchRequest, booked_hours: Optional[dict] = None) -> dict:
+    """Build the AI engine task payload from a search request."""
+    return {
+        "task_type": payload.task_type,
+        "description": "",  # Optional: could add description field to request
+        "required_skills": payload.required_skills,  # Now a Dict[str, int]
+        "priority": payload.priority,
+        "ranking": payload.ranking,
+        "rerank_weights": payload.rerank_weights,
+        "start_datetime": payload.start_datetime,
+        "end_datetime": payload.end_datetime,
+        "booked_hours": booked_hours
+    }
 
 @app.post("/search-employees")
-async def search_employees(payload: EmployeesSearchRequest):
+async def search_employees(
+    payload: EmployeesSearchRequest,
+    db: AsyncSession = Depends(get_db),
+    session_token: str = Cookie(None)
+):
     """
     Search for employees matching task requirements using AI-powered analysis.
     
@@ -254,18 +656,18 @@ async def search_employees(payload: EmployeesSearchRequest):
     1. Analyze task complexity using Gemini
     2. Search for matching employees using Qdrant semantic search
     3. Generate recommendations combining both analyses
+    
+    Hybrid ranking scores remaining weekly hours against the hours the
+    session's persisted schedule already books in the task's week.
     """
     try:
         # Prepare task payload for AI engine
-        task_payload = {
-            "task_type": payload.task_type,
-            "description": "",  # Optional: could add description field to request
-            "required_skills": payload.required_skills,  # Now a Dict[str, int]
-            "priority": payload.priority
-        }
+        booked_hours = await _booked_hours(db, session_token, [payload])
+        task_payload = _search_task_payload(payload, booked_hours[0])
         
-        # Call AI engine for full analysis
-        result = analyze_and_match(task_payload)
+        # Call AI engine for full analysis; Gemini and the vector search run
+        # concurrently off the event loop
+        result = await analyze_and_match_async(task_payload)
         
         # Return comprehensive AI analysis results
         return {
@@ -282,3 +684,33 @@ async def search_employees(payload: EmployeesSearchRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
 
+@app.post("/search-employees/batch")
+async def search_employees_batch(
+    payload: EmployeesBatchSearchRequest,
+    db: AsyncSession = Depends(get_db),
+    session_token: str = Cookie(None)
+):
+    """
+    Search for matching employees for many tasks in one call.
+    
+    All query embeddings are computed in one forward pass, the top-k lookups go
+    to the vector store as one batch query, and the Gemini complexity analyses
+    are packed into multi-task prompts, with at most BATCH_COMPLEXITY_CONCURRENCY
+    prompts in flight. Results are
+    returned in request order; a failed item carries an "error" field instead
+    of failing the whole batch.
+    """
+    try:
+        booked_hours = await _booked_hours(db, session_token, payload.tasks)
+        results = await analyze_and_match_batch_async(
+            [_search_task_payload(task, booked) for task, booked in zip(payload.tasks, booked_hours)]
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
+    
+    return {
+        "results": [
+            {"task_id": task.task_id, **result}
+            for task, result in zip(payload.tasks, results)
+        ]
+    }
@@ -0,0 +1,226 @@
+"""
+Process-wide registry for expensive shared resources.
+
+Loading the sentence-transformer model takes seconds, every QdrantClient
+opens its own connection pool and the Gemini SDK keeps global configuration,
+so all of them are created once per process and reused by every endpoint and
+script. Resources are built lazily on first use
+(or eagerly via ``warmup()`` at application startup) and released by
+``close()`` on shutdown.
+"""
+
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+DEFAULT_MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+GEMINI_MODEL_NAME = os.environ.get("GEMINI_MODEL", "gemini-2.0-flash-exp")
+
+
+class ResourceRegistry:
+    """
+    Thread-safe, lazily populated cache of named resources.
+
+    Each resource is created at most once: concurrent callers asking for the
+    same missing key wait on a per-key lock while the first caller builds it.
+    Hit/miss counters and load times are kept per key so the cold-start cost
+    can be observed through ``stats()``.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._key_locks: Dict[str, threading.Lock] = {}
+        self._resources: Dict[str, Any] = {}
+        self._closers: Dict[str, Optional[Callable[[Any], None]]] = {}
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+    def _key_lock(self, key: str) -> threading.Lock:
+        with self._lock:
+            lock = self._key_locks.get(key)
+            if lock is None:
+                lock = self._key_locks[key] = threading.Lock()
+                self._stats[key] = {"hits": 0, "misses": 0, "load_seconds": 0.0}
+            return lock
+
+    def get_or_create(
+        self,
+        key: str,
+        factory: Callable[[], Any],
+        closer: Optional[Callable[[Any], None]] = None
+    ) -> Any:
+        """
+        Return the resource stored under ``key``, building it with ``factory`` if needed.
+
+        Args:
+            key: Registry key, e.g. ``"model:<name>"``
+            factory: Zero-argument callable that creates the resource
+            closer: Optional callable used to release the resource on ``close()``
+
+        Returns:
+            The shared resource instance
+        """
+        resource = self._resources.get(key)
+        if resource is not None:
+            with self._lock:
+                self._stats[key]["hits"] += 1
+            return resource
+
+        with self._key_lock(key):
+            resource = self._resources.get(key)
+            if resource is not None:
+                with self._lock:
+                    self._stats[key]["hits"] += 1
+                return resource
+
+            started = time.perf_counter()
+            resource = factory()
+            elapsed = time.perf_counter() - started
+
+            with self._lock:
+                self._resources[key] = resource
+                self._closers[key] = closer
+                self._stats[key]["misses"] += 1
+                self._stats[key]["load_seconds"] += elapsed
+            return resource
+
+    def discard(self, key: str) -> None:
+        """Close and forget a single resource so the next access rebuilds it."""
+        with self._lock:
+            resource = self._resources.pop(key, None)
+            closer = self._closers.pop(key, None)
+        if resource is not None and closer is not None:
+            closer(resource)
+
+    def close(self) -> None:
+        """Close every registered resource. Counters are kept for inspection."""
+        with self._lock:
+            items = [(key, self._resources[key], self._closers.get(key)) for key in list(self._resources)]
+            self._resources.clear()
+            self._closers.clear()
+        for _, resource, closer in items:
+            if closer is None:
+                continue
+            try:
+                closer(resource)
+            except Exception:
+                pass
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return a snapshot of per-resource hit/miss counters and load times."""
+        with self._lock:
+            return {
+                key: {
+                    "loaded": key in self._resources,
+                    "hits": int(values["hits"]),
+                    "misses": int(values["misses"]),
+                    "load_seconds": round(values["load_seconds"], 4)
+                }
+                for key, values in self._stats.items()
+            }
+
+
+registry = ResourceRegistry()
+
+
+def get_embedding_model(model_name: str = DEFAULT_MODEL_NAME):
+    """
+    Return the shared SentenceTransformer instance for ``model_name``.
+
+    Args:
+        model_name: Hugging Face model identifier
+
+    Returns:
+        A loaded SentenceTransformer model
+    """
+    def _load():
+        from sentence_transformers import SentenceTransformer
+        return SentenceTransformer(model_name)
+
+    return registry.get_or_create(f"model:{model_name}", _load)
+
+
+def get_qdrant_client():
+    """
+    Return the shared QdrantClient configured from the environment.
+
+    Returns:
+        A connected QdrantClient
+
+    Raises:
+        ValueError: If QDRANT_URL or QDRANT_API_KEY is not set
+    """
+    qdrant_url = os.environ.get("QDRANT_URL")
+    qdrant_api_key = os.environ.get("QDRANT_API_KEY")
+
+    if not qdrant_url or not qdrant_api_key:
+        raise ValueError("QDRANT_URL and QDRANT_API_KEY must be set in environment variables")
+
+    def _connect():
+        from qdrant_client import QdrantClient
+        return QdrantClient(url=qdrant_url, api_key=qdrant_api_key)
+
+    return registry.get_or_create(f"qdrant:{qdrant_url}", _connect, closer=lambda client: client.close())
+
+
+def get_gemini_model(model_name: str = GEMINI_MODEL_NAME):
+    """
+    Return the shared Gemini GenerativeModel for ``model_name``.
+
+    Calls should go through ``backend.ai.llm_client``, which adds deadlines,
+    retries, rate limiting and circuit breaking around it.
+
+    Returns:
+        A configured google.generativeai GenerativeModel
+
+    Raises:
+        ValueError: If GEMINI_API_KEY is not set
+    """
+    api_key = os.environ.get("GEMINI_API_KEY")
+    if not api_key:
+        raise ValueError("GEMINI_API_KEY must be set in environment variables")
+
+    def _configure():
+        import google.generativeai as genai
+        genai.configure(api_key=api_key)
+        return genai.GenerativeModel(model_name)
+
+    return registry.get_or_create(f"gemini:{model_name}", _configure)
+
+
+def warmup() -> Dict[str, str]:
+    """
+    Eagerly load the embedding model and the configured vector store.
+
+    Failures are reported rather than raised so the API can still start in
+    demo mode without Qdrant or the model weights available.
+
+    Returns:
+        Dictionary mapping resource name to "ok" or the error message
+    """
+    status = {}
+
+    try:
+        get_embedding_model()
+        status["embedding_model"] = "ok"
+    except Exception as e:
+        status["embedding_model"] = str(e)
+
+    try:
+        from backend.ai.vector_store import get_vector_store
+        get_vector_store()
+        status["vector_store"] = "ok"
+    except Exception as e:
+        status["vector_store"] = str(e)
+
+    return status
+
+
+def close() -> None:
+    """Release all shared resources (called on application shutdown)."""
+    registry.close()
+
+
+def stats() -> Dict[str, Dict[str, Any]]:
+    """Return hit/miss counters and load times for all shared resources."""
+    return registry.stats()
@@ -0,0 +1,90 @@
+"""
+In-memory employee roster loaded from the vector store.
+
+Employee payloads (skills, availability, max_hours, hourly_rate, ...) are
+written by ``embed_employees``. Scheduling and ranking need all of them at
+once, so the roster is read once via a scroll and cached until the next
+employee upload invalidates it. Every reload is applied incrementally to the
+shared availability index.
+"""
+
+import hashlib
+import json
+import threading
+from typing import Any, Dict, List, Tuple
+
+from backend.ai.vector_store import get_vector_store
+from backend.availability import get_availability_index
+
+_lock = threading.Lock()
+_employees: List[Dict[str, Any]] = []
+_loaded = False
+_fingerprint = ""
+
+
+def _load(refresh: bool) -> List[Dict[str, Any]]:
+    # Caller holds _lock
+    global _employees, _loaded, _fingerprint
+
+    if _loaded and not refresh:
+        return _employees
+
+    points = get_vector_store().scroll("employees")
+    employees = [dict(payload) for _, payload in points]
+    employees.sort(key=lambda e: e.get("employee_id", 0))
+
+    get_availability_index().sync(employees)
+
+    encoded = json.dumps(employees, sort_keys=True, default=str)
+    _fingerprint = hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+    _employees = employees
+    _loaded = True
+    return _employees
+
+
+def load_employees(refresh: bool = False) -> List[Dict[str, Any]]:
+    """
+    Return every employee payload, sorted by employee_id.
+
+    Args:
+        refresh: Re-read the roster from the vector store even if it is cached
+
+    Raises:
+        ValueError: If the Qdrant backend is selected but not configured
+    """
+    with _lock:
+        return _load(refresh)
+
+
+def load_employees_with_fingerprint(refresh: bool = False) -> Tuple[List[Dict[str, Any]], str]:
+    """
+    Return the employee payloads and their fingerprint from the same load.
+
+    Reading them in two calls could pair a reloaded fingerprint with the
+    previous employee list if an upload invalidates the roster in between.
+
+    Raises:
+        ValueError: If the Qdrant backend is selected but not configured
+    """
+    with _lock:
+        employees = _load(refresh)
+        return employees, _fingerprint
+
+
+def fingerprint() -> str:
+    """
+    Return a hash of the loaded roster.
+
+    Persisted schedules record the fingerprint they were solved against, so a
+    changed roster forces a full re-solve instead of an incremental insert.
+    """
+    load_employees()
+    return _fingerprint
+
+
+def invalidate() -> None:
+    """Drop the cached roster so the next access reloads it."""
+    global _loaded
+
+    with _lock:
+        _loaded = False
@@ -0,0 +1,269 @@
+"""
+Deterministic schedule issue detection.
+
+Computes the figures a trade-off review needs from a solved schedule (the
+``scheduler.assign`` shape), the session's tasks and the employee roster:
+
+- understaffed time slots: work that has no employee, spread over each
+  unassigned task's window, compared with the roster's available minutes
+- overtime risk: booked hours per employee and ISO week against ``max_hours``
+  (the roster's weekly_max_hours)
+- coverage: share of tasks and of task minutes that are assigned
+- budget burn: assigned cost and the projected cost of the unassigned work
+
+The horizon is cut into fixed time buckets and every per-bucket figure is
+computed with prefix sums over sorted interval endpoints, so the cost is
+O((intervals + buckets) log intervals) in numpy rather than a Python loop per
+bucket. The result holds totals plus the few worst slots and employees, so its
+size does not grow with the schedule and it can be handed to the LLM as-is.
+"""
+
+import os
+import warnings
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from backend.availability import EPOCH, MINUTES_PER_WEEK, from_minutes, to_minutes, weekly_intervals
+
+ISSUE_BUCKET_MINUTES = int(os.environ.get("ISSUE_BUCKET_MINUTES", "60"))
+# Unserved work in a bucket below this many minutes is not reported
+UNDERSTAFFED_MIN_MINUTES = float(os.environ.get("UNDERSTAFFED_MIN_MINUTES", "15"))
+# Share of max_hours booked in a week from which an employee is at overtime risk
+OVERTIME_RISK_RATIO = float(os.environ.get("OVERTIME_RISK_RATIO", "0.9"))
+# Worst slots / employees listed per issue kind; the counts cover all of them
+ISSUE_TOP_N = int(os.environ.get("ISSUE_TOP_N", "5"))
+
+
+def _minutes(values, round_up=False) -> np.ndarray:
+    """Vectorized ``to_minutes`` over datetimes or ISO strings."""
+    values = list(values)
+    try:
+        with warnings.catch_warnings():
+            # numpy would convert timezone-aware values to UTC; availability
+            # works in wall-clock time, so those take the per-value path
+            warnings.simplefilter("error")
+            seconds = (np.array(values, dtype="datetime64[s]") - np.datetime64(EPOCH, "s")).astype(np.int64)
+    except (TypeError, ValueError, UserWarning):
+        return np.array([to_minutes(value, round_up=round_up) for value in values], dtype=np.int64)
+    return -(-seconds // 60) if round_up else seconds // 60
+
+
+def _covered_minutes(starts, ends, edges, weights=None) -> np.ndarray:
+    """
+    Minutes of the [start, end) intervals falling in each bucket between
+    consecutive ``edges``, each interval scaled by its weight.
+
+    Uses F(t) = sum w * (clip(t, start, end) - start), evaluated at every edge
+    from prefix sums over the sorted starts and ends.
+    """
+    starts = np.asarray(starts, dtype=np.float64)
+    ends = np.asarray(ends, dtype=np.float64)
+    edges = np.asarray(edges, dtype=np.float64)
+    weights = np.ones_like(starts) if weights is None else np.asarray(weights, dtype=np.float64)
+    if not len(starts):
+        return np.zeros(max(0, len(edges) - 1))
+
+    def _ramp(points):
+        # sum over points < t of w * (t - point)
+        order = np.argsort(points, kind="stable")
+        sorted_points = points[order]
+        weight_sums = np.concatenate(([0.0], np.cumsum(weights[order])))
+        moment_sums = np.concatenate(([0.0], np.cumsum(weights[order] * sorted_points)))
+        below = np.searchsorted(sorted_points, edges, side="left")
+        return edges * weight_sums[below] - moment_sums[below]
+
+    return np.diff(_ramp(starts) - _ramp(ends))
+
+
+def _available_intervals(employees, horizon_start: int, horizon_end: int):
+    """Every employee's weekly availability repeated over the horizon, as (starts, ends) arrays."""
+    weekly = np.array(
+        [interval for employee in employees for interval in weekly_intervals(employee.get("availability"))],
+        dtype=np.int64
+    ).reshape(-1, 2)
+    weeks = np.arange(horizon_start // MINUTES_PER_WEEK, (horizon_end - 1) // MINUTES_PER_WEEK + 1) * MINUTES_PER_WEEK
+    starts = (weeks[:, None] + weekly[None, :, 0]).ravel()
+    ends = (weeks[:, None] + weekly[None, :, 1]).ravel()
+    return np.clip(starts, horizon_start, horizon_end), np.clip(ends, horizon_start, horizon_end)
+
+
+def _slot_label(start: int, end: int) -> str:
+    first, last = from_minutes(start), from_minutes(end)
+    if first.date() == last.date():
+        return f"{first:%a %Y-%m-%d %H:%M}-{last:%H:%M}"
+    return f"{first:%a %Y-%m-%d %H:%M} to {last:%a %Y-%m-%d %H:%M}"
+
+
+def _understaffed_slots(edges, shortfall, demand, capacity, top_n: int) -> Dict[str, Any]:
+    """Merge consecutive buckets with unserved work into slots and keep the worst ones."""
+    flagged = shortfall >= UNDERSTAFFED_MIN_MINUTES
+    if not flagged.any():
+        return {"count": 0, "shortfall_hours": 0.0, "worst": []}
+
+    # Runs of consecutive flagged buckets
+    padded = np.concatenate(([False], flagged, [False])).astype(np.int8)
+    changes = np.flatnonzero(np.diff(padded))
+    run_starts, run_ends = changes[0::2], changes[1::2]
+    prefix = np.concatenate(([0.0], np.cumsum(shortfall)))
+    run_shortfall = prefix[run_ends] - prefix[run_starts]
+
+    utilization = np.divide(demand, capacity, out=np.full_like(demand, np.inf), where=capacity > 0)
+    worst = []
+    for run in np.argsort(-run_shortfall, kind="stable")[:top_n]:
+        first, last = run_starts[run], run_ends[run]
+        peak = float(utilization[first:last].max())
+        worst.append({
+            "time_slot": _slot_label(int(edges[first]), int(edges[last])),
+            "unstaffed_hours": round(float(run_shortfall[run]) / 60.0, 1),
+            # Demand over available roster minutes; above 1 no reassignment can cover
+            # it, None when the roster has no available hours in part of the slot
+            "peak_utilization": None if np.isinf(peak) else round(peak, 2),
+            "severity": "high" if np.isinf(peak) or peak > 1.0 else "medium"
+        })
+    return {
+        "count": int(len(run_starts)),
+        "shortfall_hours": round(float(shortfall[flagged].sum()) / 60.0, 1),
+        "worst": worst
+    }
+
+
+def _overtime_risk(assignments, starts, ends, employees, top_n: int) -> Dict[str, Any]:
+    """Booked hours per (employee, ISO week) against each employee's max_hours."""
+    if not assignments:
+        return {"count": 0, "over_limit": 0, "worst": []}
+
+    rows = {employee.get("employee_id"): row for row, employee in enumerate(employees)}
+    max_hours = np.array([float(employee.get("max_hours") or 0.0) for employee in employees] + [0.0])
+    unknown = len(employees)
+
+    employee_rows = np.array([rows.get(a["employee_id"], unknown) for a in assignments], dtype=np.int64)
+    weeks = starts // MINUTES_PER_WEEK
+
+    keys, inverse = np.unique(np.stack([employee_rows, weeks], axis=1), axis=0, return_inverse=True)
+    booked = np.bincount(inverse.ravel(), weights=(ends - starts) / 60.0, minlength=len(keys))
+    limits = max_hours[keys[:, 0]]
+    ratio = np.divide(booked, limits, out=np.full_like(booked, np.inf), where=limits > 0)
+
+    known = keys[:, 0] != unknown
+    at_risk = np.flatnonzero(known & (ratio >= OVERTIME_RISK_RATIO))
+    names = {a["employee_id"]: a.get("employee_name") for a in assignments}
+    worst = []
+    for i in at_risk[np.argsort(-ratio[at_risk], kind="stable")][:top_n]:
+        employee = employees[keys[i, 0]]
+        worst.append({
+            "employee": names.get(employee.get("employee_id")) or employee.get("name", "Unknown"),
+            "employee_id": employee.get("employee_id"),
+            "week_of": from_minutes(int(keys[i, 1]) * MINUTES_PER_WEEK).date().isoformat(),
+            "hours": round(float(booked[i]), 1),
+            "max_hours": round(float(limits[i]), 1),
+            "severity": "high" if ratio[i] > 1.0 else "medium"
+        })
+    return {
+        "count": int(len(at_risk)),
+        "over_limit": int((known & (ratio > 1.0)).sum()),
+        "worst": worst
+    }
+
+
+def detect_issues(
+    schedule: Dict[str, Any],
+    tasks: List[Dict[str, Any]],
+    employees: List[Dict[str, Any]],
+    budget: Optional[float] = None,
+    required_coverage: Optional[float] = None,
+    bucket_minutes: int = ISSUE_BUCKET_MINUTES,
+    top_n: int = ISSUE_TOP_N
+) -> Dict[str, Any]:
+    """
+    Summarize a solved schedule's staffing, overtime, coverage and budget issues.
+
+    Args:
+        schedule: ``scheduler.assign`` result (assignments, unassigned, total_cost)
+        tasks: The scheduled tasks (task_id, duration_minutes, start_datetime, end_datetime)
+        employees: Employee payloads (availability, max_hours, hourly_rate)
+        budget: Cost budget; budget figures are omitted without it
+        required_coverage: Target percentage of tasks assigned
+        bucket_minutes: Width of the time buckets
+        top_n: Worst slots and employees listed per issue kind
+
+    Returns:
+        Dictionary with horizon, coverage, budget (if given),
+        understaffed_slots and overtime_risk; every list holds at most
+        ``top_n`` items
+
+    Raises:
+        ValueError: If ``bucket_minutes`` is not positive
+    """
+    if bucket_minutes <= 0:
+        raise ValueError("bucket_minutes must be positive")
+
+    assignments = schedule.get("assignments") or []
+    unassigned_ids = {item["task_id"] for item in schedule.get("unassigned") or []}
+    total_cost = float(schedule.get("total_cost") or 0.0)
+
+    window_starts = _minutes((task["start_datetime"] for task in tasks), round_up=True)
+    window_ends = _minutes(task["end_datetime"] for task in tasks)
+    assigned_starts = _minutes(a["start_datetime"] for a in assignments)
+    assigned_ends = _minutes(a["end_datetime"] for a in assignments)
+    durations = np.array([int(task["duration_minutes"]) for task in tasks], dtype=np.int64)
+    open_mask = np.array([task["task_id"] in unassigned_ids for task in tasks], dtype=bool)
+
+    total_minutes = int(durations.sum())
+    open_minutes = int(durations[open_mask].sum()) if len(tasks) else 0
+    coverage = {
+        "tasks": len(tasks),
+        "assigned": len(tasks) - int(open_mask.sum()),
+        "task_coverage_pct": round(100.0 * (1 - float(open_mask.mean())), 1) if len(tasks) else 100.0,
+        "minute_coverage_pct": round(100.0 * (1 - open_minutes / total_minutes), 1) if total_minutes else 100.0
+    }
+    if required_coverage is not None:
+        coverage["required_pct"] = float(required_coverage)
+        coverage["meets_target"] = bool(coverage["task_coverage_pct"] >= float(required_coverage))
+
+    findings: Dict[str, Any] = {}
+    if len(tasks):
+        horizon_start = int(min(window_starts.min(), assigned_starts.min(initial=window_starts.min())))
+        horizon_end = int(max(window_ends.max(), assigned_ends.max(initial=window_ends.max())))
+        horizon_start -= horizon_start % bucket_minutes
+        horizon_end = max(horizon_end, horizon_start + 1)
+        edges = np.arange(horizon_start, horizon_end + bucket_minutes, bucket_minutes, dtype=np.int64)
+        edges = edges[:int(np.searchsorted(edges, horizon_end)) + 1]
+
+        # Unassigned work has no time yet: spread its duration over its window
+        spans = np.maximum(window_ends[open_mask] - window_starts[open_mask], 1)
+        shortfall = _covered_minutes(
+            window_starts[open_mask], window_ends[open_mask], edges,
+            weights=np.minimum(durations[open_mask] / spans, 1.0)
+        )
+        booked = _covered_minutes(assigned_starts, assigned_ends, edges)
+        capacity = _covered_minutes(*_available_intervals(employees, horizon_start, int(edges[-1])), edges)
+
+        findings["horizon"] = {
+            "start": from_minutes(int(edges[0])).isoformat(),
+            "end": from_minutes(int(edges[-1])).isoformat(),
+            "bucket_minutes": bucket_minutes,
+            "roster_utilization_pct": round(100.0 * booked.sum() / capacity.sum(), 1) if capacity.sum() else None
+        }
+        findings["understaffed_slots"] = _understaffed_slots(edges, shortfall, booked + shortfall, capacity, top_n)
+    else:
+        findings["understaffed_slots"] = {"count": 0, "shortfall_hours": 0.0, "worst": []}
+
+    findings["coverage"] = coverage
+    findings["overtime_risk"] = _overtime_risk(assignments, assigned_starts, assigned_ends, employees, top_n)
+
+    if budget is not None:
+        rates = np.array([float(e.get("hourly_rate") or 0.0) for e in employees])
+        median_rate = float(np.median(rates[rates > 0])) if (rates > 0).any() else 0.0
+        projected = total_cost + open_minutes / 60.0 * median_rate
+        findings["budget"] = {
+            "budget": round(float(budget), 2),
+            "assigned_cost": round(total_cost, 2),
+            "burn_pct": round(100.0 * total_cost / budget, 1) if budget > 0 else None,
+            # Unassigned work priced at the roster's median hourly rate
+            "projected_full_coverage_cost": round(projected, 2),
+            "projected_burn_pct": round(100.0 * projected / budget, 1) if budget > 0 else None,
+            "over_budget": total_cost > budget
+        }
+
+    return findings
@@ -0,0 +1,429 @@
+"""
+Persisted per-session schedule state.
+
+The result of a full ``assign`` run is stored in the ``assignments`` table
+together with a ``schedule_state`` row recording the mode and the roster
+fingerprint it was solved against. ``/get-schedule`` serves that state
+directly while it is current, and ``/create-task`` extends it with
+``scheduler.insert_task`` instead of re-solving the whole session.
+
+Large sessions are read in schedule order (priority high to low, deadline,
+task_id) either a page at a time with keyset cursors or as a row stream, so
+neither path loads the whole session into memory.
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, func, insert, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.db import Assignment, ScheduleState, Task
+
+
+async def get_state(db: AsyncSession, session_token: str) -> Optional[ScheduleState]:
+    return await db.get(ScheduleState, session_token)
+
+
+def is_current(state: Optional[ScheduleState], mode: str, roster_fingerprint: str) -> bool:
+    """True if ``state`` was solved in ``mode`` against the current roster."""
+    return (
+        state is not None
+        and state.mode == mode
+        and state.roster_fingerprint == roster_fingerprint
+    )
+
+
+async def invalidate(db: AsyncSession, session_token: str) -> None:
+    """
+    Drop the session's persisted schedule so the next /get-schedule re-solves it.
+
+    The caller commits, so this can share a transaction with the task inserts.
+    """
+    await db.execute(delete(Assignment).where(Assignment.session_token == session_token))
+    await db.execute(delete(ScheduleState).where(ScheduleState.session_token == session_token))
+
+
+async def save_schedule(
+    db: AsyncSession,
+    session_token: str,
+    mode: str,
+    roster_fingerprint: str,
+    result: Dict[str, Any]
+) -> None:
+    """
+    Replace the session's persisted schedule with a full ``assign`` result.
+
+    Args:
+        db: Database session
+        session_token: Session the schedule belongs to
+        mode: Assignment mode the result was computed with
+        roster_fingerprint: ``roster.fingerprint()`` at solve time
+        result: Return value of ``scheduler.assign``
+    """
+    await db.execute(delete(Assignment).where(Assignment.session_token == session_token))
+
+    rows = [
+        {
+            "task_id": item["task_id"],
+            "session_token": session_token,
+            "employee_id": item["employee_id"],
+            "employee_name": item["employee_name"],
+            "start_datetime": item["start_datetime"],
+            "end_datetime": item["end_datetime"],
+            "cost": item["cost"],
+            "reason": None
+        }
+        for item in result["assignments"]
+    ]
+    rows.extend(
+        {
+            "task_id": item["task_id"],
+            "session_token": session_token,
+            "employee_id": None,
+            "employee_name": None,
+            "start_datetime": None,
+            "end_datetime": None,
+            "cost": 0.0,
+            "reason": item["reason"]
+        }
+        for item in result["unassigned"]
+    )
+    if rows:
+        await db.execute(insert(Assignment), rows)
+
+    await db.merge(ScheduleState(
+        session_token=session_token,
+        mode=mode,
+        roster_fingerprint=roster_fingerprint,
+        total_cost=result["total_cost"],
+        updated_at=datetime.utcnow()
+    ))
+    await db.commit()
+
+
+async def record_insertion(db: AsyncSession, state: ScheduleState, task_id: str, result: Dict[str, Any]) -> None:
+    """
+    Persist the outcome of ``scheduler.insert_task`` for one new task.
+
+    Args:
+        db: Database session
+        state: The session's current schedule state
+        task_id: Id of the inserted task
+        result: Return value of ``scheduler.insert_task``
+    """
+    assignment = result["assignment"]
+    if assignment is None:
+        row = Assignment(
+            task_id=task_id,
+            session_token=state.session_token,
+            cost=0.0,
+            reason=result["reason"]
+        )
+    else:
+        row = Assignment(
+            task_id=task_id,
+            session_token=state.session_token,
+            employee_id=assignment["employee_id"],
+            employee_name=assignment["employee_name"],
+            start_datetime=assignment["start_datetime"],
+            end_datetime=assignment["end_datetime"],
+            cost=assignment["cost"]
+        )
+        state.total_cost = round((state.total_cost or 0.0) + assignment["cost"], 2)
+
+    await db.merge(row)
+    state.updated_at = datetime.utcnow()
+    await db.commit()
+
+
+async def load_bookings(db: AsyncSession, session_token: str, scope: Dict[str, Any]) -> List[tuple]:
+    """
+    Load the bookings ``scheduler.insert_task`` needs for one insertion.
+
+    Bookings are read through the (session_token, employee_id, start_datetime)
+    index, so only the affected employees' slots are touched.
+
+    Args:
+        db: Database session
+        session_token: Session the schedule belongs to
+        scope: Return value of ``scheduler.insertion_scope``
+
+    Returns:
+        (employee_id, task_id, start_datetime, end_datetime, priority) tuples
+    """
+    if not scope["employee_ids"]:
+        return []
+    result = await db.execute(
+        select(
+            Assignment.employee_id,
+            Assignment.task_id,
+            Assignment.start_datetime,
+            Assignment.end_datetime,
+            Task.priority
+        ).join(Task, Task.task_id == Assignment.task_id).where(
+            Assignment.session_token == session_token,
+            Assignment.employee_id.in_(scope["employee_ids"]),
+            Assignment.start_datetime >= scope["start_datetime"],
+            Assignment.start_datetime < scope["end_datetime"]
+        ).order_by(Assignment.start_datetime)
+    )
+    return [tuple(row) for row in result.all()]
+
+
+async def booked_hours(
+    db: AsyncSession,
+    session_token: str,
+    week_start: datetime,
+    week_end: datetime
+) -> Dict[int, float]:
+    """
+    Hours each employee is booked for in the session's persisted schedule
+    between ``week_start`` and ``week_end`` (by assignment start).
+
+    Returns:
+        Dictionary mapping employee_id to booked hours; employees without
+        bookings in the range are absent
+    """
+    result = await db.execute(
+        select(Assignment.employee_id, Assignment.start_datetime, Assignment.end_datetime).where(
+            Assignment.session_token == session_token,
+            Assignment.employee_id.is_not(None),
+            Assignment.start_datetime >= week_start,
+            Assignment.start_datetime < week_end
+        )
+    )
+    hours: Dict[int, float] = {}
+    for employee_id, start, end in result.all():
+        hours[employee_id] = hours.get(employee_id, 0.0) + (end - start).total_seconds() / 3600.0
+    return hours
+
+
+async def load_schedule(db: AsyncSession, session_token: str, state: ScheduleState) -> Dict[str, Any]:
+    """
+    Return the persisted schedule in the same shape as ``scheduler.assign``.
+
+    Args:
+        db: Database session
+        session_token: Session to load
+        state: The session's current schedule state
+
+    Returns:
+        Dictionary with assignments, unassigned and total_cost
+    """
+    assignments: List[Dict[str, Any]] = []
+    unassigned: List[Dict[str, Any]] = []
+    result = await db.execute(select(Assignment).where(Assignment.session_token == session_token))
+    for row in result.scalars():
+        if row.employee_id is None:
+            unassigned.append({"task_id": row.task_id, "reason": row.reason})
+        else:
+            assignments.append({
+                "task_id": row.task_id,
+                "employee_id": row.employee_id,
+                "employee_name": row.employee_name,
+                "start_datetime": row.start_datetime,
+                "end_datetime": row.end_datetime,
+                "cost": row.cost
+            })
+
+    return {
+        "assignments": assignments,
+        "unassigned": unassigned,
+        "total_cost": round(state.total_cost or 0.0, 2)
+    }
+
+
+_TASK_COLUMNS = (
+    Task.task_id,
+    Task.task_type,
+    Task.duration_minutes,
+    Task.priority,
+    Task.required_skills,
+    Task.start_datetime,
+    Task.end_datetime
+)
+
+# The task's persisted placement; all NULL when it has not been scheduled yet
+_ASSIGNMENT_COLUMNS = (
+    Assignment.employee_id,
+    Assignment.employee_name,
+    Assignment.start_datetime.label("assigned_start"),
+    Assignment.end_datetime.label("assigned_end"),
+    Assignment.cost,
+    Assignment.reason
+)
+
+# Schedule order; served by ix_tasks_schedule_order
+_ORDER = (Task.priority.desc(), Task.end_datetime, Task.task_id)
+
+
+async def count_tasks(db: AsyncSession, session_token: str) -> int:
+    result = await db.execute(select(func.count()).select_from(Task).where(Task.session_token == session_token))
+    return result.scalar_one()
+
+
+async def count_assignments(db: AsyncSession, session_token: str) -> int:
+    """Number of tasks with a persisted placement (assigned or unassigned)."""
+    result = await db.execute(
+        select(func.count()).select_from(Assignment).where(Assignment.session_token == session_token)
+    )
+    return result.scalar_one()
+
+
+def encode_cursor(row: Dict[str, Any]) -> str:
+    """Opaque keyset cursor pointing just after ``row`` in schedule order."""
+    key = [row["priority"], row["end_datetime"].isoformat(), row["task_id"]]
+    return base64.urlsafe_b64encode(json.dumps(key).encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[int, datetime, str]:
+    """
+    Parse a cursor produced by ``encode_cursor``.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        priority, end_datetime, task_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return int(priority), datetime.fromisoformat(end_datetime), str(task_id)
+    except (TypeError, ValueError, UnicodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+
+
+def _schedule_rows(session_token: str, include_assignments: bool):
+    if not include_assignments:
+        return select(*_TASK_COLUMNS).where(Task.session_token == session_token)
+    return (
+        select(*_TASK_COLUMNS, *_ASSIGNMENT_COLUMNS)
+        .outerjoin(Assignment, Assignment.task_id == Task.task_id)
+        .where(Task.session_token == session_token)
+    )
+
+
+def _task_dict(row) -> Dict[str, Any]:
+    return {
+        "task_id": row.task_id,
+        "task_type": row.task_type,
+        "duration_minutes": row.duration_minutes,
+        "priority": row.priority,
+        "required_skills": row.required_skills or {},
+        "start_datetime": row.start_datetime,
+        "end_datetime": row.end_datetime
+    }
+
+
+async def load_tasks(db: AsyncSession, session_token: str) -> List[Dict[str, Any]]:
+    """Return every task of the session as scheduler task dicts, in schedule order."""
+    result = await db.execute(_schedule_rows(session_token, include_assignments=False).order_by(*_ORDER))
+    return [_task_dict(row) for row in result]
+
+
+def _row_dict(row) -> Dict[str, Any]:
+    """
+    Split a selected row into the task and its placement.
+
+    ``assignment`` is None for unassigned tasks (``reason`` says why) and for
+    rows selected without assignments.
+    """
+    task = _task_dict(row)
+    mapping = row._mapping
+    if mapping.get("employee_id") is None:
+        return {"task": task, "assignment": None, "reason": mapping.get("reason")}
+    return {
+        "task": task,
+        "assignment": {
+            "task_id": row.task_id,
+            "employee_id": row.employee_id,
+            "employee_name": row.employee_name,
+            "start_datetime": row.assigned_start,
+            "end_datetime": row.assigned_end,
+            "cost": row.cost
+        },
+        "reason": None
+    }
+
+
+async def load_page(
+    db: AsyncSession,
+    session_token: str,
+    limit: int,
+    after: Optional[str] = None,
+    include_assignments: bool = True
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Return one page of the session's schedule using keyset pagination.
+
+    The order mixes directions (priority DESC, end_datetime ASC, task_id ASC),
+    which a single row-value comparison cannot express. The rest of the page
+    is therefore read with at most two index seeks: the remaining tasks of the
+    cursor's priority, then the lower priorities. Each page costs the same
+    however deep into the session it is.
+
+    Args:
+        db: Database session
+        session_token: Session to read
+        limit: Maximum number of rows
+        after: Cursor from a previous page, or None for the first page
+        include_assignments: Join each task's persisted placement
+
+    Returns:
+        (rows, next_cursor); rows are ``{"task", "assignment", "reason"}``
+        dicts and next_cursor is None on the last page
+
+    Raises:
+        ValueError: If ``after`` is malformed
+    """
+    query = _schedule_rows(session_token, include_assignments)
+    # Fetch one extra row to know whether another page follows
+    wanted = limit + 1
+
+    if after is None:
+        result = await db.execute(query.order_by(*_ORDER).limit(wanted))
+        rows = list(result)
+    else:
+        priority, end_datetime, task_id = decode_cursor(after)
+        result = await db.execute(
+            query.where(
+                Task.priority == priority,
+                Task.end_datetime >= end_datetime,
+                or_(Task.end_datetime > end_datetime, Task.task_id > task_id)
+            ).order_by(*_ORDER).limit(wanted)
+        )
+        rows = list(result)
+        if len(rows) < wanted:
+            result = await db.execute(
+                query.where(Task.priority < priority).order_by(*_ORDER).limit(wanted - len(rows))
+            )
+            rows.extend(result)
+
+    page = [_row_dict(row) for row in rows[:limit]]
+    next_cursor = encode_cursor(page[-1]["task"]) if len(rows) > limit else None
+    return page, next_cursor
+
+
+async def stream_rows(
+    db: AsyncSession,
+    session_token: str,
+    include_assignments: bool = True,
+    batch_size: int = 1000
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Yield the session's schedule rows in order straight from a database cursor.
+
+    Rows are fetched ``batch_size`` at a time, so memory stays flat however
+    large the session is.
+
+    Yields:
+        ``{"task", "assignment", "reason"}`` dicts, as in ``load_page``
+    """
+    result = await db.stream(
+        _schedule_rows(session_token, include_assignments)
+        .order_by(*_ORDER)
+        .execution_options(yield_per=batch_size)
+    )
+    async for partition in result.partitions():
+        for row in partition:
+            yield _row_dict(row)
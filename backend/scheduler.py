@@ -1,23 +1,458 @@
+import bisect
+import heapq
+import itertools
 from datetime import datetime
 
-def schedule(tasks):
+import numpy as np
+
+from backend.availability import (
+    AvailabilityIndex,
+    MINUTES_PER_WEEK,
+    availability_windows,
+    from_minutes,
+    to_minutes
+)
+
+def _deadline(value):
+    return datetime.fromisoformat(value) if isinstance(value, str) else value
+
+
+class TaskQueue:
+    """
+    Priority queue of tasks in schedule order: priority (high to low), then
+    deadline (early to late), then task_id, the order of the
+    ``ix_tasks_schedule_order`` index. ``assign`` places tasks in greedy mode
+    in the order they pop.
+
+    Backed by a binary heap of (key, task) entries. ``end_datetime`` is parsed
+    once when a task is pushed and kept in the key, so the caller's dicts are
+    never modified. ``push`` and ``pop`` are O(log n); ``peek_top_n`` is
+    O(N log N) in the number of tasks requested, independent of the queue size.
+    """
+
+    def __init__(self, tasks=()):
+        self._counter = itertools.count()
+        self._heap = [self._entry(task) for task in tasks]
+        heapq.heapify(self._heap)
+
+    def _entry(self, task):
+        # The counter only breaks ties between tasks sharing a task_id
+        return (
+            (-task["priority"], _deadline(task["end_datetime"]), str(task.get("task_id", "")), next(self._counter)),
+            task
+        )
+
+    def __len__(self):
+        return len(self._heap)
+
+    def push(self, task):
+        """Add a task."""
+        heapq.heappush(self._heap, self._entry(task))
+
+    def pop(self):
+        """
+        Remove and return the next task.
+
+        Raises:
+            IndexError: If the queue is empty
+        """
+        if not self._heap:
+            raise IndexError("pop from an empty TaskQueue")
+        return heapq.heappop(self._heap)[1]
+
+    def peek(self):
+        """
+        Return the next task without removing it.
+
+        Raises:
+            IndexError: If the queue is empty
+        """
+        if not self._heap:
+            raise IndexError("peek at an empty TaskQueue")
+        return self._heap[0][1]
+
+    def peek_top_n(self, n):
+        """
+        Return the next ``n`` tasks in order without removing them.
+
+        Walks the heap from the root with a frontier of candidate nodes; a
+        node's children can only follow it, so at most 2n nodes are visited.
+        """
+        heap = self._heap
+        top = []
+        frontier = [(heap[0][0], 0)] if heap and n > 0 else []
+        while frontier and len(top) < n:
+            _, i = heapq.heappop(frontier)
+            top.append(heap[i][1])
+            for child in (2 * i + 1, 2 * i + 2):
+                if child < len(heap):
+                    heapq.heappush(frontier, (heap[child][0], child))
+        return top
+
+    def pop_all(self):
+        """Remove and return every task in order."""
+        tasks = []
+        while self._heap:
+            tasks.append(heapq.heappop(self._heap)[1])
+        return tasks
+
+
+def schedule(tasks, limit=None):
     """
     Sort tasks on the basis of priority (descending) and deadline (ascending).
-    
+
+    The input dicts are not modified; ISO string deadlines are parsed for
+    ordering only.
+
     Args:
         tasks: List of task dictionaries with 'priority' and 'end_datetime' keys
-        
+        limit: Return only the first ``limit`` tasks without ordering the rest
+
     Returns:
         List of tasks sorted by priority (high to low) and deadline (early to late)
     """
-    # Handle both datetime objects and ISO strings
+    queue = TaskQueue(tasks)
+    if limit is not None:
+        return queue.peek_top_n(limit)
+    return queue.pop_all()
+
+# ---------------------------------------------------------------------------
+# Employee assignment
+# ---------------------------------------------------------------------------
+
+NO_QUALIFIED_EMPLOYEE = "no employee meets the skill requirements with availability in the task window"
+NO_AVAILABLE_SLOT = "no employee is available for the task duration within its time window"
+WEEKLY_HOURS_EXCEEDED = "all qualified employees would exceed their weekly hour limits"
+
+
+class _EmployeeState:
+    """Bookings and weekly load of one employee while a schedule is being built."""
+
+    def __init__(self, employee):
+        self.employee = employee
+        self.starts = []
+        self.ends = []
+        self.task_ids = []
+        self.weekly_minutes = {}
+        self.max_minutes = int(float(employee.get("max_hours") or 0) * 60)
+
+    def earliest_slot(self, window_start, window_end, duration):
+        """Earliest start in [window_start, window_end - duration] that overlaps no booking."""
+        t = window_start
+        i = bisect.bisect_right(self.ends, t)
+        while i < len(self.starts) and self.starts[i] < t + duration:
+            t = max(t, self.ends[i])
+            if t + duration > window_end:
+                return None
+            i += 1
+        return t if t + duration <= window_end else None
+
+    def has_hours(self, start, duration):
+        week = start // MINUTES_PER_WEEK
+        return self.weekly_minutes.get(week, 0) + duration <= self.max_minutes
+
+    def book(self, task_id, start, duration):
+        i = bisect.bisect_left(self.starts, start)
+        self.starts.insert(i, start)
+        self.ends.insert(i, start + duration)
+        self.task_ids.insert(i, task_id)
+        week = start // MINUTES_PER_WEEK
+        self.weekly_minutes[week] = self.weekly_minutes.get(week, 0) + duration
+
+    def release(self, task_id, start, duration):
+        i = bisect.bisect_left(self.starts, start)
+        while self.task_ids[i] != task_id:
+            i += 1
+        del self.starts[i], self.ends[i], self.task_ids[i]
+        week = start // MINUTES_PER_WEEK
+        self.weekly_minutes[week] -= duration
+
+
+class _Problem:
+    """Vectorized skill/cost data shared by the assignment passes."""
+
+    def __init__(self, tasks, employees):
+        self.tasks = tasks
+        self.states = [_EmployeeState(e) for e in employees]
+        self.rows = {e.get("employee_id"): row for row, e in enumerate(employees)}
+        self.rates = np.array([float(e.get("hourly_rate") or 0.0) for e in employees])
+        self.by_rate = np.argsort(self.rates, kind="stable")
+
+        vocabulary = {}
+        for employee in employees:
+            for skill in (employee.get("skills") or {}):
+                vocabulary.setdefault(skill, len(vocabulary))
+        for task in tasks:
+            for skill in task["required_skills"]:
+                vocabulary.setdefault(skill, len(vocabulary))
+
+        self.vocabulary = vocabulary
+        self.levels = np.zeros((len(employees), max(1, len(vocabulary))), dtype=np.int16)
+        for row, employee in enumerate(employees):
+            for skill, level in (employee.get("skills") or {}).items():
+                self.levels[row, vocabulary[skill]] = int(level)
+
+    def qualified(self, task, index):
+        """Employee rows meeting every required skill level and available in the task window, cheapest first."""
+        mask = np.ones(len(self.states), dtype=bool)
+        for skill, level in task["required_skills"].items():
+            mask &= self.levels[:, self.vocabulary[skill]] >= int(level)
+        if mask.any():
+            available = np.zeros(len(self.states), dtype=bool)
+            available_ids = index.available_minutes(task["window_start"], task["window_end"], task["duration"])
+            available[[self.rows[employee_id] for employee_id in available_ids if employee_id in self.rows]] = True
+            mask &= available
+        return self.by_rate[mask[self.by_rate]]
+
+    def find_slot(self, row, task):
+        """Earliest feasible start for ``task`` on employee ``row``; returns (start, reason)."""
+        state = self.states[row]
+        duration = task["duration"]
+        blocked_by_hours = False
+        for window_start, window_end in availability_windows(
+            state.employee.get("availability"), task["window_start"], task["window_end"]
+        ):
+            t = window_start
+            while t is not None and t + duration <= window_end:
+                t = state.earliest_slot(t, window_end, duration)
+                if t is None:
+                    break
+                if state.has_hours(t, duration):
+                    return t, None
+                # Weekly cap reached in this week: jump to the next week
+                blocked_by_hours = True
+                t = (t // MINUTES_PER_WEEK + 1) * MINUTES_PER_WEEK
+        return None, WEEKLY_HOURS_EXCEEDED if blocked_by_hours else NO_AVAILABLE_SLOT
+
+    def place(self, task, rows):
+        """Book ``task`` on the first employee in ``rows`` with a feasible slot."""
+        reason = NO_QUALIFIED_EMPLOYEE
+        for row in rows:
+            start, why = self.find_slot(row, task)
+            if start is not None:
+                self.states[row].book(task["task_id"], start, task["duration"])
+                return row, start, None
+            if reason != WEEKLY_HOURS_EXCEEDED:
+                reason = why
+        return None, None, reason
+
+    def cost(self, row, task):
+        return float(self.rates[row]) * task["duration"] / 60.0
+
+    def assignment(self, row, task, start):
+        employee = self.states[row].employee
+        return {
+            "task_id": task["task_id"],
+            "employee_id": employee.get("employee_id"),
+            "employee_name": employee.get("name", "Unknown"),
+            "start_datetime": from_minutes(start),
+            "end_datetime": from_minutes(start + task["duration"]),
+            "cost": round(self.cost(row, task), 2)
+        }
+
+
+def _prepare_tasks(tasks):
+    prepared = []
     for task in tasks:
-        if isinstance(task["end_datetime"], str):
-            task["end_datetime"] = datetime.fromisoformat(task["end_datetime"])
+        window_start = to_minutes(task["start_datetime"], round_up=True)
+        window_end = to_minutes(task["end_datetime"])
+        prepared.append({
+            "task_id": task["task_id"],
+            "priority": int(task["priority"]),
+            "duration": int(task["duration_minutes"]),
+            "required_skills": dict(task.get("required_skills") or {}),
+            "window_start": window_start,
+            "window_end": window_end,
+            # Kept for TaskQueue ordering and to map queued tasks back to their position
+            "end_datetime": task["end_datetime"],
+            "index": len(prepared)
+        })
+    return prepared
+
+
+def assign(tasks, employees, mode="greedy", max_passes=3, availability_index=None):
+    """
+    Assign tasks to employees inside their availability and the task time window.
+
+    Constraints: an employee must meet every required skill level, be available
+    (per-weekday ``availability`` hours) for the whole task duration inside
+    [start_datetime, end_datetime], not be double-booked, and stay within
+    ``max_hours`` per ISO week. Among feasible employees the cheapest
+    (``hourly_rate``) is chosen, and higher-priority tasks are placed first.
+
+    Modes:
+        greedy: tasks in TaskQueue order (priority, end_datetime, task_id), each placed on the
+            cheapest feasible employee at the earliest feasible time.
+        optimize: within each priority level, the most constrained tasks
+            (fewest qualified employees, tightest window) go first; then a
+            local-search pass moves assigned tasks to cheaper employees and
+            retries unassigned tasks with the freed capacity, up to ``max_passes``.
+
+    Args:
+        tasks: Task dicts with task_id, duration_minutes, required_skills,
+            priority, start_datetime and end_datetime. They are not modified.
+        employees: Employee payloads as stored by ``embed_employees``
+        mode: "greedy" or "optimize"
+        max_passes: Maximum local-search passes in optimize mode
+        availability_index: Optional AvailabilityIndex already synced with
+            ``employees``; built on the fly when omitted
+
+    Returns:
+        Dictionary with:
+            - assignments: list of {task_id, employee_id, employee_name,
+              start_datetime, end_datetime, cost}
+            - unassigned: list of {task_id, reason}
+            - total_cost: float
+    """
+    if mode not in ("greedy", "optimize"):
+        raise ValueError("mode must be 'greedy' or 'optimize'")
+
+    prepared = _prepare_tasks(tasks)
+    problem = _Problem(prepared, employees)
+    index = availability_index if availability_index is not None else AvailabilityIndex(employees)
+    candidates = [problem.qualified(task, index) for task in prepared]
+
+    if mode == "greedy":
+        order = [task["index"] for task in TaskQueue(prepared).pop_all()]
+    else:
+        order = sorted(range(len(prepared)), key=lambda i: (
+            -prepared[i]["priority"],
+            len(candidates[i]),
+            prepared[i]["window_end"] - prepared[i]["window_start"] - prepared[i]["duration"],
+            prepared[i]["window_end"]
+        ))
+
+    placed = {}
+    reasons = {}
+    for i in order:
+        row, start, reason = problem.place(prepared[i], candidates[i])
+        if row is None:
+            reasons[i] = reason
+        else:
+            placed[i] = (row, start)
+
+    if mode == "optimize":
+        for _ in range(max_passes):
+            improved = False
+
+            # Move expensive assignments to cheaper employees
+            for i in sorted(placed, key=lambda i: -problem.cost(placed[i][0], prepared[i])):
+                row, start = placed[i]
+                task = prepared[i]
+                cheaper = [r for r in candidates[i] if problem.rates[r] < problem.rates[row]]
+                if not cheaper:
+                    continue
+                problem.states[row].release(task["task_id"], start, task["duration"])
+                new_row, new_start, _ = problem.place(task, cheaper)
+                if new_row is None:
+                    problem.states[row].book(task["task_id"], start, task["duration"])
+                else:
+                    placed[i] = (new_row, new_start)
+                    improved = True
+
+            # Retry unassigned tasks with the capacity that was freed
+            for i in [i for i in order if i in reasons]:
+                row, start, reason = problem.place(prepared[i], candidates[i])
+                if row is None:
+                    reasons[i] = reason
+                else:
+                    placed[i] = (row, start)
+                    del reasons[i]
+                    improved = True
+
+            if not improved:
+                break
+
+    assignments = []
+    total_cost = 0.0
+    for i in order:
+        if i not in placed:
+            continue
+        row, start = placed[i]
+        assignment = problem.assignment(row, prepared[i], start)
+        total_cost += assignment["cost"]
+        assignments.append(assignment)
+
+    unassigned = [{"task_id": prepared[i]["task_id"], "reason": reasons[i]} for i in order if i in reasons]
+
+    return {
+        "assignments": assignments,
+        "unassigned": unassigned,
+        "total_cost": round(total_cost, 2)
+    }
+
+
+def insertion_scope(task, employees, availability_index=None):
+    """
+    Describe the bookings ``insert_task`` needs for ``task``.
+
+    Only employees qualified for the task matter, and only their bookings in
+    the ISO weeks spanned by the task window (bookings never cross midnight,
+    so those cover both overlaps and weekly hour totals).
+
+    Returns:
+        Dictionary with employee_ids, start_datetime and end_datetime
+    """
+    prepared = _prepare_tasks([task])[0]
+    problem = _Problem([prepared], employees)
+    index = availability_index if availability_index is not None else AvailabilityIndex(employees)
+    rows = problem.qualified(prepared, index)
+
+    weeks_start = prepared["window_start"] // MINUTES_PER_WEEK * MINUTES_PER_WEEK
+    weeks_end = ((prepared["window_end"] - 1) // MINUTES_PER_WEEK + 1) * MINUTES_PER_WEEK
+    return {
+        "employee_ids": [problem.states[row].employee.get("employee_id") for row in rows],
+        "start_datetime": from_minutes(weeks_start),
+        "end_datetime": from_minutes(weeks_end)
+    }
+
+
+def insert_task(task, employees, bookings, availability_index=None):
+    """
+    Place one new task into an existing schedule without re-solving it.
+
+    Only employees qualified for ``task`` are considered, and ``bookings``
+    only needs to hold their bookings within ``insertion_scope(task, ...)``,
+    so the cost stays flat however many tasks the schedule already holds.
+    Existing bookings are never moved.
+
+    Args:
+        task: Task dict with the fields ``assign`` expects
+        employees: Employee payloads as stored by ``embed_employees``
+        bookings: (employee_id, task_id, start_datetime, end_datetime, priority)
+            tuples for the employees and range given by ``insertion_scope``
+        availability_index: Optional AvailabilityIndex already synced with
+            ``employees``; built on the fly when omitted
+
+    Returns:
+        Dictionary with:
+            - assignment: {task_id, employee_id, employee_name, start_datetime,
+              end_datetime, cost}, or None if the task could not be placed
+            - reason: why the task could not be placed, or None
+            - displaceable: True if a lower-priority task is booked on a
+              qualified employee inside the window, so a full re-solve may
+              still place the task
+    """
+    prepared = _prepare_tasks([task])
+    new_task = prepared[0]
+    problem = _Problem(prepared, employees)
+    index = availability_index if availability_index is not None else AvailabilityIndex(employees)
+
+    rows = problem.qualified(new_task, index)
+    if len(rows) == 0:
+        return {"assignment": None, "reason": NO_QUALIFIED_EMPLOYEE, "displaceable": False}
 
-    tasks_sorted = sorted(
-        tasks,
-        key=lambda t: (-t["priority"], t["end_datetime"])
-    )
+    displaceable = False
+    for employee_id, task_id, start, end, priority in bookings:
+        row = problem.rows.get(employee_id)
+        if row is None:
+            continue
+        start, end = to_minutes(start), to_minutes(end)
+        problem.states[row].book(task_id, start, end - start)
+        if int(priority) < new_task["priority"] and start < new_task["window_end"] and end > new_task["window_start"]:
+            displaceable = True
 
-    return tasks_sorted
\ No newline at end of file
+    row, start, reason = problem.place(new_task, rows)
+    if row is None:
+        return {"assignment": None, "reason": reason, "displaceable": displaceable}
+    return {"assignment": problem.assignment(row, new_task, start), "reason": None, "displaceable": False}
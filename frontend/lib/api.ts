@@ -13,6 +13,8 @@ export interface UploadResponse {
   filename: string
   data_type: string
   size_in_bytes: number
+  job_id?: string
+  status?: string
 }
 
 export interface TaskCreateRequest {
@@ -29,9 +31,29 @@ export interface TaskCreateResponse {
   status: string
 }
 
+export interface TaskBulkCreateResponse {
+  task_ids: (string | null)[]
+  created: number
+  errors: { index: number; errors: { loc: (string | number)[]; msg: string }[] }[]
+}
+
 export interface ScheduleResponse {
   schedule?: any[]
   message?: string
+  next_cursor?: string | null
+}
+
+export interface ScheduleIssuesResponse {
+  issues?: {
+    horizon?: { start: string; end: string; bucket_minutes: number; roster_utilization_pct: number | null }
+    understaffed_slots: { count: number; shortfall_hours: number; worst: any[] }
+    overtime_risk: { count: number; over_limit: number; worst: any[] }
+    coverage: { tasks: number; assigned: number; task_coverage_pct: number; minute_coverage_pct: number }
+    budget?: { budget: number; assigned_cost: number; burn_pct: number | null; over_budget: boolean }
+  }
+  tradeoffs?: { recommendations: any[]; alerts: any[] }
+  tradeoff_error?: string
+  message?: string
 }
 
 export interface EmployeeSearchRequest {
@@ -42,6 +64,8 @@ export interface EmployeeSearchRequest {
   priority: number
   start_datetime: string
   end_datetime: string
+  ranking?: 'semantic' | 'structured' | 'hybrid'
+  rerank_weights?: Record<string, number>
 }
 
 export interface EmployeeSearchResponse {
@@ -162,10 +186,35 @@ export async function createTask(task: TaskCreateRequest): Promise<TaskCreateRes
 }
 
 /**
- * Get the schedule for the current session
+ * Create many tasks in one request; invalid items are reported in `errors`
  */
-export async function getSchedule(): Promise<ScheduleResponse> {
-  const response = await fetch(`${API_URL}/get-schedule`, {
+export async function createTasksBulk(tasks: TaskCreateRequest[]): Promise<TaskBulkCreateResponse> {
+  const response = await fetch(`${API_URL}/create-tasks/bulk`, {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+    },
+    credentials: 'include',
+    body: JSON.stringify({ tasks }),
+  })
+
+  if (!response.ok) {
+    const error: ApiError = await response.json()
+    throw new Error(error.detail || `Failed to create tasks: ${response.statusText}`)
+  }
+
+  return response.json()
+}
+
+/**
+ * Get the schedule for the current session, optionally one keyset page at a time
+ */
+export async function getSchedule(page?: { limit?: number; after?: string }): Promise<ScheduleResponse> {
+  const params = new URLSearchParams()
+  if (page?.limit) params.set('limit', String(page.limit))
+  if (page?.after) params.set('after', page.after)
+  const query = params.toString()
+  const response = await fetch(`${API_URL}/get-schedule${query ? `?${query}` : ''}`, {
     method: 'GET',
     credentials: 'include',
   })
@@ -178,6 +227,33 @@ export async function getSchedule(): Promise<ScheduleResponse> {
   return response.json()
 }
 
+/**
+ * Get the session schedule's understaffing, overtime, coverage and budget findings,
+ * optionally with Gemini trade-off recommendations
+ */
+export async function getScheduleIssues(options?: {
+  budget?: number
+  coverage?: number
+  recommend?: boolean
+}): Promise<ScheduleIssuesResponse> {
+  const params = new URLSearchParams()
+  if (options?.budget !== undefined) params.set('budget', String(options.budget))
+  if (options?.coverage !== undefined) params.set('coverage', String(options.coverage))
+  if (options?.recommend) params.set('recommend', 'true')
+  const query = params.toString()
+  const response = await fetch(`${API_URL}/schedule-issues${query ? `?${query}` : ''}`, {
+    method: 'GET',
+    credentials: 'include',
+  })
+
+  if (!response.ok) {
+    const error: ApiError = await response.json()
+    throw new Error(error.detail || `Failed to get schedule issues: ${response.statusText}`)
+  }
+
+  return response.json()
+}
+
 /**
  * Search for employees matching task requirements
  */
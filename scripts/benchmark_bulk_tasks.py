@@ -0,0 +1,111 @@
+"""
+Benchmark bulk task creation against N single /create-task calls.
+
+Runs the FastAPI app in-process through httpx's ASGI transport against a
+temporary SQLite database and reports tasks/sec for:
+- N sequential POST /create-task requests (one INSERT and commit each)
+- one POST /create-tasks/bulk request (one executemany INSERT, one commit)
+
+Each size uses a fresh session, so no persisted schedule is involved.
+
+Usage:
+    python scripts/benchmark_bulk_tasks.py --sizes 100 1000 5000
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# Add project root to path so the scripts can also run standalone
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from scripts.generate_employees import SKILLS_POOL
+
+TASK_TYPES = [
+    'customer_support', 'technical_issue', 'sales_call', 'data_entry',
+    'quality_check', 'inventory_update', 'phone_support', 'documentation',
+    'cash_transaction', 'product_inquiry'
+]
+
+
+def synthetic_task(base):
+    start = base + timedelta(hours=random.randint(0, 24 * 14))
+    return {
+        "task_type": random.choice(TASK_TYPES),
+        "duration_minutes": random.choice([30, 45, 60, 90, 120]),
+        "required_skills": {skill: random.randint(1, 5) for skill in random.sample(SKILLS_POOL, 2)},
+        "priority": random.randint(1, 5),
+        "start_datetime": start.isoformat(),
+        "end_datetime": (start + timedelta(hours=random.randint(4, 48))).isoformat()
+    }
+
+
+def rate(count, elapsed):
+    return count / elapsed if elapsed > 0 else float("inf")
+
+
+async def new_session(client):
+    response = await client.get("/init-session")
+    response.raise_for_status()
+    return {"session_token": response.json()["session_token"]}
+
+
+async def run(client, n):
+    base = datetime(2025, 1, 6, 8)
+    tasks = [synthetic_task(base) for _ in range(n)]
+
+    cookies = await new_session(client)
+    started = time.perf_counter()
+    for task in tasks:
+        response = await client.post("/create-task", json=task, cookies=cookies)
+        response.raise_for_status()
+    single_rate = rate(n, time.perf_counter() - started)
+
+    cookies = await new_session(client)
+    started = time.perf_counter()
+    response = await client.post("/create-tasks/bulk", json={"tasks": tasks}, cookies=cookies)
+    response.raise_for_status()
+    bulk_rate = rate(response.json()["created"], time.perf_counter() - started)
+
+    print(
+        f"{n:>6} tasks | single: {single_rate:9.1f} tasks/s "
+        f"| bulk: {bulk_rate:9.1f} tasks/s | speedup x{bulk_rate / single_rate:.1f}"
+    )
+
+
+async def main_async(sizes):
+    import httpx
+    from backend.db import close_db, init_db
+    from backend.main import app
+
+    await init_db()
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for n in sizes:
+                await run(client, n)
+    finally:
+        await close_db()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 5000])
+    args = parser.parse_args()
+
+    random.seed(0)
+    with tempfile.TemporaryDirectory() as directory:
+        # Must be set before backend.db is imported, since the engine is module-level
+        os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(directory, 'bench.db')}"
+        asyncio.run(main_async(args.sizes))
+
+
+if __name__ == "__main__":
+    main()
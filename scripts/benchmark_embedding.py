@@ -0,0 +1,139 @@
+"""
+Benchmark per-row vs batched embedding of employees and historical tasks.
+
+Generates synthetic CSVs in memory and reports rows/sec for:
+- the original ``df.iterrows()`` loop with one ``model.encode()`` per row
+- the vectorized preparation + batched encoding used by embed_employees / embed_tasks
+
+Only parsing and encoding are timed; nothing is upserted. The per-row loop is
+measured on a sample (``--legacy-rows``) because it is too slow to run on 100k rows.
+
+Usage:
+    python scripts/benchmark_embedding.py --sizes 10000 100000 --batch-size 128
+"""
+
+import argparse
+import csv
+import io
+import json
+import os
+import random
+import sys
+import time
+
+import pandas as pd
+
+# Add project root to path so the scripts can also run standalone
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from backend.registry import get_embedding_model
+from backend.ai.embeddings import encode_texts
+from scripts.embed_employees import parse_json_cell, prepare_employees
+from scripts.embed_tasks import prepare_tasks
+from scripts.generate_employees import SKILLS_POOL, generate_employee
+
+TASK_TYPES = [
+    'customer_support', 'technical_issue', 'sales_call', 'data_entry',
+    'quality_check', 'inventory_update', 'phone_support', 'documentation',
+    'cash_transaction', 'product_inquiry'
+]
+OUTCOMES = ['success', 'delayed', 'escalated']
+
+
+def synthetic_employees_csv(n):
+    buffer = io.StringIO()
+    rows = [generate_employee(i) for i in range(1, n + 1)]
+    writer = csv.DictWriter(buffer, fieldnames=list(rows[0].keys()))
+    writer.writeheader()
+    writer.writerows(rows)
+    buffer.seek(0)
+    return buffer
+
+
+def synthetic_tasks_csv(n):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(['task_id', 'task_type', 'duration_minutes', 'required_skills', 'employee_assigned', 'outcome'])
+    for i in range(1, n + 1):
+        skills = {random.choice(SKILLS_POOL): random.randint(1, 10) for _ in range(random.randint(1, 3))}
+        writer.writerow([
+            i, random.choice(TASK_TYPES), random.randint(15, 120), json.dumps(skills),
+            random.randint(1, 10), random.choice(OUTCOMES)
+        ])
+    buffer.seek(0)
+    return buffer
+
+
+def legacy_employee_rows(df, model):
+    for _, row in df.iterrows():
+        skills = parse_json_cell(row['skills']) or {}
+        certifications = parse_json_cell(row['certifications']) or []
+        parse_json_cell(row['availability'])
+        performance_history = parse_json_cell(row['performance_history']) or {}
+        ratings = list(performance_history.values())
+        performance_rating = sum(ratings) / len(ratings) if ratings else 0.0
+        text = (
+            f"Employee with skills {json.dumps(skills)}, certifications {json.dumps(certifications)}, "
+            f"performance rating {performance_rating}"
+        )
+        model.encode(text).tolist()
+
+
+def legacy_task_rows(df, model):
+    for _, row in df.iterrows():
+        required_skills = parse_json_cell(row['required_skills']) or {}
+        text = (
+            f"Task of type {row['task_type']} requiring skills {json.dumps(required_skills)} "
+            f"with duration {int(row['duration_minutes'])} minutes"
+        )
+        model.encode(text).tolist()
+
+
+def rows_per_second(rows, seconds):
+    return rows / seconds if seconds > 0 else float("inf")
+
+
+def run(kind, n, model, batch_size, legacy_rows):
+    make_csv, prepare, legacy = {
+        "employees": (synthetic_employees_csv, prepare_employees, legacy_employee_rows),
+        "tasks": (synthetic_tasks_csv, prepare_tasks, legacy_task_rows),
+    }[kind]
+
+    df = pd.read_csv(make_csv(n))
+
+    sample = df.head(min(legacy_rows, n))
+    started = time.perf_counter()
+    legacy(sample, model)
+    legacy_rate = rows_per_second(len(sample), time.perf_counter() - started)
+
+    started = time.perf_counter()
+    _, _, texts = prepare(df)
+    matrix = encode_texts(texts, batch_size=batch_size, model=model)
+    batched_rate = rows_per_second(len(matrix), time.perf_counter() - started)
+
+    print(
+        f"{kind:<10} {n:>8} rows | per-row: {legacy_rate:10.1f} rows/s (sampled {len(sample)}) "
+        f"| batched: {batched_rate:10.1f} rows/s | speedup x{batched_rate / legacy_rate:.1f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--batch-size", type=int, default=128)
+    parser.add_argument("--legacy-rows", type=int, default=2000)
+    args = parser.parse_args()
+
+    random.seed(0)
+    model = get_embedding_model()
+    model.encode("warmup")
+
+    for n in args.sizes:
+        for kind in ("employees", "tasks"):
+            run(kind, n, model, args.batch_size, args.legacy_rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,29 @@
 import os
 import json
+import sys
 import pandas as pd
-from qdrant_client import QdrantClient
-from sentence_transformers import SentenceTransformer
+
+# Add project root to path so the scripts can also run standalone
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from backend.registry import get_embedding_model
+from backend.ai.vector_store import FLOAT, INTEGER, KEYWORD, get_vector_store
+from backend.ai.embeddings import DEFAULT_BATCH_SIZE, encode_texts, iter_encoded_batches
+from backend.jobs import IngestionProgress
+from backend import roster
+from scripts.generate_employees import SKILLS_POOL
+
+UPSERT_BATCH_SIZE = 256
+
+# Payload fields used as hard constraints in employee searches
+EMPLOYEE_PAYLOAD_INDEXES = {
+    **{f"skills.{skill}": INTEGER for skill in SKILLS_POOL},
+    "max_hours": INTEGER,
+    "hourly_rate": FLOAT,
+    "certifications": KEYWORD
+}
 
 def parse_json_cell(cell):
     if pd.isna(cell) or cell == "":
@@ -14,90 +35,143 @@ def parse_json_cell(cell):
         print(f"Error parsing JSON: {cell[:50]}... Error: {e}")
         return None
 
-def embed_employees(file_content):
-
-    QDRANT_URL = os.environ.get("QDRANT_URL")
-    QDRANT_API_KEY = os.environ.get("QDRANT_API_KEY")
-    
-    if not QDRANT_URL or not QDRANT_API_KEY:
-        raise ValueError("QDRANT_URL and QDRANT_API_KEY must be set in environment variables")
-    
-    client = QdrantClient(
-        url=QDRANT_URL,
-        api_key=QDRANT_API_KEY,
-    )
-    
-    model = SentenceTransformer('sentence-transformers/all-MiniLM-L6-v2')
-    
-    df = pd.read_csv(file_content)
-    
-    points = []
-    
-    for _, row in df.iterrows():
-        employee_id = int(row['employee_id'])
-        name = str(row['name'])
-        hourly_rate = float(row['hourly_rate'])
-        
-        skills = parse_json_cell(row['skills'])
-        certifications = parse_json_cell(row['certifications'])
-        availability = parse_json_cell(row['availability'])
-        performance_history = parse_json_cell(row['performance_history'])
-        
-        weekly_max_hours = int(row['weekly_max_hours'])
-        
-        if skills is None:
-            skills = {}
-        if certifications is None:
-            certifications = []
-        if availability is None:
-            availability = {}
-        if performance_history is None:
-            performance_history = {}
-        
-        skills_json = json.dumps(skills)
-        certs_json = json.dumps(certifications)
-        
-        performance_rating = 0.0
-        if performance_history:
-            ratings = list(performance_history.values())
-            if ratings:
-                performance_rating = sum(ratings) / len(ratings)
-        
-        embedding_text = f"Employee with skills {skills_json}, certifications {certs_json}, performance rating {performance_rating}"
-        
-        embedding = model.encode(embedding_text).tolist()
-        
-        payload = {
+def parse_json_column(series, default_factory):
+    """
+    Parse a column of JSON cells, replacing missing/invalid cells with default_factory().
+
+    The non-empty cells are joined into one JSON array and decoded with a
+    single json.loads; if that fails, the column is parsed cell by cell.
+    """
+    present = (series.notna() & (series != "")).tolist()
+    cells = series[present].astype(str).tolist()
+    try:
+        # The separators keep every doubled quote inside its own cell
+        values = json.loads("[" + ",".join(cells).replace('""', '"') + "]")
+    except json.JSONDecodeError:
+        values = None
+    if values is None or len(values) != len(cells):
+        values = [parse_json_cell(cell) for cell in cells]
+
+    values = iter(values)
+    parsed = [next(values) if has_value else None for has_value in present]
+    return [value if value is not None else default_factory() for value in parsed]
+
+def average_rating(performance_history):
+    if not performance_history:
+        return 0.0
+    ratings = list(performance_history.values())
+    return sum(ratings) / len(ratings)
+
+def prepare_employees(df):
+    """
+    Build point ids, payloads and embedding texts for every row of an employees DataFrame.
+
+    Columns are converted and JSON-decoded column by column instead of row by row.
+    """
+    employee_ids = df['employee_id'].astype(int).tolist()
+    names = df['name'].astype(str).tolist()
+    hourly_rates = df['hourly_rate'].astype(float).tolist()
+    weekly_max_hours = df['weekly_max_hours'].astype(int).tolist()
+
+    skills = parse_json_column(df['skills'], dict)
+    certifications = parse_json_column(df['certifications'], list)
+    availability = parse_json_column(df['availability'], dict)
+    performance_history = parse_json_column(df['performance_history'], dict)
+    performance_ratings = [average_rating(history) for history in performance_history]
+
+    texts = [
+        f"Employee with skills {json.dumps(s)}, certifications {json.dumps(c)}, performance rating {r}"
+        for s, c, r in zip(skills, certifications, performance_ratings)
+    ]
+
+    payloads = [
+        {
             "employee_id": employee_id,
             "name": name,
             "hourly_rate": hourly_rate,
-            "skills": skills,
-            "certifications": certifications,
-            "availability": availability,
-            "max_hours": weekly_max_hours,
-            "performance_rating": performance_rating,
-            "past_task_success": performance_history
+            "skills": s,
+            "certifications": c,
+            "availability": a,
+            "max_hours": max_hours,
+            "performance_rating": rating,
+            "past_task_success": history
         }
-        
-        points.append({
-            "id": employee_id,
-            "vector": embedding,
-            "payload": payload
-        })
-        
-        if len(points) >= 50:
-            client.upsert(
-                collection_name="employees",
-                points=points
-            )
-            print(f"Upserted {len(points)} employees")
-            points = []
-    
-    if points:
-        client.upsert(
-            collection_name="employees",
-            points=points
+        for employee_id, name, hourly_rate, s, c, a, max_hours, rating, history in zip(
+            employee_ids, names, hourly_rates, skills, certifications, availability,
+            weekly_max_hours, performance_ratings, performance_history
         )
-        print(f"Upserted final {len(points)} employees")
-    
-    print("Employee embedding complete!")
\ No newline at end of file
+    ]
+
+    return employee_ids, payloads, texts
+
+def upsert_vectors(store, ids, vectors, payloads, progress=None):
+    for start in range(0, len(ids), UPSERT_BATCH_SIZE):
+        end = start + UPSERT_BATCH_SIZE
+        if progress is not None:
+            progress.check_cancelled()
+        store.upsert("employees", ids[start:end], vectors[start:end], payloads[start:end])
+        if progress is not None:
+            progress.add("rows_upserted", len(ids[start:end]))
+
+def embed_frame(store, model, df, batch_size=DEFAULT_BATCH_SIZE, stream=False, progress=None):
+    """Encode and upsert one DataFrame of employees; returns the number of rows upserted."""
+    progress = progress or IngestionProgress()
+
+    ids, payloads, texts = prepare_employees(df)
+
+    progress.add("rows_parsed", len(ids))
+
+    if stream:
+        for start, vectors in iter_encoded_batches(texts, batch_size=batch_size, model=model):
+            progress.add("rows_embedded", len(vectors))
+            end = start + len(vectors)
+            upsert_vectors(store, ids[start:end], vectors, payloads[start:end], progress=progress)
+    else:
+        vectors = encode_texts(texts, batch_size=batch_size, model=model)
+        progress.add("rows_embedded", len(vectors))
+        upsert_vectors(store, ids, vectors, payloads, progress=progress)
+
+    return len(ids)
+
+def embed_employees(file_content, batch_size=DEFAULT_BATCH_SIZE, stream=False, chunk_size=None, progress=None):
+    """
+    Embed an employees CSV and upsert it into the "employees" collection
+    of the configured vector store (Qdrant or the local in-process index).
+
+    Args:
+        file_content: Path or file-like object with the employees CSV
+        batch_size: Number of texts encoded per forward pass
+        stream: If True, upsert each encoded batch as soon as it is produced
+            instead of encoding the whole file (or chunk) into one matrix first
+        chunk_size: If set, read the CSV incrementally in chunks of this many
+            rows so memory use stays bounded regardless of file size
+        progress: Optional IngestionProgress updated with parsed/embedded/upserted
+            counts; cancellation is checked between batches
+
+    Returns:
+        Number of employees upserted
+    """
+    store = get_vector_store()
+    store.create_payload_indexes("employees", EMPLOYEE_PAYLOAD_INDEXES)
+
+    model = get_embedding_model()
+
+    if chunk_size:
+        frames = pd.read_csv(file_content, chunksize=chunk_size)
+    else:
+        frames = [pd.read_csv(file_content)]
+
+    total = 0
+    try:
+        for df in frames:
+            if progress is not None:
+                progress.check_cancelled()
+            total += embed_frame(store, model, df, batch_size=batch_size, stream=stream, progress=progress)
+    finally:
+        # Batches upserted before a cancellation or error are kept
+        store.flush()
+        roster.invalidate()
+
+    print("Employee embedding complete!")
+
+    return total
@@ -1,8 +1,25 @@
 import os
 import json
+import sys
 import pandas as pd
-from qdrant_client import QdrantClient
-from sentence_transformers import SentenceTransformer
+
+# Add project root to path so the scripts can also run standalone
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from backend.registry import get_embedding_model
+from backend.ai.vector_store import KEYWORD, get_vector_store
+from backend.ai.embeddings import DEFAULT_BATCH_SIZE, encode_texts, iter_encoded_batches
+from backend.ai.track_record import get_track_record
+from backend.jobs import IngestionProgress
+
+UPSERT_BATCH_SIZE = 256
+
+# Payload fields used to filter the duration estimator's neighbour search
+TASK_PAYLOAD_INDEXES = {
+    "task_type": KEYWORD
+}
 
 def parse_json_cell(cell):
     if pd.isna(cell) or cell == "":
@@ -14,71 +31,136 @@ def parse_json_cell(cell):
         print(f"Error parsing JSON: {cell[:50]}... Error: {e}")
         return None
 
-def embed_tasks(file_content):
-
-    QDRANT_URL = os.environ.get("QDRANT_URL")
-    QDRANT_API_KEY = os.environ.get("QDRANT_API_KEY")
-    
-    if not QDRANT_URL or not QDRANT_API_KEY:
-        raise ValueError("QDRANT_URL and QDRANT_API_KEY must be set in environment variables")
-    
-    client = QdrantClient(
-        url=QDRANT_URL,
-        api_key=QDRANT_API_KEY,
-    )
-    
-    model = SentenceTransformer('sentence-transformers/all-MiniLM-L6-v2')
-    
-    df = pd.read_csv(file_content)
-    
-    points = []
-    
-    for _, row in df.iterrows():
-        task_id = int(row['task_id'])
-        task_type = str(row['task_type'])
-        duration_minutes = int(row['duration_minutes'])
-        
-        required_skills = parse_json_cell(row['required_skills'])
-        employee_assigned = int(row['employee_assigned']) if pd.notna(row['employee_assigned']) else None
-        outcome = str(row['outcome'])
-        
-        if required_skills is None:
-            required_skills = {}
-        
-        required_skills_json = json.dumps(required_skills)
-        
-        embedding_text = f"Task of type {task_type} requiring skills {required_skills_json} with duration {duration_minutes} minutes"
-        
-        embedding = model.encode(embedding_text).tolist()
-        
-        payload = {
+def parse_json_column(series, default_factory):
+    """
+    Parse a column of JSON cells, replacing missing/invalid cells with default_factory().
+
+    The non-empty cells are joined into one JSON array and decoded with a
+    single json.loads; if that fails, the column is parsed cell by cell.
+    """
+    present = (series.notna() & (series != "")).tolist()
+    cells = series[present].astype(str).tolist()
+    try:
+        # The separators keep every doubled quote inside its own cell
+        values = json.loads("[" + ",".join(cells).replace('""', '"') + "]")
+    except json.JSONDecodeError:
+        values = None
+    if values is None or len(values) != len(cells):
+        values = [parse_json_cell(cell) for cell in cells]
+
+    values = iter(values)
+    parsed = [next(values) if has_value else None for has_value in present]
+    return [value if value is not None else default_factory() for value in parsed]
+
+def prepare_tasks(df):
+    """
+    Build point ids, payloads and embedding texts for every row of a historical tasks DataFrame.
+
+    Columns are converted and JSON-decoded column by column instead of row by row.
+    """
+    task_ids = df['task_id'].astype(int).tolist()
+    task_types = df['task_type'].astype(str).tolist()
+    durations = df['duration_minutes'].astype(int).tolist()
+    outcomes = df['outcome'].astype(str).tolist()
+
+    assigned = df['employee_assigned']
+    employees_assigned = [
+        int(value) if present else None
+        for value, present in zip(assigned.tolist(), assigned.notna().tolist())
+    ]
+
+    required_skills = parse_json_column(df['required_skills'], dict)
+
+    texts = [
+        f"Task of type {task_type} requiring skills {json.dumps(skills)} with duration {duration} minutes"
+        for task_type, skills, duration in zip(task_types, required_skills, durations)
+    ]
+
+    payloads = [
+        {
             "task_id": task_id,
             "task_type": task_type,
-            "duration_minutes": duration_minutes,
-            "required_skills": required_skills,
+            "duration_minutes": duration,
+            "required_skills": skills,
             "employee_assigned": employee_assigned,
             "outcome": outcome
         }
-        
-        points.append({
-            "id": task_id,
-            "vector": embedding,
-            "payload": payload
-        })
-        
-        if len(points) >= 50:
-            client.upsert(
-                collection_name="tasks",
-                points=points
-            )
-            print(f"Upserted {len(points)} tasks")
-            points = []
-    
-    if points:
-        client.upsert(
-            collection_name="tasks",
-            points=points
+        for task_id, task_type, duration, skills, employee_assigned, outcome in zip(
+            task_ids, task_types, durations, required_skills, employees_assigned, outcomes
         )
-        print(f"Upserted final {len(points)} tasks")
-    
-    print("Task embedding complete!")
\ No newline at end of file
+    ]
+
+    return task_ids, payloads, texts
+
+def upsert_vectors(store, ids, vectors, payloads, progress=None):
+    for start in range(0, len(ids), UPSERT_BATCH_SIZE):
+        end = start + UPSERT_BATCH_SIZE
+        if progress is not None:
+            progress.check_cancelled()
+        store.upsert("tasks", ids[start:end], vectors[start:end], payloads[start:end])
+        # Keep the in-memory outcome rates in step with the stored history
+        get_track_record().add(payloads[start:end])
+        if progress is not None:
+            progress.add("rows_upserted", len(ids[start:end]))
+
+def embed_frame(store, model, df, batch_size=DEFAULT_BATCH_SIZE, stream=False, progress=None):
+    """Encode and upsert one DataFrame of tasks; returns the number of rows upserted."""
+    progress = progress or IngestionProgress()
+
+    ids, payloads, texts = prepare_tasks(df)
+
+    progress.add("rows_parsed", len(ids))
+
+    if stream:
+        for start, vectors in iter_encoded_batches(texts, batch_size=batch_size, model=model):
+            progress.add("rows_embedded", len(vectors))
+            end = start + len(vectors)
+            upsert_vectors(store, ids[start:end], vectors, payloads[start:end], progress=progress)
+    else:
+        vectors = encode_texts(texts, batch_size=batch_size, model=model)
+        progress.add("rows_embedded", len(vectors))
+        upsert_vectors(store, ids, vectors, payloads, progress=progress)
+
+    return len(ids)
+
+def embed_tasks(file_content, batch_size=DEFAULT_BATCH_SIZE, stream=False, chunk_size=None, progress=None):
+    """
+    Embed a historical tasks CSV and upsert it into the "tasks" collection
+    of the configured vector store (Qdrant or the local in-process index).
+
+    Args:
+        file_content: Path or file-like object with the historical tasks CSV
+        batch_size: Number of texts encoded per forward pass
+        stream: If True, upsert each encoded batch as soon as it is produced
+            instead of encoding the whole file (or chunk) into one matrix first
+        chunk_size: If set, read the CSV incrementally in chunks of this many
+            rows so memory use stays bounded regardless of file size
+        progress: Optional IngestionProgress updated with parsed/embedded/upserted
+            counts; cancellation is checked between batches
+
+    Returns:
+        Number of tasks upserted
+    """
+    store = get_vector_store()
+    store.create_payload_indexes("tasks", TASK_PAYLOAD_INDEXES)
+
+    model = get_embedding_model()
+
+    if chunk_size:
+        frames = pd.read_csv(file_content, chunksize=chunk_size)
+    else:
+        frames = [pd.read_csv(file_content)]
+
+    total = 0
+    try:
+        for df in frames:
+            if progress is not None:
+                progress.check_cancelled()
+            total += embed_frame(store, model, df, batch_size=batch_size, stream=stream, progress=progress)
+    finally:
+        # Batches upserted before a cancellation or error are kept
+        store.flush()
+
+    print("Task embedding complete!")
+
+    return total
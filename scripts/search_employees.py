@@ -1,26 +1,23 @@
 import os
 import json
-from qdrant_client import QdrantClient
-from sentence_transformers import SentenceTransformer
+import sys
+
+# Add project root to path so the scripts can also run standalone
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from backend.ai.vector_store import get_vector_store
+from backend.ai.embeddings import encode_query
 
 def search(task):
 
     try:
 
-        QDRANT_URL = os.environ.get("QDRANT_URL")
-        QDRANT_API_KEY = os.environ.get("QDRANT_API_KEY")
+        store = get_vector_store()
         
-        if not QDRANT_URL or not QDRANT_API_KEY:
-            raise ValueError("QDRANT_URL and QDRANT_API_KEY must be set in environment variables")
-        
-        client = QdrantClient(
-            url=QDRANT_URL,
-            api_key=QDRANT_API_KEY,
-        )
-        
-        model = SentenceTransformer('sentence-transformers/all-MiniLM-L6-v2')
-        
-        skills_text = ", ".join(f"{skill} level {lvl}" for skill, lvl in json.loads(task['required_skills']).items())
+        required_skills = json.loads(task['required_skills'])
+        skills_text = ", ".join(f"{skill} level {required_skills[skill]}" for skill in sorted(required_skills))
         priority_text = {5: "highest", 4: "high", 3: "medium", 2: "low", 1: "lowest"}[task['priority']]
 
         query_text = (
@@ -30,13 +27,9 @@ def search(task):
             f"Duration: {task['duration_minutes']} minutes."
         )
         
-        embedding = model.encode(query_text).tolist()
+        embedding = encode_query(query_text).tolist()
         
-        results = client.search(
-            collection_name="employees",
-            query_vector=embedding,
-            limit=5
-        )
+        results = store.query("employees", embedding, limit=5)
         
         employees = []
         
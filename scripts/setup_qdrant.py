@@ -1,7 +1,17 @@
 import os
+import sys
 from qdrant_client import QdrantClient
 from qdrant_client.models import VectorParams, Distance
 
+# Add project root to path so the scripts can also run standalone
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from scripts.embed_employees import EMPLOYEE_PAYLOAD_INDEXES
+from scripts.embed_tasks import TASK_PAYLOAD_INDEXES
+from backend.ai.vector_store import QdrantVectorStore
+
 def recreate_collection(client, collection_name, vectors_config):
     try:
         client.delete_collection(collection_name)
@@ -34,6 +44,11 @@ def setup():
     
     recreate_collection(client, "employees", vectors_config)
     recreate_collection(client, "tasks", vectors_config)
+
+    QdrantVectorStore(client).create_payload_indexes("employees", EMPLOYEE_PAYLOAD_INDEXES)
+    print(f"Created {len(EMPLOYEE_PAYLOAD_INDEXES)} payload indexes on employees")
+    QdrantVectorStore(client).create_payload_indexes("tasks", TASK_PAYLOAD_INDEXES)
+    print(f"Created {len(TASK_PAYLOAD_INDEXES)} payload indexes on tasks")
     
     print("Setup complete!")
 